@@ -27,6 +27,9 @@ py_class!(pub class Entry |py| {
     def key(&self) -> PyResult<PyBytes> {
         Ok(self._key(py).clone_ref(py))
     }
+    def processed_source(&self) -> PyResult<PyString> {
+        Ok(PyString::new(py, self._processed_source(py)))
+    }
     def variables(&self) -> PyResult<PyDict> {
         let vars = PyDict::new(py);
         let named = *self._extra_named(py);
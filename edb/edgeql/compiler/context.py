@@ -88,18 +88,245 @@ class ScopeInfo:
     pinned_path_id_ns: Optional[FrozenSet[str]] = None
 
 
+# The most schemas to keep persistent TypeRef and PointerRef caches for
+# in a process.
+PERSISTENT_REF_CACHES = 8
+
+# The most TypeRefs and, separately, PointerRefs to keep in the
+# persistent cache of a schema.
+PERSISTENT_REF_CACHE_SIZE = 20000
+
+_persistent_ref_caches: collections.OrderedDict[
+    Tuple[int, ...], PersistentRefCache
+] = collections.OrderedDict()
+
+_ref_cache_stats: Counter[str] = collections.Counter()
+
+
+def get_persistent_ref_cache(schema: s_schema.Schema) -> PersistentRefCache:
+    """Return the persistent ref cache of *schema*.
+
+    Schemas are immutable, so a cache is bound to the identity of the
+    schema (of the std, user and global schemas for a chained schema).
+    The caches of the least recently used schemas are discarded.
+    """
+    if isinstance(schema, s_schema.ChainedSchema):
+        parts: Tuple[s_schema.Schema, ...] = (
+            schema.get_base_schema(),
+            schema.get_top_schema(),
+            schema.get_global_schema(),
+        )
+    else:
+        parts = (schema,)
+    key = tuple(id(part) for part in parts)
+
+    cache = _persistent_ref_caches.get(key)
+    if cache is None:
+        cache = PersistentRefCache(schema, parts)
+        _persistent_ref_caches[key] = cache
+        if len(_persistent_ref_caches) > PERSISTENT_REF_CACHES:
+            _persistent_ref_caches.popitem(last=False)
+            _ref_cache_stats['discards'] += 1
+    else:
+        _persistent_ref_caches.move_to_end(key)
+    return cache
+
+
+def discard_persistent_ref_caches(schema: s_schema.Schema) -> None:
+    """Discard the persistent ref caches of schemas containing *schema*.
+
+    Called when *schema* is superseded by a new version (e.g. the user
+    schema of a database after a DDL), so that its caches don't linger
+    until they are the least recently used ones.
+    """
+    for key, cache in list(_persistent_ref_caches.items()):
+        if any(part is schema for part in cache._parts):
+            del _persistent_ref_caches[key]
+            _ref_cache_stats['discards'] += 1
+
+
+def get_ref_cache_stats() -> Dict[str, int]:
+    """Return the hit and miss counts of the persistent ref caches."""
+    return dict(_ref_cache_stats)
+
+
+class PersistentRefCache:
+    """TypeRefs and PointerRefs of a schema shared across compilations.
+
+    Only refs of objects of the schema itself are kept, not those of
+    objects derived by a compilation.  PointerRefs are partly mutable,
+    so every compilation gets its own copies of them.
+    """
+
+    _ptr_fields = (
+        'source_ptr', 'base_ptr', 'material_ptr', 'computed_backlink')
+    _ptr_set_fields = (
+        'children', 'union_components', 'intersection_components')
+
+    def __init__(
+        self,
+        schema: s_schema.Schema,
+        parts: Tuple[s_schema.Schema, ...],
+    ) -> None:
+        self._schema = schema
+        # Keep the schemas alive for their ids to stay unique.
+        self._parts = parts
+        self._type_refs: Dict[irtyputils.TypeRefCacheKey, irast.TypeRef] = {}
+        self._ptr_refs: Dict[
+            irtyputils.PtrRefCacheKey, irast.BasePointerRef] = {}
+        self._ptr_keys: Dict[
+            irast.BasePointerRef, irtyputils.PtrRefCacheKey] = {}
+
+    def get_type_ref(
+        self,
+        key: irtyputils.TypeRefCacheKey,
+    ) -> Optional[irast.TypeRef]:
+        ref = self._type_refs.get(key)
+        if ref is None:
+            _ref_cache_stats['typeref_misses'] += 1
+        else:
+            _ref_cache_stats['typeref_hits'] += 1
+        return ref
+
+    def add_type_ref(
+        self,
+        key: irtyputils.TypeRefCacheKey,
+        ref: irast.TypeRef,
+    ) -> None:
+        if len(self._type_refs) >= PERSISTENT_REF_CACHE_SIZE:
+            return
+        obj = self._schema.get_by_id(ref.id, None)
+        # Skip types derived by the compilation, or changed by it.
+        if obj is not None and obj.get_name(self._schema) == ref.name_hint:
+            self._type_refs[key] = ref
+
+    def get_ptr_ref(
+        self,
+        key: irtyputils.PtrRefCacheKey,
+        cache: PointerRefCache,
+    ) -> Optional[irast.BasePointerRef]:
+        ref = self._ptr_refs.get(key)
+        if ref is None:
+            _ref_cache_stats['ptrref_misses'] += 1
+            return None
+        else:
+            _ref_cache_stats['ptrref_hits'] += 1
+            return self._localize(ref, cache)
+
+    def add_ptr_ref(
+        self,
+        key: irtyputils.PtrRefCacheKey,
+        ref: irast.BasePointerRef,
+        cache: PointerRefCache,
+    ) -> None:
+        if (
+            len(self._ptr_refs) >= PERSISTENT_REF_CACHE_SIZE
+            or not isinstance(key, s_pointers.Pointer)
+            or ref.is_derived
+            or not self._schema.has_object(key.id)
+            or key.get_name(self._schema) != ref.name
+        ):
+            return
+
+        # Nested refs are built, and so cached, first.  Store a copy
+        # referring to their shared versions, so that neither the
+        # compilation changing its refs nor the copy can be affected.
+        changes: Dict[str, Any] = {}
+        for field in self._ptr_fields:
+            nested = getattr(ref, field)
+            if nested is not None:
+                changes[field] = self._shared(nested, cache)
+                if changes[field] is None:
+                    return
+        for field in self._ptr_set_fields:
+            nested_set = getattr(ref, field)
+            if nested_set is not None:
+                shared = {self._shared(n, cache) for n in nested_set}
+                if None in shared:
+                    return
+                changes[field] = type(nested_set)(shared)
+
+        shared_ref = ref.replace(**changes)
+        self._ptr_refs[key] = shared_ref
+        self._ptr_keys[shared_ref] = key
+
+    def _shared(
+        self,
+        ref: irast.BasePointerRef,
+        cache: PointerRefCache,
+    ) -> Optional[irast.BasePointerRef]:
+        key = cache.get_ptrcls_for_ref(ref)
+        if key is None:
+            return None
+        return self._ptr_refs.get(key)
+
+    def _localize(
+        self,
+        ref: irast.BasePointerRef,
+        cache: PointerRefCache,
+    ) -> irast.BasePointerRef:
+        key = self._ptr_keys[ref]
+        local = cache.get_local(key)
+        if local is not None:
+            return local
+
+        changes: Dict[str, Any] = {}
+        for field in self._ptr_fields:
+            nested = getattr(ref, field)
+            if nested is not None:
+                changes[field] = self._localize(nested, cache)
+        for field in self._ptr_set_fields:
+            nested_set = getattr(ref, field)
+            if nested_set is not None:
+                changes[field] = type(nested_set)(
+                    self._localize(n, cache) for n in nested_set)
+
+        local = ref.replace(**changes)
+        cache.add_local(key, local)
+        return local
+
+
 class PointerRefCache(Dict[irtyputils.PtrRefCacheKey, irast.BasePointerRef]):
 
     _rcache: Dict[irast.BasePointerRef, s_pointers.PointerLike]
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        persistent: Optional[PersistentRefCache] = None,
+    ) -> None:
         super().__init__()
         self._rcache = {}
+        self._persistent = persistent
 
     def __setitem__(
         self,
         key: irtyputils.PtrRefCacheKey,
         val: irast.BasePointerRef,
+    ) -> None:
+        self.add_local(key, val)
+        if self._persistent is not None:
+            self._persistent.add_ptr_ref(key, val, self)
+
+    def get(  # type: ignore
+        self,
+        key: irtyputils.PtrRefCacheKey,
+        default: Optional[irast.BasePointerRef] = None,
+    ) -> Optional[irast.BasePointerRef]:
+        val = super().get(key)
+        if val is None and self._persistent is not None:
+            val = self._persistent.get_ptr_ref(key, self)
+        return val if val is not None else default
+
+    def get_local(
+        self,
+        key: irtyputils.PtrRefCacheKey,
+    ) -> Optional[irast.BasePointerRef]:
+        return super().get(key)
+
+    def add_local(
+        self,
+        key: irtyputils.PtrRefCacheKey,
+        val: irast.BasePointerRef,
     ) -> None:
         super().__setitem__(key, val)
         self._rcache[val] = key
@@ -111,6 +338,37 @@ class PointerRefCache(Dict[irtyputils.PtrRefCacheKey, irast.BasePointerRef]):
         return self._rcache.get(ref)
 
 
+class TypeRefCache(Dict[irtyputils.TypeRefCacheKey, irast.TypeRef]):
+
+    def __init__(
+        self,
+        persistent: Optional[PersistentRefCache] = None,
+    ) -> None:
+        super().__init__()
+        self._persistent = persistent
+
+    def __setitem__(
+        self,
+        key: irtyputils.TypeRefCacheKey,
+        val: irast.TypeRef,
+    ) -> None:
+        super().__setitem__(key, val)
+        if self._persistent is not None:
+            self._persistent.add_type_ref(key, val)
+
+    def get(  # type: ignore
+        self,
+        key: irtyputils.TypeRefCacheKey,
+        default: Optional[irast.TypeRef] = None,
+    ) -> Optional[irast.TypeRef]:
+        val = super().get(key)
+        if val is None and self._persistent is not None:
+            val = self._persistent.get_type_ref(key)
+            if val is not None:
+                super().__setitem__(key, val)
+        return val if val is not None else default
+
+
 # Volatility inference computes two volatility results:
 # A basic one, and one for consumption by materialization
 InferredVolatility = Union[
@@ -198,7 +456,7 @@ class Environment:
 
     # Caches for costly operations in edb.ir.typeutils
     ptr_ref_cache: PointerRefCache
-    type_ref_cache: Dict[irtyputils.TypeRefCacheKey, irast.TypeRef]
+    type_ref_cache: TypeRefCache
 
     dml_exprs: List[qlast.Base]
     """A list of DML expressions (statements and DML-containing
@@ -264,8 +522,12 @@ class Environment:
         self.schema_refs = set()
         self.schema_ref_exprs = {} if options.track_schema_ref_exprs else None
         self.created_schema_objects = set()
-        self.ptr_ref_cache = PointerRefCache()
-        self.type_ref_cache = {}
+        persistent_ref_cache = (
+            get_persistent_ref_cache(schema)
+            if options.persistent_ref_cache else None
+        )
+        self.ptr_ref_cache = PointerRefCache(persistent_ref_cache)
+        self.type_ref_cache = TypeRefCache(persistent_ref_cache)
         self.dml_exprs = []
         self.dml_stmts = set()
         self.pointer_derivation_map = collections.defaultdict(list)
@@ -83,6 +83,10 @@ class GlobalCompilerOptions:
     #: Is the compiler running in testmode
     testmode: bool = False
 
+    #: Whether to reuse the TypeRefs and PointerRefs built by earlier
+    #: compilations against the same schema.
+    persistent_ref_cache: bool = False
+
 
 @dataclass
 class CompilerOptions(GlobalCompilerOptions):
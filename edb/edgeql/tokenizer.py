@@ -71,6 +71,7 @@ class NormalizedSource(Source):
 
     def __init__(self, normalized: Entry, text: str) -> None:
         self._text = text
+        self._normalized = normalized
         self._cache_key = normalized.key()
         self._tokens = normalized.tokens()
         self._variables = normalized.variables()
@@ -81,6 +82,10 @@ class NormalizedSource(Source):
     def text(self) -> str:
         return self._text
 
+    def normalized_text(self) -> str:
+        """Return the text with the extracted constants as parameters."""
+        return self._normalized.processed_source()
+
     def cache_key(self) -> bytes:
         return self._cache_key
 
@@ -103,6 +108,23 @@ class NormalizedSource(Source):
     def from_string(cls, text: str) -> NormalizedSource:
         return cls(normalize(text), text)
 
+    @classmethod
+    def from_normalized_text(
+        cls,
+        text: str,
+        first_extra: Optional[int],
+        extra_counts: Sequence[int],
+    ) -> NormalizedSource:
+        """Recreate a source from the normalized_text() of another one.
+
+        The values of the extracted constants are not known, so the
+        source can only be compiled, not executed.
+        """
+        source = cls(normalize(text), text)
+        source._first_extra = first_extra
+        source._extra_counts = list(extra_counts)
+        return source
+
 
 def tokenize(eql: str) -> List[Token]:
     try:
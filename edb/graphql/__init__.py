@@ -19,7 +19,7 @@
 
 from __future__ import annotations
 
-from .compiler import compile_graphql
+from .compiler import build_gqlcore, compile_graphql
 from .translator import translate_ast, parse_text, parse_tokens
 from .translator import TranspiledOperation
 from .types import GQLCoreSchema
@@ -30,5 +30,5 @@ _patch_core.patch_graphql_core()
 
 __all__ = (
     'translate_ast', 'parse_text', 'parse_tokens', 'GQLCoreSchema',
-    'compile_graphql', 'TranspiledOperation'
+    'build_gqlcore', 'compile_graphql', 'TranspiledOperation'
 )
@@ -29,8 +29,7 @@ from edb.schema import schema as s_schema
 from graphql.language import lexer as gql_lexer
 
 
-@functools.lru_cache()
-def _get_gqlcore(
+def build_gqlcore(
     std_schema: s_schema.FlatSchema,
     user_schema: s_schema.FlatSchema,
     global_schema: s_schema.FlatSchema,
@@ -44,6 +43,13 @@ def _get_gqlcore(
     )
 
 
+# Only used when the caller does not pass the GraphQL schema in, i.e. by
+# the remote compiler worker; the local workers keep one per database.
+# The schemas are keys, so the size is kept small to not hold on to the
+# schemas of many old versions.
+_get_gqlcore = functools.lru_cache(maxsize=16)(build_gqlcore)
+
+
 def compile_graphql(
     std_schema: s_schema.FlatSchema,
     user_schema: s_schema.FlatSchema,
@@ -56,13 +62,16 @@ def compile_graphql(
     substitutions: Optional[Dict[str, Tuple[str, int, int]]],
     operation_name: str=None,
     variables: Optional[Mapping[str, object]]=None,
+    *,
+    gqlcore: Optional[graphql.GQLCoreSchema]=None,
 ) -> graphql.TranspiledOperation:
     if tokens is None:
         ast = graphql.parse_text(gql)
     else:
         ast = graphql.parse_tokens(gql, tokens)
 
-    gqlcore = _get_gqlcore(std_schema, user_schema, global_schema)
+    if gqlcore is None:
+        gqlcore = _get_gqlcore(std_schema, user_schema, global_schema)
 
     return graphql.translate_ast(
         gqlcore,
@@ -46,3 +46,10 @@ class GraphQLValidationError(GraphQLTranslationError):
 
 class GraphQLCoreError(GraphQLError):
     pass
+
+
+class GraphQLPersistedQueryNotFound(GraphQLError):
+
+    def __init__(self) -> None:
+        # The message is sent to the client as is, see the extension.
+        super().__init__('PersistedQueryNotFound')
@@ -26,6 +26,7 @@ from typing import (
 )
 
 import cython
+import hashlib
 import http
 import json
 import logging
@@ -43,6 +44,7 @@ from edb.server.pgcon import errors as pgerrors
 from edb.server.protocol import execute
 
 from edb.common import debug
+from edb.common import lru
 from edb.common import markup
 
 from . import explore
@@ -70,6 +72,23 @@ CacheEntry = Union[
 ]
 
 
+@cython.final
+cdef class PersistedQuery:
+    # A GraphQL query registered by its hash, with its compiled
+    # variants for the current dbver of the database.
+    cdef public str query
+    cdef public object rewritten
+    cdef public object dbver
+    cdef public object compiled  # LRUMapping[tuple, CacheEntry]
+
+    def __init__(self, query: str, rewritten):
+        self.query = query
+        self.rewritten = rewritten
+        self.dbver = None
+        self.compiled = lru.LRUMapping(
+            maxsize=edbdef.GRAPHQL_PERSISTED_QUERY_VARIANTS)
+
+
 async def handle_request(
     object request,
     object response,
@@ -91,7 +110,9 @@ async def handle_request(
     operation_name = None
     variables = None
     globals = None
+    extensions = None
     query = None
+    persisted_hash = None
 
     try:
         if request.method == b'POST':
@@ -104,6 +125,7 @@ async def handle_request(
                 operation_name = body.get('operationName')
                 variables = body.get('variables')
                 globals = body.get('globals')
+                extensions = body.get('extensions')
             elif request.content_type == 'application/graphql':
                 query = request.body.decode('utf-8')
             else:
@@ -139,10 +161,25 @@ async def handle_request(
                         raise TypeError(
                             '"globals" must be a JSON object')
 
+                extensions = qs.get('extensions')
+                if extensions is not None:
+                    try:
+                        extensions = json.loads(extensions[0])
+                    except Exception:
+                        raise TypeError(
+                            '"extensions" must be a JSON object')
+
         else:
             raise TypeError('expected a GET or a POST request')
 
-        if not query:
+        if extensions is not None:
+            if not isinstance(extensions, dict):
+                raise TypeError('"extensions" must be a JSON object')
+            persisted = extensions.get('persistedQuery')
+            if persisted is not None:
+                persisted_hash = _get_persisted_hash(persisted, query)
+
+        if not query and persisted_hash is None:
             raise TypeError('invalid GraphQL request: query is missing')
 
         if (operation_name is not None and
@@ -168,7 +205,8 @@ async def handle_request(
     response.content_type = b'application/json'
     try:
         result = await _execute(
-            db, server, query, operation_name, variables, globals)
+            db, server, query, operation_name, variables, globals,
+            persisted_hash)
     except Exception as ex:
         if debug.flags.server:
             markup.dump(ex)
@@ -179,9 +217,16 @@ async def handle_request(
             # XXX Fix this when LSP "location" objects are implemented
             ex_type = errors.QueryError
 
-        err_dct = {
-            'message': f'{ex_type.__name__}: {ex}',
-        }
+        if isinstance(ex, gql_errors.GraphQLPersistedQueryNotFound):
+            # Clients of persisted queries look for the exact message.
+            err_dct = {
+                'message': str(ex),
+                'extensions': {'code': 'PERSISTED_QUERY_NOT_FOUND'},
+            }
+        else:
+            err_dct = {
+                'message': f'{ex_type.__name__}: {ex}',
+            }
 
         if (isinstance(ex, errors.EdgeDBError) and
                 hasattr(ex, 'line') and
@@ -193,6 +238,21 @@ async def handle_request(
         response.body = b'{"data":' + result + b'}'
 
 
+def _get_persisted_hash(persisted, query: Optional[str]) -> str:
+    if not isinstance(persisted, dict):
+        raise TypeError('"persistedQuery" must be a JSON object')
+    if persisted.get('version') != 1:
+        raise TypeError('unsupported "persistedQuery" version')
+    persisted_hash = persisted.get('sha256Hash')
+    if not isinstance(persisted_hash, str):
+        raise TypeError('"sha256Hash" must be a string')
+    if query:
+        # Only a query matching its hash can be registered.
+        if hashlib.sha256(query.encode()).hexdigest() != persisted_hash:
+            raise TypeError('"sha256Hash" does not match the query')
+    return persisted_hash
+
+
 async def compile(
     db,
     server,
@@ -218,7 +278,18 @@ async def compile(
     )
 
 
-async def _execute(db, server, query, operation_name, variables, globals):
+def _cache_key(persisted, prepared_query, key_vars, operation_name, dbver):
+    if persisted is not None:
+        # The compiled variants of a persisted query are only kept
+        # for the current dbver, see _execute().
+        return key_vars
+    else:
+        return ('graphql', prepared_query, key_vars, operation_name, dbver)
+
+
+async def _execute(
+    db, server, query, operation_name, variables, globals, persisted_hash
+):
     dbver = db.dbver
     query_cache = server._http_query_cache
 
@@ -231,13 +302,33 @@ async def _execute(db, server, query, operation_name, variables, globals):
     query_cache_enabled = not (
         debug.flags.disable_qcache or debug.flags.graphql_compile)
 
+    # Queries sent with a hash are registered in the database by that
+    # hash, so that later requests can send the hash alone.  Their
+    # rewrite is kept along with them and their compiled variants are
+    # cached there instead of the query cache of the server, so hits
+    # don't tokenize and hash the query text again.
+    persisted = None
+    persisted_key = (persisted_hash, operation_name)
+    if persisted_hash is not None:
+        persisted = db.graphql_persisted_queries.get(persisted_key)
+        if persisted is not None:
+            query = persisted.query
+        elif not query:
+            raise gql_errors.GraphQLPersistedQueryNotFound()
+
     if debug.flags.graphql_compile:
         debug.header('Input graphql')
         print(query)
         print(f'variables: {variables}')
 
     try:
-        rewritten = _graphql_rewrite.rewrite(operation_name, query)
+        if persisted is not None:
+            rewritten = persisted.rewritten
+        else:
+            rewritten = _graphql_rewrite.rewrite(operation_name, query)
+            if persisted_hash is not None:
+                persisted = PersistedQuery(query, rewritten)
+                db.graphql_persisted_queries[persisted_key] = persisted
 
         vars = rewritten.variables().copy()
         if variables:
@@ -254,12 +345,20 @@ async def _execute(db, server, query, operation_name, variables, globals):
             logger.warning("Error rewriting graphql query: %r", e)
         rewritten = None
         rewrite_error = e
+        persisted = None
         prepared_query = query
         vars = variables.copy() if variables else {}
         key_var_names = []
         key_vars = ()
     else:
-        prepared_query = rewritten.key()
+        if persisted is not None:
+            prepared_query = None
+            if persisted.dbver != dbver:
+                persisted.compiled.clear()
+                persisted.dbver = dbver
+            query_cache = persisted.compiled
+        else:
+            prepared_query = rewritten.key()
 
         if debug.flags.graphql_compile:
             debug.header('GraphQL optimized query')
@@ -267,7 +366,8 @@ async def _execute(db, server, query, operation_name, variables, globals):
             print(f'key_vars: {key_var_names}')
             print(f'variables: {vars}')
 
-    cache_key = ('graphql', prepared_query, key_vars, operation_name, dbver)
+    cache_key = _cache_key(
+        persisted, prepared_query, key_vars, operation_name, dbver)
     use_prep_stmt = False
 
     entry: CacheEntry = None
@@ -276,7 +376,8 @@ async def _execute(db, server, query, operation_name, variables, globals):
 
     if isinstance(entry, CacheRedirect):
         key_vars2 = tuple(vars[k] for k in entry.key_vars)
-        cache_key2 = (prepared_query, key_vars2, operation_name, dbver)
+        cache_key2 = _cache_key(
+            persisted, prepared_query, key_vars2, operation_name, dbver)
         entry = query_cache.get(cache_key2, None)
 
     if entry is None:
@@ -302,15 +403,18 @@ async def _execute(db, server, query, operation_name, variables, globals):
             )
 
         key_var_set = set(key_var_names)
-        if gql_op.cache_deps_vars and gql_op.cache_deps_vars != key_var_set:
+        if persisted is not None and persisted.dbver != dbver:
+            # The schema has changed while compiling and the variants
+            # of the persisted query are now kept for the new dbver.
+            pass
+        elif gql_op.cache_deps_vars and gql_op.cache_deps_vars != key_var_set:
             key_var_set.update(gql_op.cache_deps_vars)
             key_var_names = sorted(key_var_set)
             redir = CacheRedirect(key_vars=key_var_names)
             query_cache[cache_key] = redir
             key_vars2 = tuple(vars[k] for k in key_var_names)
-            cache_key2 = (
-                'graphql', prepared_query, key_vars2, operation_name, dbver
-            )
+            cache_key2 = _cache_key(
+                persisted, prepared_query, key_vars2, operation_name, dbver)
             query_cache[cache_key2] = qug, gql_op
         else:
             query_cache[cache_key] = qug, gql_op
@@ -21,6 +21,8 @@ from __future__ import annotations
 
 from typing import *
 
+import time
+
 from edb import errors
 
 from edb.common import debug
@@ -147,8 +149,10 @@ def compile_ir_to_sql(
     expected_cardinality_one: bool=False,
     pretty: bool=True,
     backend_runtime_params: Optional[pgparams.BackendRuntimeParams]=None,
+    timings: Optional[Dict[str, float]]=None,
 ) -> Tuple[str, Dict[str, pgast.Param]]:
 
+    started_at = time.perf_counter()
     qtree = compile_ir_to_sql_tree(
         ir_expr,
         output_format=output_format,
@@ -159,6 +163,7 @@ def compile_ir_to_sql(
         expected_cardinality_one=expected_cardinality_one,
         backend_runtime_params=backend_runtime_params,
     )
+    tree_done_at = time.perf_counter()
 
     if (  # pragma: no cover
         debug.flags.edgeql_compile or debug.flags.edgeql_compile_sql_ast
@@ -172,8 +177,17 @@ def compile_ir_to_sql(
         argmap = {}
 
     # Generate query text
+    codegen_started_at = time.perf_counter()
     sql_text = run_codegen(qtree, pretty=pretty)
 
+    if timings is not None:
+        # Seconds spent building the SQL tree and generating its text.
+        timings['sql_tree'] = (
+            timings.get('sql_tree', 0.0) + tree_done_at - started_at)
+        timings['codegen'] = (
+            timings.get('codegen', 0.0)
+            + time.perf_counter() - codegen_started_at)
+
     if (  # pragma: no cover
         debug.flags.edgeql_compile or debug.flags.edgeql_compile_sql_text
     ):
@@ -49,6 +49,16 @@ from . import schema as s_schema
 from . import utils
 
 
+# Beyond this many pairs of changed objects, delta_objects() compares
+# only the plausible rename candidates instead of every pair.
+PRUNE_COMPARISONS_ABOVE = 10000
+
+# Objects sharing bases and a target are only considered rename
+# candidates on that account if they also contain objects of the same
+# local names once there are more of them than this.
+MAX_SIGNATURE_BLOCK = 16
+
+
 def delta_objects(
     old: Iterable[so.Object_T],
     new: Iterable[so.Object_T],
@@ -80,10 +90,7 @@ def delta_objects(
     newnames = {o.get_name(new_schema) for o in new}
     common_names = oldnames & newnames
 
-    pairs = sorted(
-        itertools.product(new, old),
-        key=lambda pair: pair[0].get_name(new_schema) not in common_names,
-    )
+    prune = len(new) * len(old) > PRUNE_COMPARISONS_ABOVE
 
     full_matrix: List[Tuple[so.Object_T, so.Object_T, float]] = []
 
@@ -126,7 +133,32 @@ def delta_objects(
         def can_delete(obj: so.Object_T, name: sn.Name) -> bool:
             return True
 
+    pairs: Iterable[Tuple[so.Object_T, so.Object_T]]
+    if prune:
+        pairs = _rename_candidates(
+            old,
+            new,
+            context=context,
+            old_schema=old_schema,
+            new_schema=new_schema,
+            can_create=can_create,
+            can_delete=can_delete,
+        )
+    else:
+        pairs = sorted(
+            itertools.product(new, old),
+            key=lambda pair: pair[0].get_name(new_schema) not in common_names,
+        )
+
+    # Objects that have an identical counterpart under the same name.
+    # When pruning, their other candidates are not compared, as the
+    # exact match would be picked anyway.
+    settled: Set[so.Object_T] = set()
+
     for x, y in pairs:
+        if x in settled or y in settled:
+            continue
+
         x_name = x.get_name(new_schema)
         y_name = y.get_name(old_schema)
 
@@ -144,6 +176,10 @@ def delta_objects(
 
         full_matrix.append((x, y, similarity))
 
+        if prune and similarity == 1.0 and x_name == y_name:
+            settled.add(x)
+            settled.add(y)
+
     full_matrix.sort(
         key=lambda v: (
             1.0 - v[2],
@@ -152,8 +188,10 @@ def delta_objects(
         ),
     )
 
-    full_matrix_x = {}
-    full_matrix_y = {}
+    full_matrix_x: Dict[
+        so.Object_T, Tuple[float, Optional[so.Object_T]]] = {}
+    full_matrix_y: Dict[
+        so.Object_T, Tuple[float, Optional[so.Object_T]]] = {}
 
     seen_x = set()
     seen_y = set()
@@ -177,13 +215,53 @@ def delta_objects(
             full_matrix_y[y] = (similarity, x)
 
         if (
-            can_alter(y, y.get_name(old_schema), x.get_name(new_schema))
+            not prune
+            and can_alter(y, y.get_name(old_schema), x.get_name(new_schema))
             and full_matrix_x[x][0] != 1.0
             and full_matrix_y[y][0] != 1.0
         ):
             x_alter_variants[x] += 1
             y_alter_variants[y] += 1
 
+    if prune:
+        # Pairs that were not compared would have been counted as
+        # alter variants too, unless either side has an exact match
+        # elsewhere, so count them all without comparing.
+        #
+        # Objects that were not compared to anything share no blocking
+        # key with any object on the other side, so they are taken to
+        # be dissimilar to all of them: their best similarity, which
+        # becomes the confidence of their creation or deletion, is 0.0
+        # and there is no best match.  The exhaustive comparison would
+        # give them a low, but not necessarily zero, similarity.
+        for x in new:
+            full_matrix_x.setdefault(x, (0.0, None))
+        for y in old:
+            full_matrix_y.setdefault(y, (0.0, None))
+
+        open_x = {
+            x.get_name(new_schema): x
+            for x in new if full_matrix_x[x][0] != 1.0
+        }
+        open_y = {
+            (type(y), y.get_name(old_schema)): y
+            for y in old if full_matrix_y[y][0] != 1.0
+        }
+        for x in open_x.values():
+            x_alter_variants[x] = len(open_y)
+        for y in open_y.values():
+            y_alter_variants[y] = len(open_x)
+
+        if context.guidance is not None:
+            for ytype, (y_name, x_name) in (
+                context.guidance.banned_alters
+            ):
+                banned_x = open_x.get(x_name)
+                banned_y = open_y.get((ytype, y_name))
+                if banned_x is not None and banned_y is not None:
+                    x_alter_variants[banned_x] -= 1
+                    y_alter_variants[banned_y] -= 1
+
     alters = []
     alter_pairs = []
 
@@ -286,6 +364,126 @@ def delta_objects(
     return delta
 
 
+def _rename_candidates(
+    old: Iterable[so.Object_T],
+    new: Iterable[so.Object_T],
+    *,
+    context: so.ComparisonContext,
+    old_schema: s_schema.Schema,
+    new_schema: s_schema.Schema,
+    can_create: Callable[[so.Object_T, sn.Name], bool],
+    can_delete: Callable[[so.Object_T, sn.Name], bool],
+) -> List[Tuple[so.Object_T, so.Object_T]]:
+    """Return the pairs of *new* and *old* objects worth comparing.
+
+    Objects are only paired if they share a blocking key: the name,
+    the short name, the short name without the module, or the bases and
+    the target.  Large groups of objects with the same bases and target
+    are split further by the local names of the objects they contain,
+    such as the pointers of object types.  Names in *old* are taken
+    after the renames that were already decided on.  Objects the
+    guidance forbids to create or to delete are paired with everything,
+    since they must be altered from or into something.  Pairs of objects
+    with the same name come first.
+    """
+
+    def keys(
+        obj: so.Object_T,
+        schema: s_schema.Schema,
+    ) -> Iterator[Tuple[Hashable, bool]]:
+        # Yields (key, is_signature) pairs.
+        name = context.get_obj_name(schema, obj)
+        yield ('name', name), False
+        shortname = sn.shortname_from_fullname(name)
+        if shortname != name:
+            yield ('shortname', shortname), False
+        if isinstance(shortname, sn.QualName):
+            yield ('localname', shortname.name), False
+
+        sig: List[Any] = []
+        if isinstance(obj, so.InheritingObject):
+            sig.append(tuple(
+                context.get_obj_name(schema, base)
+                for base in obj.get_bases(schema).objects(schema)
+            ))
+        if type(obj).has_field('target'):
+            target = obj.get_field_value(schema, 'target')
+            if isinstance(target, so.Object):
+                sig.append(context.get_obj_name(schema, target))
+        if sig:
+            yield ('signature', tuple(sig)), True
+
+    def structure(obj: so.Object_T, schema: s_schema.Schema) -> Hashable:
+        # The local names of the contained objects don't change when
+        # the container is renamed.
+        rv = set()
+        for refdict in type(obj).get_refdicts():
+            refs = obj.get_field_value(schema, refdict.attr)
+            for ref in refs.objects(schema):
+                shortname = sn.shortname_from_fullname(
+                    context.get_obj_name(schema, ref))
+                if isinstance(shortname, sn.QualName):
+                    rv.add((refdict.attr, shortname.name))
+                else:
+                    rv.add((refdict.attr, str(shortname)))
+        return frozenset(rv)
+
+    def pair_all(xs: List[so.Object_T], ys: List[so.Object_T]) -> None:
+        for x in xs:
+            for y in ys:
+                pairs[x, y] = None
+
+    blocks: Dict[
+        Hashable,
+        Tuple[List[so.Object_T], List[so.Object_T], bool],
+    ] = {}
+    for x in new:
+        for key, is_sig in keys(x, new_schema):
+            blocks.setdefault(key, ([], [], is_sig))[0].append(x)
+    for y in old:
+        for key, _ in keys(y, old_schema):
+            if key in blocks:
+                blocks[key][1].append(y)
+
+    pairs: Dict[Tuple[so.Object_T, so.Object_T], None] = {}
+    for xs, ys, is_sig in blocks.values():
+        if not is_sig or max(len(xs), len(ys)) <= MAX_SIGNATURE_BLOCK:
+            pair_all(xs, ys)
+            continue
+
+        # A signature shared by many objects (e.g. all object types
+        # extending std::Object) says little about renames on its own.
+        sub_blocks: Dict[
+            Hashable,
+            Tuple[List[so.Object_T], List[so.Object_T]],
+        ] = {}
+        for x in xs:
+            sub_blocks.setdefault(
+                structure(x, new_schema), ([], []))[0].append(x)
+        for y in ys:
+            sub_key = structure(y, old_schema)
+            if sub_key in sub_blocks:
+                sub_blocks[sub_key][1].append(y)
+        for sub_xs, sub_ys in sub_blocks.values():
+            pair_all(sub_xs, sub_ys)
+
+    for x in new:
+        if not can_create(x, x.get_name(new_schema)):
+            for y in old:
+                pairs[x, y] = None
+    for y in old:
+        if not can_delete(y, y.get_name(old_schema)):
+            for x in new:
+                pairs[x, y] = None
+
+    return sorted(
+        pairs,
+        key=lambda pair: (
+            pair[0].get_name(new_schema) != pair[1].get_name(old_schema)
+        ),
+    )
+
+
 def _sort_by_inheritance(
     schema: s_schema.Schema,
     objs: Iterable[so.InheritingObjectT],
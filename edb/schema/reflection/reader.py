@@ -73,6 +73,10 @@ def parse_into(
     name_to_id = {}
     shortname_to_id = collections.defaultdict(set)
     globalname_to_id = {}
+    type_to_ids: Dict[Type[s_obj.Object], Dict[uuid.UUID, None]] = (
+        collections.defaultdict(dict))
+    module_to_ids: Dict[s_name.Name, Dict[uuid.UUID, None]] = (
+        collections.defaultdict(dict))
     dict_of_dicts: Callable[
         [],
         Dict[Tuple[Type[s_obj.Object], str], Dict[uuid.UUID, None]],
@@ -109,6 +113,7 @@ def parse_into(
 
         if isinstance(obj, s_obj.QualifiedObject):
             name_to_id[name] = objid
+            module_to_ids[name.get_module_name()][objid] = None
         else:
             globalname_to_id[mcls, name] = objid
 
@@ -117,6 +122,7 @@ def parse_into(
             shortname_to_id[mcls, shortname].add(objid)
 
         id_to_type[objid] = type(obj).__name__
+        type_to_ids[mcls][objid] = None
 
         all_fields = mcls.get_schema_fields()
         objdata: List[Any] = [None] * len(all_fields)
@@ -251,6 +257,8 @@ def parse_into(
 
     schema = schema._replace(
         id_to_type=schema._id_to_type.update(id_to_type),
+        type_to_ids=_update_index(schema._type_to_ids, type_to_ids),
+        module_to_ids=_update_index(schema._module_to_ids, module_to_ids),
         id_to_data=schema._id_to_data.update(id_to_data),
         name_to_id=schema._name_to_id.update(name_to_id),
         shortname_to_id=schema._shortname_to_id.update(
@@ -263,6 +271,19 @@ def parse_into(
     return schema
 
 
+def _update_index(
+    index: immutables.Map[Any, immutables.Map[uuid.UUID, None]],
+    updates: Mapping[Any, Dict[uuid.UUID, None]],
+) -> immutables.Map[Any, immutables.Map[uuid.UUID, None]]:
+    with index.mutate() as mm:
+        for key, ids in updates.items():
+            try:
+                mm[key] = mm[key].update(ids)
+            except KeyError:
+                mm[key] = immutables.Map(ids)
+        return mm.finish()
+
+
 def _parse_expression(val: Dict[str, Any]) -> s_expr.Expression:
     refids = frozenset(
         uuidgen.UUID(r) for r in val['refs']
@@ -75,6 +75,35 @@ STD_SOURCES = (
 
 Schema_T = TypeVar('Schema_T', bound='Schema')
 
+# (updated items, deleted keys)
+MapDelta = Tuple[Tuple[Tuple[Any, Any], ...], Tuple[Any, ...]]
+
+
+class FlatSchemaDelta(NamedTuple):
+    """The difference between two FlatSchemas, see FlatSchema.get_delta().
+
+    The type and module indexes are not a part of it, as they follow
+    from the changes to *id_to_type* and *name_to_id*.
+    """
+
+    #: The version of the schema the delta applies to.
+    base_version: uuid.UUID
+    #: The version of the schema the delta produces.
+    version: uuid.UUID
+    #: Sizes of the maps of the schema the delta applies to.
+    base_sizes: Tuple[int, ...]
+
+    id_to_data: MapDelta
+    id_to_type: MapDelta
+    name_to_id: MapDelta
+    shortname_to_id: MapDelta
+    globalname_to_id: MapDelta
+    refs_to: MapDelta
+
+    def get_size(self) -> int:
+        """Return the total number of updated and deleted entries."""
+        return sum(len(u) + len(d) for u, d in self[3:])
+
 
 class Schema(abc.ABC):
 
@@ -476,6 +505,10 @@ class FlatSchema(Schema):
 
     _id_to_data: immu.Map[uuid.UUID, Tuple[Any, ...]]
     _id_to_type: immu.Map[uuid.UUID, str]
+    #: Ids of objects by schema class (exact, not including subclasses).
+    _type_to_ids: immu.Map[Type[so.Object], immu.Map[uuid.UUID, None]]
+    #: Ids of qualified objects by module name.
+    _module_to_ids: immu.Map[sn.Name, immu.Map[uuid.UUID, None]]
     _name_to_id: immu.Map[sn.Name, uuid.UUID]
     _shortname_to_id: immu.Map[
         Tuple[Type[so.Object], sn.Name],
@@ -487,21 +520,51 @@ class FlatSchema(Schema):
     ]
     _refs_to: Refs_T
     _generation: int
+    #: Unique for every version of the schema, including its copies in
+    #: other processes.  Most versions are intermediate ones that are
+    #: never sent anywhere, so it is only assigned on first use, see
+    #: get_version_id().
+    _version_id: Optional[uuid.UUID]
 
     def __init__(self) -> None:
         self._id_to_data = immu.Map()
         self._id_to_type = immu.Map()
+        self._type_to_ids = immu.Map()
+        self._module_to_ids = immu.Map()
         self._shortname_to_id = immu.Map()
         self._name_to_id = immu.Map()
         self._globalname_to_id = immu.Map()
         self._refs_to = immu.Map()
         self._generation = 0
+        self._version_id = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The copy must have the same version id.
+        self.get_version_id()
+        return self.__dict__
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if '_version_id' not in state:
+            # Pickled before schema versions were tracked.
+            self._version_id = None
+
+    def get_version_id(self) -> uuid.UUID:
+        if self._version_id is None:
+            self._version_id = uuid.uuid4()
+        return self._version_id
 
     def _replace(
         self,
         *,
         id_to_data: Optional[immu.Map[uuid.UUID, Tuple[Any, ...]]] = None,
         id_to_type: Optional[immu.Map[uuid.UUID, str]] = None,
+        type_to_ids: Optional[
+            immu.Map[Type[so.Object], immu.Map[uuid.UUID, None]]
+        ] = None,
+        module_to_ids: Optional[
+            immu.Map[sn.Name, immu.Map[uuid.UUID, None]]
+        ] = None,
         name_to_id: Optional[immu.Map[sn.Name, uuid.UUID]] = None,
         shortname_to_id: Optional[
             immu.Map[
@@ -526,6 +589,16 @@ class FlatSchema(Schema):
         else:
             new._id_to_type = id_to_type
 
+        if type_to_ids is None:
+            new._type_to_ids = self._type_to_ids
+        else:
+            new._type_to_ids = type_to_ids
+
+        if module_to_ids is None:
+            new._module_to_ids = self._module_to_ids
+        else:
+            new._module_to_ids = module_to_ids
+
         if name_to_id is None:
             new._name_to_id = self._name_to_id
         else:
@@ -547,6 +620,7 @@ class FlatSchema(Schema):
             new._refs_to = refs_to
 
         new._generation = self._generation + 1
+        new._version_id = None
 
         return new
 
@@ -560,10 +634,12 @@ class FlatSchema(Schema):
         immu.Map[sn.Name, uuid.UUID],
         immu.Map[Tuple[Type[so.Object], sn.Name], FrozenSet[uuid.UUID]],
         immu.Map[Tuple[Type[so.Object], sn.Name], uuid.UUID],
+        immu.Map[sn.Name, immu.Map[uuid.UUID, None]],
     ]:
         name_to_id = self._name_to_id
         shortname_to_id = self._shortname_to_id
         globalname_to_id = self._globalname_to_id
+        module_to_ids = self._module_to_ids
         is_global = not issubclass(sclass, so.QualifiedObject)
 
         has_sn_cache = issubclass(sclass, (s_func.Function, s_oper.Operator))
@@ -573,6 +649,8 @@ class FlatSchema(Schema):
                 globalname_to_id = globalname_to_id.delete((sclass, old_name))
             else:
                 name_to_id = name_to_id.delete(old_name)
+                module_to_ids = _index_discard(
+                    module_to_ids, old_name.get_module_name(), obj_id)
             if has_sn_cache:
                 old_shortname = sn.shortname_from_fullname(old_name)
                 sn_key = (sclass, old_shortname)
@@ -609,6 +687,8 @@ class FlatSchema(Schema):
                     raise errors.SchemaError(
                         f'{vn} already exists')
                 name_to_id = name_to_id.set(new_name, obj_id)
+                module_to_ids = _index_add(
+                    module_to_ids, new_name.get_module_name(), obj_id)
 
             if has_sn_cache:
                 new_shortname = sn.shortname_from_fullname(new_name)
@@ -621,7 +701,7 @@ class FlatSchema(Schema):
 
                 shortname_to_id = shortname_to_id.set(sn_key, ids | {obj_id})
 
-        return name_to_id, shortname_to_id, globalname_to_id
+        return name_to_id, shortname_to_id, globalname_to_id, module_to_ids
 
     def update_obj(
         self,
@@ -645,6 +725,7 @@ class FlatSchema(Schema):
         name_to_id = None
         shortname_to_id = None
         globalname_to_id = None
+        module_to_ids = None
         orig_refs = {}
         new_refs = {}
 
@@ -652,7 +733,12 @@ class FlatSchema(Schema):
             field = all_fields[fieldname]
             findex = field.index
             if fieldname == 'name':
-                name_to_id, shortname_to_id, globalname_to_id = (
+                (
+                    name_to_id,
+                    shortname_to_id,
+                    globalname_to_id,
+                    module_to_ids,
+                ) = (
                     self._update_obj_name(
                         obj_id,
                         sclass,
@@ -686,6 +772,7 @@ class FlatSchema(Schema):
         return self._replace(name_to_id=name_to_id,
                              shortname_to_id=shortname_to_id,
                              globalname_to_id=globalname_to_id,
+                             module_to_ids=module_to_ids,
                              id_to_data=id_to_data,
                              refs_to=refs_to)
 
@@ -733,11 +820,15 @@ class FlatSchema(Schema):
         name_to_id = None
         shortname_to_id = None
         globalname_to_id = None
+        module_to_ids = None
         if fieldname == 'name':
             old_name = data[findex]
-            name_to_id, shortname_to_id, globalname_to_id = (
-                self._update_obj_name(obj_id, sclass, old_name, value)
-            )
+            (
+                name_to_id,
+                shortname_to_id,
+                globalname_to_id,
+                module_to_ids,
+            ) = self._update_obj_name(obj_id, sclass, old_name, value)
 
         data_list = list(data)
         data_list[findex] = value
@@ -763,6 +854,7 @@ class FlatSchema(Schema):
             name_to_id=name_to_id,
             shortname_to_id=shortname_to_id,
             globalname_to_id=globalname_to_id,
+            module_to_ids=module_to_ids,
             id_to_data=id_to_data,
             refs_to=refs_to,
         )
@@ -786,13 +878,19 @@ class FlatSchema(Schema):
         name_to_id = None
         shortname_to_id = None
         globalname_to_id = None
+        module_to_ids = None
         orig_value = data[findex]
 
         if orig_value is None:
             return self
 
         if fieldname == 'name':
-            name_to_id, shortname_to_id, globalname_to_id = (
+            (
+                name_to_id,
+                shortname_to_id,
+                globalname_to_id,
+                module_to_ids,
+            ) = (
                 self._update_obj_name(
                     obj_id,
                     sclass,
@@ -820,6 +918,7 @@ class FlatSchema(Schema):
             name_to_id=name_to_id,
             shortname_to_id=shortname_to_id,
             globalname_to_id=globalname_to_id,
+            module_to_ids=module_to_ids,
             id_to_data=id_to_data,
             refs_to=refs_to,
         )
@@ -927,12 +1026,18 @@ class FlatSchema(Schema):
                     new_refs[field.name] = ref
             refs_to = self._update_refs_to(id, sclass, None, new_refs)
 
-        name_to_id, shortname_to_id, globalname_to_id = self._update_obj_name(
-            id, sclass, None, name)
+        (
+            name_to_id,
+            shortname_to_id,
+            globalname_to_id,
+            module_to_ids,
+        ) = self._update_obj_name(id, sclass, None, name)
 
         updates = dict(
             id_to_data=self._id_to_data.set(id, data),
             id_to_type=self._id_to_type.set(id, sclass.__name__),
+            type_to_ids=_index_add(self._type_to_ids, sclass, id),
+            module_to_ids=module_to_ids,
             name_to_id=name_to_id,
             shortname_to_id=shortname_to_id,
             globalname_to_id=globalname_to_id,
@@ -967,11 +1072,15 @@ class FlatSchema(Schema):
         return self.add_raw(id, sclass, data)
 
     def delist(self, name: sn.Name) -> FlatSchema:
+        obj_id = self._name_to_id[name]
         name_to_id = self._name_to_id.delete(name)
+        module_to_ids = _index_discard(
+            self._module_to_ids, name.get_module_name(), obj_id)
         return self._replace(
             name_to_id=name_to_id,
             shortname_to_id=self._shortname_to_id,
             globalname_to_id=self._globalname_to_id,
+            module_to_ids=module_to_ids,
         )
 
     def _delete(self, obj: so.Object) -> FlatSchema:
@@ -986,8 +1095,12 @@ class FlatSchema(Schema):
 
         updates = {}
 
-        name_to_id, shortname_to_id, globalname_to_id = self._update_obj_name(
-            obj.id, sclass, name, None)
+        (
+            name_to_id,
+            shortname_to_id,
+            globalname_to_id,
+            module_to_ids,
+        ) = self._update_obj_name(obj.id, sclass, name, None)
 
         object_ref_fields = sclass.get_object_reference_fields()
         if not object_ref_fields:
@@ -1009,6 +1122,8 @@ class FlatSchema(Schema):
             globalname_to_id=globalname_to_id,
             id_to_data=self._id_to_data.delete(obj.id),
             id_to_type=self._id_to_type.delete(obj.id),
+            type_to_ids=_index_discard(self._type_to_ids, sclass, obj.id),
+            module_to_ids=module_to_ids,
             refs_to=refs_to,
         ))
 
@@ -1399,9 +1514,13 @@ class FlatSchema(Schema):
         type: Optional[Type[so.Object_T]] = None,
         extra_filters: Iterable[Callable[[Schema, so.Object], bool]] = (),
     ) -> SchemaIterator[so.Object_T]:
+        if included_modules:
+            included_modules = frozenset(included_modules)
+        else:
+            included_modules = None
         return SchemaIterator[so.Object_T](
             self,
-            self._id_to_type,
+            self._get_object_ids(type, included_modules),
             exclude_stdlib=exclude_stdlib,
             exclude_global=exclude_global,
             exclude_internal=exclude_internal,
@@ -1413,6 +1532,42 @@ class FlatSchema(Schema):
             extra_filters=extra_filters,
         )
 
+    def _get_object_ids(
+        self,
+        type: Optional[Type[so.Object]],
+        included_modules: Optional[FrozenSet[sn.Name]],
+    ) -> Iterable[uuid.UUID]:
+        """Return ids of the objects get_objects() needs to look at.
+
+        The class and module indexes are used to skip objects that
+        cannot match the *type* and *included_modules* filters, the
+        returned ids still need to be filtered.
+        """
+        candidates: Optional[List[immu.Map[uuid.UUID, None]]] = None
+
+        if included_modules is not None:
+            module_to_ids = self._module_to_ids
+            candidates = [
+                module_to_ids[m] for m in included_modules
+                if m in module_to_ids
+            ]
+
+        if type is not None and type is not so.Object:
+            by_type = [
+                ids for sclass, ids in self._type_to_ids.items()
+                if issubclass(sclass, type)
+            ]
+            if (
+                candidates is None
+                or sum(map(len, by_type)) < sum(map(len, candidates))
+            ):
+                candidates = by_type
+
+        if candidates is None:
+            return self._id_to_type
+        else:
+            return itertools.chain.from_iterable(candidates)
+
     def get_modules(self) -> Tuple[s_mod.Module, ...]:
         modules = []
         for (objtype, _), objid in self._globalname_to_id.items():
@@ -1423,11 +1578,207 @@ class FlatSchema(Schema):
     def get_last_migration(self) -> Optional[s_migrations.Migration]:
         return _get_last_migration(self)
 
+    def get_obj_refs(self, obj: so.Object) -> Set[uuid.UUID]:
+        """Return ids of all objects directly referenced by *obj*."""
+        data = self._id_to_data.get(obj.id)
+        if data is None:
+            return set()
+
+        refs: Set[uuid.UUID] = set()
+        for field in type(obj).get_object_reference_fields():
+            value = data[field.index]
+            if value is not None:
+                refs.update(field.type.schema_refs_from_data(value))
+        return refs
+
+    def get_changed_ids(self, other: FlatSchema) -> Set[uuid.UUID]:
+        """Return ids of objects that differ between *other* and this schema.
+
+        Objects present in only one of the schemas are included.
+        """
+        if other._id_to_data is self._id_to_data:
+            return set()
+
+        changed = set()
+        other_data = other._id_to_data
+        for obj_id, data in self._id_to_data.items():
+            odata = other_data.get(obj_id)
+            # Schemas derived from one another share unchanged data
+            # tuples, so the identity check is the fast path here.
+            if odata is not data and odata != data:
+                changed.add(obj_id)
+
+        our_data = self._id_to_data
+        for obj_id in other_data:
+            if obj_id not in our_data:
+                changed.add(obj_id)
+
+        return changed
+
+    def _get_map_sizes(self) -> Tuple[int, ...]:
+        return (
+            len(self._id_to_data),
+            len(self._id_to_type),
+            len(self._type_to_ids),
+            len(self._module_to_ids),
+            len(self._name_to_id),
+            len(self._shortname_to_id),
+            len(self._globalname_to_id),
+            len(self._refs_to),
+        )
+
+    def get_delta(self, base: FlatSchema) -> FlatSchemaDelta:
+        """Compute a delta that turns *base* into this schema.
+
+        The delta is expressed in terms of raw schema maps, so it is
+        applicable to any copy (e.g. an unpickled one) of *base*.
+        """
+        return FlatSchemaDelta(
+            base_version=base.get_version_id(),
+            version=self.get_version_id(),
+            base_sizes=base._get_map_sizes(),
+            id_to_data=_diff_map(base._id_to_data, self._id_to_data),
+            id_to_type=_diff_map(base._id_to_type, self._id_to_type),
+            name_to_id=_diff_map(base._name_to_id, self._name_to_id),
+            shortname_to_id=_diff_map(
+                base._shortname_to_id, self._shortname_to_id),
+            globalname_to_id=_diff_map(
+                base._globalname_to_id, self._globalname_to_id),
+            refs_to=_diff_map(base._refs_to, self._refs_to),
+        )
+
+    def apply_delta(self, delta: FlatSchemaDelta) -> FlatSchema:
+        """Apply a delta computed by get_delta() with this schema as base."""
+        if delta.base_version != self.get_version_id():
+            raise errors.SchemaError(
+                'cannot apply schema delta: schema does not match '
+                'the delta base')
+
+        new = self._replace(
+            id_to_data=_apply_map_delta(self._id_to_data, delta.id_to_data),
+            id_to_type=_apply_map_delta(self._id_to_type, delta.id_to_type),
+            type_to_ids=self._apply_type_index_delta(delta.id_to_type),
+            module_to_ids=self._apply_module_index_delta(delta.name_to_id),
+            name_to_id=_apply_map_delta(self._name_to_id, delta.name_to_id),
+            shortname_to_id=_apply_map_delta(
+                self._shortname_to_id, delta.shortname_to_id),
+            globalname_to_id=_apply_map_delta(
+                self._globalname_to_id, delta.globalname_to_id),
+            refs_to=_apply_map_delta(self._refs_to, delta.refs_to),
+        )
+        # The result is a copy of the schema the delta was taken from.
+        new._version_id = delta.version
+        return new
+
+    def _apply_type_index_delta(
+        self,
+        id_to_type: MapDelta,
+    ) -> immu.Map[Type[so.Object], immu.Map[uuid.UUID, None]]:
+        updated, deleted = id_to_type
+        type_to_ids = self._type_to_ids
+        for obj_id in deleted:
+            sclass = so.ObjectMeta.get_schema_class(self._id_to_type[obj_id])
+            type_to_ids = _index_discard(type_to_ids, sclass, obj_id)
+        for obj_id, sclass_name in updated:
+            old_sclass_name = self._id_to_type.get(obj_id)
+            if old_sclass_name is not None:
+                sclass = so.ObjectMeta.get_schema_class(old_sclass_name)
+                type_to_ids = _index_discard(type_to_ids, sclass, obj_id)
+            sclass = so.ObjectMeta.get_schema_class(sclass_name)
+            type_to_ids = _index_add(type_to_ids, sclass, obj_id)
+        return type_to_ids
+
+    def _apply_module_index_delta(
+        self,
+        name_to_id: MapDelta,
+    ) -> immu.Map[sn.Name, immu.Map[uuid.UUID, None]]:
+        updated, deleted = name_to_id
+        module_to_ids = self._module_to_ids
+        for name in deleted:
+            module_to_ids = _index_discard(
+                module_to_ids, name.get_module_name(), self._name_to_id[name])
+        for name, obj_id in updated:
+            old_id = self._name_to_id.get(name)
+            if old_id is not None:
+                module_to_ids = _index_discard(
+                    module_to_ids, name.get_module_name(), old_id)
+            module_to_ids = _index_add(
+                module_to_ids, name.get_module_name(), obj_id)
+        return module_to_ids
+
     def __repr__(self) -> str:
         return (
             f'<{type(self).__name__} gen:{self._generation} at {id(self):#x}>')
 
 
+_MISSING = object()
+
+
+def _index_add(
+    index: immu.Map[Any, immu.Map[uuid.UUID, None]],
+    key: Any,
+    obj_id: uuid.UUID,
+) -> immu.Map[Any, immu.Map[uuid.UUID, None]]:
+    try:
+        ids = index[key]
+    except KeyError:
+        ids = immu.Map(((obj_id, None),))
+    else:
+        ids = ids.set(obj_id, None)
+    return index.set(key, ids)
+
+
+def _index_discard(
+    index: immu.Map[Any, immu.Map[uuid.UUID, None]],
+    key: Any,
+    obj_id: uuid.UUID,
+) -> immu.Map[Any, immu.Map[uuid.UUID, None]]:
+    try:
+        ids = index[key]
+    except KeyError:
+        return index
+    if obj_id not in ids:
+        return index
+    ids = ids.delete(obj_id)
+    if ids:
+        return index.set(key, ids)
+    else:
+        return index.delete(key)
+
+
+def _diff_map(old: immu.Map[Any, Any], new: immu.Map[Any, Any]) -> MapDelta:
+    if old is new:
+        return (), ()
+
+    updated = []
+    for key, value in new.items():
+        old_value = old.get(key, _MISSING)
+        # Schemas derived from one another share unchanged values,
+        # so the identity check is the fast path here.
+        if old_value is not value and old_value != value:
+            updated.append((key, value))
+
+    deleted = tuple(key for key in old if key not in new)
+
+    return tuple(updated), deleted
+
+
+def _apply_map_delta(
+    m: immu.Map[Any, Any],
+    delta: MapDelta,
+) -> immu.Map[Any, Any]:
+    updated, deleted = delta
+    if not updated and not deleted:
+        return m
+
+    with m.mutate() as mm:
+        for key in deleted:
+            del mm[key]
+        for key, value in updated:
+            mm[key] = value
+        return mm.finish()
+
+
 class SchemaIterator(Generic[so.Object_T]):
     def __init__(
         self,
@@ -1527,6 +1878,9 @@ class ChainedSchema(Schema):
         self._top_schema = top_schema
         self._global_schema = global_schema
 
+    def get_base_schema(self) -> FlatSchema:
+        return self._base_schema
+
     def get_top_schema(self) -> FlatSchema:
         return self._top_schema
 
@@ -1913,12 +2267,16 @@ class ChainedSchema(Schema):
         type: Optional[Type[so.Object_T]] = None,
         extra_filters: Iterable[Callable[[Schema, so.Object], bool]] = (),
     ) -> SchemaIterator[so.Object_T]:
+        if included_modules:
+            included_modules = frozenset(included_modules)
+        else:
+            included_modules = None
         return SchemaIterator[so.Object_T](
             self,
             itertools.chain(
-                self._base_schema._id_to_type,
-                self._top_schema._id_to_type,
-                self._global_schema._id_to_type,
+                self._base_schema._get_object_ids(type, included_modules),
+                self._top_schema._get_object_ids(type, included_modules),
+                self._global_schema._get_object_ids(type, included_modules),
             ),
             exclude_global=exclude_global,
             exclude_stdlib=exclude_stdlib,
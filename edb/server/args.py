@@ -20,6 +20,7 @@
 from __future__ import annotations
 from typing import *
 
+import json
 import logging
 import os
 import pathlib
@@ -67,6 +68,13 @@ class StartupScript(NamedTuple):
     user: str
 
 
+class WarmupQuery(NamedTuple):
+
+    text: str
+    expect_one: bool
+    output_format: str
+
+
 class ServerSecurityMode(enum.StrEnum):
 
     Strict = "strict"
@@ -174,10 +182,19 @@ class ServerConfig(NamedTuple):
     daemon_user: str
     daemon_group: str
     runstate_dir: pathlib.Path
+    cache_dir: Optional[pathlib.Path]
+    query_cache_warmup: Mapping[str, List[WarmupQuery]]
+    query_cache_manifest_size: int
+    wait_for_query_cache_warmup: bool
+    eager_introspection: Tuple[str, ...]
+    eager_introspection_concurrency: int
     max_backend_connections: Optional[int]
+    backend_standby_connections: int
+    dump_jobs: int
     compiler_pool_size: int
     compiler_pool_mode: CompilerPoolMode
     compiler_pool_addr: str
+    slow_compile_log_threshold: Optional[float]
     echo_runtime_info: bool
     emit_server_status: str
     temp_dir: bool
@@ -380,6 +397,55 @@ def _validate_tenant_id(ctx, param, value):
     return value
 
 
+def _load_query_cache_warmup(
+    path: Optional[pathlib.Path],
+) -> Dict[str, List[WarmupQuery]]:
+    if path is None:
+        return {}
+
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        abort(f'could not read --query-cache-warmup-file: {e}')
+
+    if not isinstance(data, dict):
+        abort(
+            '--query-cache-warmup-file must contain a JSON object mapping '
+            'database names to lists of queries')
+
+    rv = {}
+    for dbname, queries in data.items():
+        if not isinstance(queries, list):
+            abort(
+                f'invalid --query-cache-warmup-file: queries of database '
+                f'{dbname!r} must be a list')
+        rv[dbname] = []
+        for query in queries:
+            if isinstance(query, str):
+                query = {'query': query}
+            if (
+                not isinstance(query, dict)
+                or not isinstance(query.get('query'), str)
+            ):
+                abort(
+                    f'invalid --query-cache-warmup-file: a query of database '
+                    f'{dbname!r} must be a string or an object with a string '
+                    f'"query" key')
+            output_format = query.get('output_format', 'binary')
+            if output_format not in {'binary', 'json', 'json_elements'}:
+                abort(
+                    f'invalid --query-cache-warmup-file: unsupported output '
+                    f'format {output_format!r}')
+            rv[dbname].append(WarmupQuery(
+                text=query['query'],
+                expect_one=bool(query.get('expect_one', False)),
+                output_format=output_format,
+            ))
+
+    return rv
+
+
 def _status_sink_file(path: str) -> Callable[[str], None]:
     def _writer(status: str) -> None:
         try:
@@ -572,6 +638,41 @@ _server_options = [
         help=f'directory where UNIX sockets and other temporary '
              f'runtime files will be placed ({_get_runstate_dir_default()} '
              f'by default)'),
+    click.option(
+        '--cache-dir', type=PathPath(), default=None,
+        envvar="EDGEDB_SERVER_CACHE_DIR",
+        help='directory where the server keeps data that can be recomputed, '
+             'such as compiled queries, to speed up restarts.  Caching on '
+             'disk is disabled if not set.'),
+    click.option(
+        '--query-cache-warmup-file', type=PathPath(), default=None,
+        help='JSON file with queries to compile and cache on startup.  '
+             'The file maps database names to lists of queries; a query '
+             'is either a string or an object with the "query" key and '
+             'optional "expect_one" and "output_format" keys.'),
+    click.option(
+        '--query-cache-manifest-size', type=int, default=0, metavar='NUM',
+        help='Record up to NUM most frequently used queries of every '
+             'database in --cache-dir and compile them ahead of use when '
+             'the server starts or the schema changes.  Disabled by '
+             'default.'),
+    click.option(
+        '--wait-for-query-cache-warmup', is_flag=True,
+        help='Report the server as not ready until the queries from '
+             '--query-cache-warmup-file and the query cache manifests '
+             'are compiled.'),
+    click.option(
+        '--eager-introspection', multiple=True, metavar='PATTERN',
+        help='Introspect the schemas of the databases matching the glob '
+             'PATTERN when the server starts, rather than on the first '
+             'connection to each of them.  Can be specified multiple '
+             'times; use "*" for all databases.  The server reports itself '
+             'as not ready until the introspection is done.'),
+    click.option(
+        '--eager-introspection-concurrency', type=int, default=4,
+        metavar='NUM',
+        help='The maximum NUM of databases introspected at once when '
+             '--eager-introspection is used.  Defaults to 4.'),
     click.option(
         '--max-backend-connections', type=int, metavar='NUM',
         help=f'The maximum NUM of connections this EdgeDB instance could make '
@@ -581,6 +682,18 @@ _server_options = [
              f'Postgres or pg_settings.max_connections for remote Postgres, '
              f'minus the NUM of --reserved-pg-connections.',
         callback=_validate_max_backend_connections),
+    click.option(
+        '--backend-standby-connections', type=int, default=0,
+        metavar='NUM',
+        help='Keep up to NUM idle backend connections per database ready '
+             'ahead of the demand predicted from recent usage, so that '
+             'bursts of queries don\'t wait for new connections.  '
+             'Disabled by default.'),
+    click.option(
+        '--dump-jobs', type=int, default=1, metavar='NUM',
+        help='Dump the data of a database over up to NUM backend '
+             'connections at once.  All of them see the same snapshot of '
+             'the database, so the dump stays consistent.  Defaults to 1.'),
     click.option(
         '--compiler-pool-size', type=int,
         callback=_validate_compiler_pool_size),
@@ -603,6 +716,11 @@ _server_options = [
              f'only used if --compiler-pool-mode=remote. Default host is '
              f'localhost, port is {defines.EDGEDB_REMOTE_COMPILER_PORT}',
     ),
+    click.option(
+        '--slow-compile-log-threshold', type=float, metavar='SECONDS',
+        help='Log compilations of queries taking longer than SECONDS, with '
+             'the time spent in every compiler phase.  Disabled by '
+             'default.'),
     click.option(
         '--echo-runtime-info', type=bool, default=False, is_flag=True,
         help='[DEPREATED, use --emit-server-status] '
@@ -1181,6 +1299,29 @@ def parse_args(**kwargs: Any):
             ),
         )
 
+    if kwargs['query_cache_manifest_size'] < 0:
+        abort('--query-cache-manifest-size must not be negative')
+    if kwargs['query_cache_manifest_size'] and not kwargs['cache_dir']:
+        abort('--query-cache-manifest-size requires --cache-dir')
+
+    if kwargs['eager_introspection_concurrency'] < 1:
+        abort('--eager-introspection-concurrency must be at least 1')
+
+    if kwargs['backend_standby_connections'] < 0:
+        abort('--backend-standby-connections must not be negative')
+
+    if (
+        kwargs['slow_compile_log_threshold'] is not None
+        and kwargs['slow_compile_log_threshold'] < 0
+    ):
+        abort('--slow-compile-log-threshold must not be negative')
+
+    if kwargs['dump_jobs'] < 1:
+        abort('--dump-jobs must be at least 1')
+
+    query_cache_warmup = _load_query_cache_warmup(
+        kwargs.pop('query_cache_warmup_file'))
+
     status_sinks = []
 
     if status_sink_addrs := kwargs['emit_server_status']:
@@ -1231,5 +1372,6 @@ def parse_args(**kwargs: Any):
     return ServerConfig(
         startup_script=startup_script,
         status_sinks=status_sinks,
+        query_cache_warmup=query_cache_warmup,
         **kwargs,
     )
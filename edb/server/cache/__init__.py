@@ -19,7 +19,7 @@
 
 from __future__ import annotations
 
-from .stmt_cache import StatementsCache
+from .stmt_cache import StatementsCache, HotStatements
 
 
-__all__ = ('StatementsCache',)
+__all__ = ('StatementsCache', 'HotStatements')
@@ -0,0 +1,101 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Helpers shared by the caches the server keeps on disk.
+
+Every cache file starts with a header holding a magic string, the format
+version of the file and the catalog version of the server that wrote it,
+followed by fields specific to the cache.  Files are written to a
+temporary file first and then renamed, so readers never see a partially
+written file.
+"""
+
+
+from __future__ import annotations
+from typing import *
+
+import os
+import pathlib
+import struct
+import tempfile
+
+from edb import buildmeta
+
+
+class FileHeader:
+    """The header of the files of one cache."""
+
+    def __init__(self, magic: bytes, version: int, fields: str = '') -> None:
+        self._magic = magic
+        self._version = version
+        self._struct = struct.Struct(f'!4sHQ{fields}')
+
+    @property
+    def size(self) -> int:
+        return self._struct.size
+
+    def pack(self, *fields: Any) -> bytes:
+        return self._struct.pack(
+            self._magic,
+            self._version,
+            buildmeta.EDGEDB_CATALOG_VERSION,
+            *fields,
+        )
+
+    def unpack(self, data: bytes | memoryview) -> Optional[Tuple[Any, ...]]:
+        """Return the cache specific fields of the header of *data*.
+
+        Returns None if *data* is not a file of this cache, or if it was
+        written in another format or by a server of another catalog
+        version.
+        """
+        if len(data) < self._struct.size:
+            return None
+        magic, version, catver, *fields = self._struct.unpack_from(data)
+        if (
+            magic != self._magic
+            or version != self._version
+            or catver != buildmeta.EDGEDB_CATALOG_VERSION
+        ):
+            return None
+        return tuple(fields)
+
+
+def write_atomic(path: pathlib.Path, *chunks: bytes | memoryview) -> None:
+    """Replace the file at *path* with the concatenation of *chunks*.
+
+    Raises OSError if the file could not be written, in which case the
+    previous contents of the file are left intact.
+    """
+    f = tempfile.NamedTemporaryFile(mode='wb', dir=path.parent, delete=False)
+    try:
+        with f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(f.name, path)
+    except OSError:
+        discard(pathlib.Path(f.name))
+        raise
+
+
+def discard(path: pathlib.Path) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
@@ -0,0 +1,221 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""On-disk store of compiled query unit groups.
+
+Every database gets its own directory and every schema version of that
+database gets a subdirectory in it.  Entries are single files named after
+a digest of everything that affects compilation of a query, so a lookup
+is a single ``open()`` and there is no index to keep consistent.  When the
+schema version changes the stale subdirectories are removed.
+"""
+
+
+from __future__ import annotations
+from typing import *
+
+import hashlib
+import logging
+import pathlib
+import pickle
+import shutil
+import uuid
+
+from . import files
+
+
+logger = logging.getLogger('edb.server')
+
+# Bump whenever the layout of the entry files changes.
+FORMAT_VERSION = 1
+
+# The header is followed by the schema version of the entry.
+_HEADER = files.FileHeader(b'EQCC', FORMAT_VERSION, '16s')
+
+
+def _config_fingerprint(config: Mapping[str, Any]) -> list[Any]:
+    # Immutable maps and frozensets iterate in hash order, which differs
+    # between processes, so sort everything for the digest to be stable.
+    result = []
+    for name in sorted(config):
+        value = config[name]
+        value = getattr(value, 'value', value)
+        if isinstance(value, (frozenset, set)):
+            value = sorted(value, key=repr)
+        result.append((name, repr(value)))
+    return result
+
+
+def make_key(
+    query_cache_key: bytes,
+    *,
+    protocol_version: Tuple[int, int],
+    output_format: Any,
+    input_format: Any,
+    flags: Tuple[Any, ...],
+    modaliases: Mapping[Optional[str], str],
+    session_config: Mapping[str, Any],
+    database_config: Mapping[str, Any],
+    system_config: Mapping[str, Any],
+) -> str:
+    """Compute the file name of a cache entry.
+
+    The schema version is not a part of the key, as it is encoded in the
+    entry directory instead.
+    """
+    h = hashlib.blake2b(query_cache_key, digest_size=20)
+    h.update(repr((
+        protocol_version,
+        str(output_format),
+        str(input_format),
+        flags,
+        sorted(modaliases.items(), key=lambda i: (i[0] or '', i[1])),
+        _config_fingerprint(session_config),
+        _config_fingerprint(database_config),
+        _config_fingerprint(system_config),
+    )).encode())
+    return h.hexdigest()
+
+
+class PersistentQueryCache:
+    """Compiled queries of a single database, persisted on disk."""
+
+    def __init__(self, path: pathlib.Path, dbname: str) -> None:
+        dbkey = hashlib.blake2b(dbname.encode(), digest_size=16).hexdigest()
+        self._root = path / dbkey
+        self._dir: Optional[pathlib.Path] = None
+        self._version: Optional[uuid.UUID] = None
+        self._broken = False
+
+    @property
+    def schema_version(self) -> Optional[uuid.UUID]:
+        return self._version
+
+    def set_schema_version(self, version: uuid.UUID) -> None:
+        """Point the cache at entries compiled for *version*.
+
+        This does not touch the disk, call :meth:`prune` afterwards.
+        """
+        self._version = version
+        self._dir = self._root / version.hex
+
+    def prune(self) -> None:
+        """Prepare the disk for the current schema version.
+
+        Entries for any other schema version are discarded.  This is
+        safe to call from a thread other than the one switching the
+        schema version.
+        """
+        version = self._version
+        if version is None or self._broken:
+            return
+
+        try:
+            (self._root / version.hex).mkdir(parents=True, exist_ok=True)
+            for entry in self._root.iterdir():
+                # Re-check, the version might have been switched again.
+                current = self._version
+                if current is None or entry.name != current.hex:
+                    shutil.rmtree(entry, ignore_errors=True)
+        except OSError:
+            self._disable()
+
+    def get(self, key: str) -> Any:
+        if self._dir is None or self._broken:
+            return None
+
+        path = self._dir / key
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            self._disable()
+            return None
+
+        fields = _HEADER.unpack(data)
+        if (
+            fields is None
+            or self._version is None
+            or fields[0] != self._version.bytes
+        ):
+            files.discard(path)
+            return None
+
+        try:
+            return pickle.loads(memoryview(data)[_HEADER.size:])
+        except Exception:
+            logger.warning(
+                'could not load persisted compiled query %s', path,
+                exc_info=True)
+            files.discard(path)
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        if self._version is not None:
+            self.put_many(self._version, {key: value})
+
+    def put_many(self, version: uuid.UUID, entries: Mapping[str, Any]) -> None:
+        """Store *entries* compiled for the schema *version*.
+
+        This is safe to call from a thread other than the one switching
+        the schema version; entries for a version that is no longer
+        current are dropped.
+        """
+        for key, value in entries.items():
+            if version != self._version or self._broken:
+                return
+            self._put(version, key, value)
+
+    def _put(self, version: uuid.UUID, key: str, value: Any) -> None:
+        header = _HEADER.pack(version.bytes)
+
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Should not normally happen, but a query that cannot be
+            # persisted is still perfectly usable from the memory cache.
+            logger.debug('could not persist compiled query', exc_info=True)
+            return
+
+        try:
+            files.write_atomic(self._root / version.hex / key, header, data)
+        except FileNotFoundError:
+            # The version directory was pruned under us; the next
+            # schema version switch will recreate it.
+            pass
+        except OSError:
+            self._disable()
+
+    def clear(self) -> None:
+        """Discard all entries of the database.
+
+        This blocks on the disk, so the server runs it in an executor.
+        """
+        self._version = None
+        self._dir = None
+        shutil.rmtree(self._root, ignore_errors=True)
+
+    def _disable(self) -> None:
+        if not self._broken:
+            logger.warning(
+                'persistent query cache at %s is not usable, disabling it',
+                self._root, exc_info=True)
+            self._broken = True
@@ -0,0 +1,114 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""On-disk snapshots of introspected user schemas.
+
+Every database gets a single file holding the pickled user schema along
+with the schema version it was introspected at.  A snapshot is only used
+if that version is still the current one in the backend, so loading it is
+equivalent to reflecting the schema from the database.
+"""
+
+
+from __future__ import annotations
+from typing import *
+
+import hashlib
+import logging
+import pathlib
+import pickle
+import uuid
+
+from . import files
+
+if TYPE_CHECKING:
+    from edb.schema import schema as s_schema
+
+
+logger = logging.getLogger('edb.server')
+
+# Bump whenever the layout of the snapshot files changes.
+FORMAT_VERSION = 1
+
+# The header is followed by the schema version of the snapshot.
+_HEADER = files.FileHeader(b'EUSC', FORMAT_VERSION, '16s')
+
+
+class SchemaCache:
+    """User schemas of all databases, persisted on disk."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self._root = path
+
+    def _path(self, dbname: str) -> pathlib.Path:
+        dbkey = hashlib.blake2b(dbname.encode(), digest_size=16).hexdigest()
+        return self._root / dbkey
+
+    def load(
+        self,
+        dbname: str,
+        version: uuid.UUID,
+    ) -> Optional[s_schema.FlatSchema]:
+        """Load the schema of *dbname* if it was saved at *version*."""
+        path = self._path(dbname)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.warning(
+                'could not load cached schema %s', path, exc_info=True)
+            return None
+
+        fields = _HEADER.unpack(data)
+        if fields is None:
+            files.discard(path)
+            return None
+        elif fields[0] != version.bytes:
+            # Stale, but will be overwritten once the schema is reflected.
+            return None
+
+        try:
+            return pickle.loads(memoryview(data)[_HEADER.size:])
+        except Exception:
+            logger.warning(
+                'could not load cached schema %s', path, exc_info=True)
+            files.discard(path)
+            return None
+
+    def save(
+        self,
+        dbname: str,
+        version: uuid.UUID,
+        schema: s_schema.FlatSchema,
+    ) -> None:
+        path = self._path(dbname)
+        header = _HEADER.pack(version.bytes)
+        data = pickle.dumps(schema, protocol=pickle.HIGHEST_PROTOCOL)
+
+        try:
+            self._root.mkdir(parents=True, exist_ok=True)
+            files.write_atomic(path, header, data)
+        except OSError:
+            logger.warning(
+                'could not save cached schema %s', path, exc_info=True)
+
+    def discard(self, dbname: str) -> None:
+        files.discard(self._path(dbname))
@@ -0,0 +1,142 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Local copies of the standard library schemas.
+
+The std schema, the reflection schema and the schema class layout are
+stored in the backend as pickles.  They rarely change, so the server
+keeps them in a file in its cache directory and reads that file, which
+is memory-mapped, instead of fetching them on every start.  The file is
+named after the catalog version and a checksum of the pickles in the
+backend, as the std schema of a bootstrap in test mode differs from a
+regular one of the same catalog version.
+
+The pickles are also passed around as :class:`LazySchema` objects, which
+are unpickled on first use only.  Sending one to a compiler worker costs
+a copy of the pickle instead of pickling the whole schema again.  Most
+workers never compile DDL, so they never need the reflection schema.
+"""
+
+
+from __future__ import annotations
+from typing import *
+
+import logging
+import mmap
+import pathlib
+import pickle
+
+from edb import buildmeta
+
+from . import files
+
+
+logger = logging.getLogger('edb.server')
+
+# Bump whenever the layout of the file changes.
+FORMAT_VERSION = 1
+
+# The header is followed by the lengths of the three pickles.
+_HEADER = files.FileHeader(b'ESTD', FORMAT_VERSION, 'QQQ')
+
+_unset = object()
+
+
+class LazySchema:
+    """A pickled object that is only unpickled on first access."""
+
+    def __init__(self, pickled: bytes | memoryview) -> None:
+        self._pickled = pickled
+        self._obj: Any = _unset
+
+    def materialize(self) -> Any:
+        if self._obj is _unset:
+            self._obj = pickle.loads(self._pickled)
+        return self._obj
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (type(self), (bytes(self._pickled),))
+
+
+def materialize(obj: Any) -> Any:
+    if isinstance(obj, LazySchema):
+        return obj.materialize()
+    else:
+        return obj
+
+
+class StdSchemaCache:
+    """The std schema pickles of the current catalog version, on disk.
+
+    *checksum* identifies the pickles stored in the backend.
+    """
+
+    def __init__(self, path: pathlib.Path, checksum: str) -> None:
+        self._root = path
+        self._path = (
+            path / f'{buildmeta.EDGEDB_CATALOG_VERSION}-{checksum}.bin')
+
+    def load(self) -> Optional[Tuple[memoryview, memoryview, memoryview]]:
+        """Return the std, reflection schema and class layout pickles."""
+        try:
+            with open(self._path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning(
+                'could not load cached std schema %s', self._path,
+                exc_info=True)
+            return None
+
+        buf = memoryview(data)
+        fields = _HEADER.unpack(buf)
+        if fields is not None:
+            std_len, refl_len, layout_len = fields
+            if len(buf) == _HEADER.size + std_len + refl_len + layout_len:
+                pos = _HEADER.size
+                std = buf[pos:pos + std_len]
+                pos += std_len
+                refl = buf[pos:pos + refl_len]
+                pos += refl_len
+                layout = buf[pos:pos + layout_len]
+                return std, refl, layout
+
+        buf.release()
+        data.close()
+        files.discard(self._path)
+        return None
+
+    def save(self, std: bytes, refl: bytes, layout: bytes) -> None:
+        header = _HEADER.pack(len(std), len(refl), len(layout))
+
+        try:
+            self._root.mkdir(parents=True, exist_ok=True)
+            files.write_atomic(self._path, header, std, refl, layout)
+        except OSError:
+            logger.warning(
+                'could not save cached std schema %s', self._path,
+                exc_info=True)
+            return
+
+        # Files of other catalog versions or bootstraps are of no use
+        # anymore.
+        for entry in self._root.iterdir():
+            if entry.suffix == '.bin' and entry != self._path:
+                files.discard(entry)
@@ -20,11 +20,27 @@
 cdef class StatementsCache:
 
     cdef:
-        object _dict
+        object _probation
+        object _protected
         int _maxsize
-        object _dict_move_to_end
-        object _dict_get
+        int _protected_maxsize
+
+    cdef _promote(self, key, o)
 
     cpdef get(self, key, default)
     cpdef needs_cleanup(self)
     cpdef cleanup_one(self)
+
+
+cdef class HotStatements:
+
+    cdef:
+        readonly object dbname
+        int _maxsize
+        dict _stmts
+        int _uses
+
+    cdef _age(self)
+
+    cpdef record(self, key, sql, dbver)
+    cpdef list get_hot(self, dbver)
@@ -22,71 +22,156 @@ import collections
 
 cdef object _LRU_MARKER = object()
 
+# Share of the cache reserved for statements that were used more than once.
+DEF PROTECTED_SHARE = 0.8
+
 
 cdef class StatementsCache:
 
-    # We use an OrderedDict for LRU implementation.  Operations:
+    # A segmented LRU cache: entries start in the "probation" segment and
+    # are promoted to the "protected" segment when they are hit again.
+    # Both segments are OrderedDicts used as LRU lists:
     #
-    # * We use a simple `__setitem__` to push a new entry:
-    #       `entries[key] = new_entry`
-    #   That will push `new_entry` to the *end* of the entries dict.
+    # * New entries are pushed to the *end* of the probation dict.
     #
-    # * When we have a cache hit, we call
-    #       `entries.move_to_end(key, last=True)`
-    #   to move the entry to the *end* of the entries dict.
+    # * When we have a cache hit, the entry is moved to the *end* of the
+    #   protected dict.  If that makes the protected segment too large,
+    #   its least recently used entry is demoted to the *end* of the
+    #   probation dict.
     #
-    # * When we need to remove entries to maintain `max_size`, we call
-    #       `entries.popitem(last=False)`
-    #   to remove an entry from the *beginning* of the entries dict.
+    # * When we need to remove entries to maintain `max_size`, we remove
+    #   them from the *beginning* of the probation dict, and only when it
+    #   is empty, from the *beginning* of the protected dict.
     #
-    # So new entries and hits are always promoted to the end of the
-    # entries dict, whereas the unused one will group in the
-    # beginning of it.
+    # So a burst of statements that are used only once cannot push the
+    # frequently used ones out of the cache, which a plain LRU would do.
 
     def __init__(self, *, maxsize):
         if maxsize <= 0:
             raise ValueError(
                 f'maxsize is expected to be greater than 0, got {maxsize}')
 
-        self._dict = collections.OrderedDict()
-        self._dict_move_to_end = self._dict.move_to_end
-        self._dict_get = self._dict.get
+        self._probation = collections.OrderedDict()
+        self._protected = collections.OrderedDict()
         self._maxsize = maxsize
+        self._protected_maxsize = max(<int>(maxsize * PROTECTED_SHARE), 1)
+
+    cdef _promote(self, key, o):
+        del self._probation[key]
+        self._protected[key] = o
+        if len(self._protected) > self._protected_maxsize:
+            k, v = self._protected.popitem(last=False)
+            self._probation[k] = v
 
     cpdef get(self, key, default):
-        o = self._dict_get(key, _LRU_MARKER)
+        o = self._protected.get(key, _LRU_MARKER)
+        if o is not _LRU_MARKER:
+            self._protected.move_to_end(key)  # last=True
+            return o
+        o = self._probation.get(key, _LRU_MARKER)
         if o is _LRU_MARKER:
             return default
-        self._dict_move_to_end(key)  # last=True
+        self._promote(key, o)
         return o
 
     cpdef needs_cleanup(self):
-        return len(self._dict) > self._maxsize
+        return len(self._probation) + len(self._protected) > self._maxsize
 
     cpdef cleanup_one(self):
-        k, _ = self._dict.popitem(last=False)
+        if self._probation:
+            k, _ = self._probation.popitem(last=False)
+        else:
+            k, _ = self._protected.popitem(last=False)
         return k
 
     def __getitem__(self, key):
-        o = self._dict[key]
-        self._dict_move_to_end(key)  # last=True
+        o = self.get(key, _LRU_MARKER)
+        if o is _LRU_MARKER:
+            raise KeyError(key)
         return o
 
     def __setitem__(self, key, o):
-        if key in self._dict:
-            self._dict[key] = o
-            self._dict_move_to_end(key)  # last=True
+        if key in self._protected:
+            self._protected[key] = o
+            self._protected.move_to_end(key)  # last=True
         else:
-            self._dict[key] = o
+            self._probation[key] = o
+            self._probation.move_to_end(key)  # last=True
 
     def __delitem__(self, key):
-        del self._dict[key]
+        try:
+            del self._protected[key]
+        except KeyError:
+            del self._probation[key]
 
     def __contains__(self, key):
-        return key in self._dict
+        return key in self._protected or key in self._probation
 
     def __len__(self):
-        return len(self._dict)
+        return len(self._probation) + len(self._protected)
 
     def __iter__(self):
-        return iter(self._dict)
+        yield from self._probation
+        yield from self._protected
+
+
+cdef class HotStatements:
+
+    # Tracks how often the prepared statements of one database are
+    # executed, so that new backend connections to the database can
+    # prepare the most frequently used ones ahead of use.  Counts are
+    # halved periodically, so that the hot set follows the workload.
+
+    def __init__(self, dbname, *, maxsize):
+        if maxsize <= 0:
+            raise ValueError(
+                f'maxsize is expected to be greater than 0, got {maxsize}')
+
+        self.dbname = dbname
+        self._maxsize = maxsize
+        # key -> [number of uses, sql, dbver]
+        self._stmts = {}
+        self._uses = 0
+
+    cpdef record(self, key, sql, dbver):
+        entry = self._stmts.get(key)
+        if entry is None:
+            self._stmts[key] = [1, sql, dbver]
+        else:
+            entry[0] += 1
+            entry[2] = dbver
+        self._uses += 1
+        if (
+            self._uses >= self._maxsize * 16
+            or len(self._stmts) > self._maxsize * 4
+        ):
+            self._age()
+
+    cdef _age(self):
+        self._uses = 0
+        for key in list(self._stmts):
+            entry = self._stmts[key]
+            entry[0] >>= 1
+            if not entry[0]:
+                del self._stmts[key]
+        if len(self._stmts) > self._maxsize * 2:
+            hot = []
+            for key, entry in self._stmts.items():
+                hot.append((entry[0], key, entry))
+            hot.sort(reverse=True)
+            self._stmts = {}
+            for _, key, entry in hot[:self._maxsize * 2]:
+                self._stmts[key] = entry
+
+    cpdef list get_hot(self, dbver):
+        """Return (key, sql) of the most used statements at *dbver*."""
+        hot = []
+        for key, entry in self._stmts.items():
+            # A statement used only once is not hot.
+            if entry[2] == dbver and entry[0] > 1:
+                hot.append((entry[0], key, entry[1]))
+        hot.sort(reverse=True)
+        return [(key, sql) for _, key, sql in hot[:self._maxsize]]
+
+    def __len__(self):
+        return len(self._stmts)
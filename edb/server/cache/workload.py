@@ -0,0 +1,114 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Manifests of the most frequently used queries of databases.
+
+A manifest is a JSON file listing the queries along with everything
+needed to compile them the way clients requested them, so that the
+query cache of a database can be warmed up after a server restart.
+"""
+
+
+from __future__ import annotations
+from typing import *
+
+import collections
+import hashlib
+import json
+import logging
+import pathlib
+
+from . import files
+
+
+logger = logging.getLogger('edb.server')
+
+# Bump whenever the layout of the manifest changes.
+FORMAT_VERSION = 2
+
+
+class QueryWorkload:
+    """Usage counts of the queries of a single database."""
+
+    def __init__(self, path: pathlib.Path, dbname: str, size: int) -> None:
+        dbkey = hashlib.blake2b(dbname.encode(), digest_size=16).hexdigest()
+        self._path = path / f'{dbkey}.json'
+        self._dbname = dbname
+        self._size = size
+        self._uses: collections.Counter[Any] = collections.Counter()
+        self._dirty = False
+
+    def record(self, key: Any, uses: int = 1) -> None:
+        self._uses[key] += uses
+        self._dirty = True
+        if len(self._uses) > self._size * 4:
+            # Forget about the rarely used queries, so that the counter
+            # does not grow without bound.
+            self._uses = collections.Counter(
+                dict(self._uses.most_common(self._size * 2)))
+
+    def most_common(self) -> List[Tuple[Any, int]]:
+        return self._uses.most_common(self._size)
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Load the entries saved by a previous run of the server."""
+        try:
+            with open(self._path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError):
+            logger.warning(
+                'could not load query workload manifest %s', self._path,
+                exc_info=True)
+            return []
+
+        if (
+            not isinstance(data, dict)
+            or data.get('version') != FORMAT_VERSION
+            or data.get('database') != self._dbname
+        ):
+            return []
+
+        return data.get('queries', [])[:self._size]
+
+    def save(self, entries: List[Dict[str, Any]]) -> None:
+        if not self._dirty:
+            return
+
+        data = {
+            'version': FORMAT_VERSION,
+            'database': self._dbname,
+            'queries': entries,
+        }
+
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            files.write_atomic(self._path, json.dumps(data).encode())
+        except OSError:
+            logger.warning(
+                'could not save query workload manifest %s', self._path,
+                exc_info=True)
+        else:
+            self._dirty = False
+
+    def clear(self) -> None:
+        self._uses.clear()
+        self._dirty = False
+        files.discard(self._path)
@@ -23,11 +23,13 @@ from __future__ import annotations
 from typing import *
 
 import collections
+import contextlib
 import dataclasses
 import json
 import hashlib
 import pickle
 import textwrap
+import time
 import uuid
 
 import immutables
@@ -76,8 +78,10 @@ from edb.pgsql import params as pg_params
 from edb.pgsql import types as pg_types
 
 from edb.server import config
+from edb.server.cache import stdschema
 
 from . import dbstate
+from . import dependencies
 from . import enums
 from . import sertypes
 from . import status
@@ -120,6 +124,9 @@ class CompileContext:
     bootstrap_mode: bool = False
     internal_schema_mode: bool = False
     log_ddl_as_migrations: bool = True
+    # Seconds spent in every compilation phase, shared by the copies
+    # of the context made while compiling.
+    timings: Dict[str, float] = dataclasses.field(default_factory=dict)
 
 
 DEFAULT_MODULE_ALIASES_MAP = immutables.Map(
@@ -134,6 +141,16 @@ _OUTPUT_FORMAT_MAP = {
 pg_ql = lambda o: pg_common.quote_literal(str(o))
 
 
+@contextlib.contextmanager
+def _timed(ctx: CompileContext, phase: str) -> Iterator[None]:
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        ctx.timings[phase] = (
+            ctx.timings.get(phase, 0.0) + time.perf_counter() - started_at)
+
+
 def _convert_format(inp: enums.OutputFormat) -> pg_compiler.OutputFormat:
     try:
         return _OUTPUT_FORMAT_MAP[inp]
@@ -323,6 +340,12 @@ class Compiler:
             self._std_schema)
         config.set_settings(self._config_spec)
 
+    def _get_refl_schema(self) -> s_schema.Schema:
+        # The reflection schema might be passed in still pickled,
+        # see edb.server.cache.stdschema.
+        self._refl_schema = stdschema.materialize(self._refl_schema)
+        return self._refl_schema
+
     def get_std_schema(self) -> s_schema.Schema:
         if self._std_schema is None:
             raise AssertionError('compiler is not initialized')
@@ -471,7 +494,7 @@ class Compiler:
                 # to _refl_schema.
                 s_schema.ChainedSchema(
                     self._std_schema,
-                    self._refl_schema,
+                    self._get_refl_schema(),
                     s_schema.FlatSchema()
                 )
             )
@@ -603,6 +626,7 @@ class Compiler:
                 ctx, 'allow_user_specified_id') or ctx.schema_reflection_mode,
             testmode=self.get_config_val(ctx, '__internal_testmode'),
             devmode=self._is_dev_instance(),
+            persistent_ref_cache=not ctx.bootstrap_mode,
         )
 
     def _compile_ql_query(
@@ -618,12 +642,13 @@ class Compiler:
         current_tx = ctx.state.current_tx()
 
         schema = current_tx.get_schema(self._std_schema)
-        ir = qlcompiler.compile_ast_to_ir(
-            ql,
-            schema=schema,
-            script_info=script_info,
-            options=self._get_compile_options(ctx),
-        )
+        with _timed(ctx, 'ir'):
+            ir = qlcompiler.compile_ast_to_ir(
+                ql,
+                schema=schema,
+                script_info=script_info,
+                options=self._get_compile_options(ctx),
+            )
 
         if ir.cardinality.is_single():
             result_cardinality = enums.Cardinality.AT_MOST_ONE
@@ -644,6 +669,7 @@ class Compiler:
             expected_cardinality_one=ctx.expected_cardinality_one,
             output_format=_convert_format(ctx.output_format),
             backend_runtime_params=ctx.backend_runtime_params,
+            timings=ctx.timings,
         )
 
         if (
@@ -674,6 +700,7 @@ class Compiler:
                 for glob in ir.globals
             ]
 
+        describe_started_at = time.perf_counter()
         if ctx.output_format is enums.OutputFormat.NONE:
             out_type_id = sertypes.NULL_TYPE_ID
             out_type_data = sertypes.NULL_TYPE_DESC
@@ -714,6 +741,9 @@ class Compiler:
             in_type_data, in_type_id = sertypes.TypeSerializer.describe(
                 pschema, params_type, {}, {},
                 protocol_version=ctx.protocol_version)
+        ctx.timings['describe'] = (
+            ctx.timings.get('describe', 0.0)
+            + time.perf_counter() - describe_started_at)
 
         sql_hash = self._hash_sql(
             sql_bytes,
@@ -733,6 +763,8 @@ class Compiler:
             out_type_data=out_type_data,
             cacheable=cacheable,
             has_dml=ir.dml_exprs,
+            schema_deps=dependencies.get_query_deps(
+                ir.schema, ir.schema_refs),
         )
 
     def _extract_params(
@@ -1761,7 +1793,8 @@ class Compiler:
     ) -> dbstate.QueryUnitGroup:
 
         default_cardinality = enums.Cardinality.NO_RESULT
-        statements = edgeql.parse_block(source)
+        with _timed(ctx, 'parse'):
+            statements = edgeql.parse_block(source)
         statements_len = len(statements)
 
         if ctx.skip_first:
@@ -1851,6 +1884,7 @@ class Compiler:
                 unit.in_type_id = comp.in_type_id
 
                 unit.cacheable = comp.cacheable
+                unit.schema_deps = comp.schema_deps
 
                 if is_trailing_stmt:
                     unit.cardinality = comp.cardinality
@@ -2205,6 +2239,7 @@ class Compiler:
         )
 
         unit_group = self._compile(ctx=ctx, source=source)
+        unit_group.compile_timings = ctx.timings
         tx_started = False
         for unit in unit_group:
             if unit.tx_id:
@@ -2260,7 +2295,9 @@ class Compiler:
             expect_rollback=expect_rollback,
         )
 
-        return self._compile(ctx=ctx, source=source), ctx.state
+        unit_group = self._compile(ctx=ctx, source=source)
+        unit_group.compile_timings = ctx.timings
+        return unit_group, ctx.state
 
     def describe_database_dump(
         self,
@@ -2437,9 +2474,10 @@ class Compiler:
             schema, source, catenate=True
         )
 
+        col_list = ", ".join(pg_common.quote_ident(c) for c in cols)
         stmt = (
             f'COPY {table_name} '
-            f'({", ".join(pg_common.quote_ident(c) for c in cols)}) '
+            f'({col_list}) '
             f'TO STDOUT WITH BINARY'
         ).encode()
 
@@ -2450,6 +2488,8 @@ class Compiler:
             type_desc_id=type_id,
             type_desc=type_data,
             sql_copy_stmt=stmt,
+            sql_table_name=table_name,
+            sql_columns=col_list,
         )] + ptrdesc
 
     def _check_dump_layout(
@@ -2789,6 +2829,10 @@ class DumpBlockDescriptor(NamedTuple):
     type_desc_id: uuid.UUID
     type_desc: bytes
     sql_copy_stmt: bytes
+    #: The table and the comma-separated column list the COPY statement
+    #: dumps, used to dump parts of large tables in parallel.
+    sql_table_name: str
+    sql_columns: str
 
 
 class RestoreDescriptor(NamedTuple):
@@ -98,6 +98,10 @@ class Query(BaseQuery):
     single_unit: bool = False
     cacheable: bool = True
 
+    # Schema objects (and names) the query depends on,
+    # see compiler.dependencies.
+    schema_deps: Optional[FrozenSet[Union[uuid.UUID, str]]] = None
+
 
 @dataclasses.dataclass(frozen=True)
 class SimpleQuery(BaseQuery):
@@ -243,6 +247,11 @@ class QueryUnit:
     # True if it is safe to cache this unit.
     cacheable: bool = False
 
+    # Schema objects (and names) this unit was compiled against.
+    # None means the dependencies are unknown and the unit must
+    # be recompiled after any schema change.
+    schema_deps: Optional[FrozenSet[Union[uuid.UUID, str]]] = None
+
     # If non-None, contains a name of the DB that is about to be
     # created/deleted. If it's the former, the IO process needs to
     # introspect the new db. If it's the later, the server should
@@ -319,6 +328,10 @@ class QueryUnitGroup:
     # True if it is safe to cache this unit.
     cacheable: bool = True
 
+    # Union of schema dependencies of all query units in this group,
+    # or None if any of them are unknown.
+    schema_deps: Optional[FrozenSet[Union[uuid.UUID, str]]] = frozenset()
+
     # True if any query unit has transaction control commands, like COMMIT,
     # ROLLBACK, START TRANSACTION or SAVEPOINT-related commands
     tx_control: bool = False
@@ -336,6 +349,10 @@ class QueryUnitGroup:
 
     units: List[QueryUnit] = dataclasses.field(default_factory=list)
 
+    # Seconds the compiler spent in every compilation phase, reported
+    # by the compiler pool and dropped before the group is cached.
+    compile_timings: Optional[Dict[str, float]] = None
+
     def __iter__(self):
         return iter(self.units)
 
@@ -351,6 +368,11 @@ class QueryUnitGroup:
         if not query_unit.cacheable:
             self.cacheable = False
 
+        if query_unit.schema_deps is None:
+            self.schema_deps = None
+        elif self.schema_deps is not None:
+            self.schema_deps |= query_unit.schema_deps
+
         if query_unit.tx_control:
             self.tx_control = True
 
@@ -0,0 +1,138 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Schema dependencies of compiled queries.
+
+A dependency set holds ids of the schema objects a query was compiled
+against along with unqualified short names of the top-level ones.  The
+names are needed because a new object can change how a name in a query
+resolves (e.g. a ``default::len`` function shadowing ``std::len``, or a
+new overload of a function) without touching any object the query
+referenced.
+"""
+
+
+from __future__ import annotations
+from typing import *
+
+import uuid
+
+from edb.schema import objects as s_obj
+from edb.schema import referencing as s_ref
+from edb.schema import schema as s_schema
+
+
+Dependency = Union[uuid.UUID, str]
+
+
+def _get_name_dep(
+    schema: s_schema.Schema,
+    obj: s_obj.Object,
+) -> Optional[str]:
+    if (
+        isinstance(obj, s_obj.QualifiedObject)
+        and not isinstance(obj, s_ref.ReferencedObject)
+    ):
+        return obj.get_shortname(schema).name
+    else:
+        return None
+
+
+def get_query_deps(
+    schema: s_schema.Schema,
+    refs: Iterable[s_obj.Object],
+) -> FrozenSet[Dependency]:
+    """Compute the dependency set of a query referencing *refs*."""
+    deps: Set[Dependency] = set()
+    for obj in refs:
+        deps.add(obj.id)
+        name = _get_name_dep(schema, obj)
+        if name is not None:
+            deps.add(name)
+    return frozenset(deps)
+
+
+def _add_affected(
+    schema: s_schema.FlatSchema,
+    obj: s_obj.Object,
+    affected: Set[Dependency],
+    refs: Set[uuid.UUID],
+) -> None:
+    affected.add(obj.id)
+    name = _get_name_dep(schema, obj)
+    if name is not None:
+        affected.add(name)
+
+    # Objects that the changed object points to (its bases and
+    # ancestors, the source and target of a pointer, etc.) might be
+    # compiled differently now; e.g. a query on a base type covers
+    # a newly created subtype.
+    refs.update(schema.get_obj_refs(obj))
+
+    if isinstance(obj, s_ref.ReferencedObject):
+        # A change in a pointer, constraint, access policy etc. is a
+        # change in the object that owns it.
+        referrer = obj.get_referrer(schema)
+        if (
+            referrer is not None
+            and referrer.id not in affected
+            and schema.has_object(referrer.id)
+        ):
+            _add_affected(schema, referrer, affected, refs)
+
+
+def get_affected_deps(
+    old_schema: s_schema.FlatSchema,
+    new_schema: s_schema.FlatSchema,
+) -> FrozenSet[Dependency]:
+    """Compute dependencies invalidated by going from one schema to another.
+
+    A cached query must be recompiled if its dependency set intersects
+    with the result.
+    """
+    changed = new_schema.get_changed_ids(old_schema)
+    affected: Set[Dependency] = set()
+    refs: Set[uuid.UUID] = set()
+
+    for schema in (old_schema, new_schema):
+        for obj_id in changed:
+            obj = schema.get_by_id(obj_id, None)
+            if obj is not None:
+                _add_affected(schema, obj, affected, refs)
+
+    # The referenced objects are only interesting if they are
+    # user-defined: standard library objects never change and
+    # almost every query depends on some of them.
+    for obj_id in refs - changed:
+        for schema in (new_schema, old_schema):
+            obj = schema.get_by_id(obj_id, None)
+            if obj is not None:
+                if not _is_std(schema, obj):
+                    affected.add(obj_id)
+                break
+
+    return frozenset(affected)
+
+
+def _is_std(schema: s_schema.Schema, obj: s_obj.Object) -> bool:
+    if isinstance(obj, s_obj.QualifiedObject):
+        module = obj.get_name(schema).get_module_name()
+    else:
+        module = obj.get_name(schema)
+    return module in s_schema.STD_MODULES
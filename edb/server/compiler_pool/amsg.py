@@ -31,30 +31,53 @@ _uint64_packer = struct.Struct('!Q').pack
 
 
 class MessageStream:
-    """Data stream that yields messages."""
+    """Data stream that yields messages.
+
+    Messages are yielded as memoryviews; the data of a message is copied
+    at most once, when it is received in more than one chunk.
+    """
 
     def __init__(self):
-        self._buffer = b''
+        self._chunks = []
+        self._chunks_len = 0
         self._curmsg_len = -1
 
     def feed_data(self, data):
-        # TODO: rewrite to avoid buffer copies.
-        self._buffer += data
-        while self._buffer:
+        self._chunks.append(data)
+        self._chunks_len += len(data)
+        needed = 8 if self._curmsg_len == -1 else self._curmsg_len
+        if self._chunks_len < needed:
+            return
+
+        if len(self._chunks) == 1:
+            buffer = memoryview(self._chunks[0])
+        else:
+            buffer = memoryview(b''.join(self._chunks))
+        self._chunks.clear()
+        self._chunks_len = 0
+
+        pos = 0
+        end = len(buffer)
+        while pos < end:
             if self._curmsg_len == -1:
-                if len(self._buffer) >= 8:
-                    self._curmsg_len = _uint64_unpacker(self._buffer[:8])[0]
-                    self._buffer = self._buffer[8:]
+                if end - pos >= 8:
+                    self._curmsg_len = _uint64_unpacker(buffer[pos:pos + 8])[0]
+                    pos += 8
                 else:
-                    return
+                    break
 
-            if self._curmsg_len > 0 and len(self._buffer) >= self._curmsg_len:
-                msg = self._buffer[:self._curmsg_len]
-                self._buffer = self._buffer[self._curmsg_len:]
+            if self._curmsg_len > 0 and end - pos >= self._curmsg_len:
+                msg = buffer[pos:pos + self._curmsg_len]
+                pos += self._curmsg_len
                 self._curmsg_len = -1
                 yield msg
             else:
-                return
+                break
+
+        if pos < end:
+            rest = bytes(buffer[pos:])
+            self._chunks.append(rest)
+            self._chunks_len = len(rest)
 
 
 class HubProtocol(asyncio.Protocol):
@@ -73,12 +96,13 @@ class HubProtocol(asyncio.Protocol):
     def connection_made(self, tr):
         self._transport = tr
 
-    def send(self, req_id: int, waiter: asyncio.Future, payload: bytes):
+    def send(self, req_id: int, waiter: asyncio.Future, *chunks):
         if req_id in self._resp_waiters:
             raise RuntimeError('FramedProtocol: duplicate request ID')
         self._resp_waiters[req_id] = waiter
+        size = sum(len(chunk) for chunk in chunks)
         self._transport.writelines(
-            (_uint64_packer(len(payload) + 8), _uint64_packer(req_id), payload)
+            (_uint64_packer(size + 8), _uint64_packer(req_id), *chunks)
         )
 
     def process_message(self, msg):
@@ -131,12 +155,12 @@ class HubConnection:
     def is_closed(self):
         return self._protocol._closed
 
-    async def request(self, data: bytes) -> bytes:
+    async def request(self, *chunks) -> memoryview:
         self._req_id_cnt += 1
         req_id = self._req_id_cnt
 
         waiter = self._loop.create_future()
-        self._protocol.send(req_id, waiter, data)
+        self._protocol.send(req_id, waiter, *chunks)
         return await waiter
 
     def abort(self):
@@ -160,16 +184,23 @@ class WorkerConnection:
         req_id = _uint64_unpacker(msgview[:8])[0]
         return req_id, msgview[8:]
 
-    def reply(self, req_id, payload):
-        self._sock.sendall(
-            b"".join(
-                (
-                    _uint64_packer(len(payload) + 8),
-                    _uint64_packer(req_id),
-                    payload,
-                )
-            )
-        )
+    def reply(self, req_id, *chunks):
+        size = sum(len(chunk) for chunk in chunks)
+        views = [
+            memoryview(_uint64_packer(size + 8) + _uint64_packer(req_id)),
+            *(memoryview(chunk) for chunk in chunks if len(chunk)),
+        ]
+        # Send the chunks without joining them; sendmsg() may send only
+        # a part of the data, so loop until everything is sent.
+        while views:
+            sent = self._sock.sendmsg(views)
+            while sent:
+                if sent >= len(views[0]):
+                    sent -= len(views[0])
+                    del views[0]
+                else:
+                    views[0] = views[0][sent:]
+                    sent = 0
 
     def iter_request(self):
         while True:
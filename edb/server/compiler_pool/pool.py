@@ -27,6 +27,7 @@ import logging
 import os
 import os.path
 import pickle
+import re
 import signal
 import subprocess
 import sys
@@ -35,9 +36,11 @@ import time
 import immutables
 
 from edb.common import debug
+from edb.common import lru
 from edb.common import taskgroup
 
 from edb.pgsql import params as pgparams
+from edb.schema import schema as s_schema
 
 from edb.server import args as srvargs
 from edb.server import defines
@@ -46,6 +49,7 @@ from edb.server import metrics
 from . import amsg
 from . import queue
 from . import state
+from . import wire
 
 
 PROCESS_INITIAL_RESPONSE_TIMEOUT: float = 60.0
@@ -53,11 +57,27 @@ KILL_TIMEOUT: float = 10.0
 ADAPTIVE_SCALE_UP_WAIT_TIME: float = 3.0
 ADAPTIVE_SCALE_DOWN_WAIT_TIME: float = 60.0
 WORKER_PKG: str = __name__.rpartition('.')[0] + '.'
+# Longest query text quoted in the slow compilation log.
+SLOW_COMPILE_LOG_TEXT_LIMIT: int = 1000
 
 
 logger = logging.getLogger("edb.server")
 log_metrics = logging.getLogger("edb.server.metrics")
 
+# Statements that are scheduled as DDL rather than interactive queries
+# when they start a script.
+_DDL_RE = re.compile(
+    r"""
+        ^(?:\s|\#[^\n]*(?:\n|$))*
+        (?:
+            CREATE | ALTER | DROP | POPULATE
+            | (?:START|COMMIT|ABORT) \s+ MIGRATION
+            | DESCRIBE \s+ CURRENT \s+ MIGRATION
+        )\b
+    """,
+    re.I | re.X,
+)
+
 
 # Inherit sys.path so that import system can find worker class
 # in unittests.
@@ -70,6 +90,36 @@ def _pickle_memoized(schema):
     return pickle.dumps(schema, -1)
 
 
+def _classify_source(source) -> queue.RequestClass:
+    if _DDL_RE.match(source.text()):
+        return queue.RequestClass.DDL
+    else:
+        return queue.RequestClass.Interactive
+
+
+# Pickled schema deltas, keyed on the version ids of the schemas so
+# as not to keep the schemas themselves alive.
+_schema_deltas = lru.LRUMapping(maxsize=16)
+
+
+def _pickle_schema_delta(base, schema):
+    key = (base.get_version_id(), schema.get_version_id())
+    try:
+        return _schema_deltas[key]
+    except KeyError:
+        pass
+
+    delta = schema.get_delta(base)
+    # A delta touching most of the schema is not worth the trouble
+    # of applying it in every worker.
+    if delta.get_size() * 2 > sum(delta.base_sizes):
+        pickled = None
+    else:
+        pickled = pickle.dumps(delta, -1)
+    _schema_deltas[key] = pickled
+    return pickled
+
+
 class BaseWorker:
 
     _dbs: state.DatabasesState
@@ -107,7 +157,7 @@ class BaseWorker:
 
         data = await self._request(method_name, args)
 
-        status, *data = pickle.loads(data)
+        status, *data = self._decode_response(data)
 
         self._last_used = time.monotonic()
 
@@ -132,6 +182,9 @@ class BaseWorker:
         msg = pickle.dumps((method_name, args))
         return await self._con.request(msg)
 
+    def _decode_response(self, data):
+        return pickle.loads(data)
+
 
 class Worker(BaseWorker):
     def __init__(self, manager, server, pid, *args):
@@ -152,6 +205,13 @@ class Worker(BaseWorker):
             init_args_pickled,
         )
 
+    async def _request(self, method_name, args):
+        return await self._con.request(
+            *wire.encode_request(method_name, args))
+
+    def _decode_response(self, data):
+        return wire.decode(data)
+
     def get_pid(self):
         return self._pid
 
@@ -169,6 +229,10 @@ class Worker(BaseWorker):
 
 
 class AbstractPool:
+
+    # Whether the workers accept schema deltas (see _pickle_schema).
+    _schema_delta_sync = False
+
     def __init__(
         self,
         *,
@@ -178,10 +242,12 @@ class AbstractPool:
         std_schema,
         refl_schema,
         schema_class_layout,
+        slow_compile_log_threshold: Optional[float] = None,
         **kwargs,
     ):
         self._loop = loop
         self._dbindex = dbindex
+        self._slow_compile_log_threshold = slow_compile_log_threshold
 
         self._backend_runtime_params = backend_runtime_params
         self._std_schema = std_schema
@@ -231,6 +297,29 @@ class AbstractPool:
     def get_template_pid(self):
         return None
 
+    def _pickle_schema(self, base, schema):
+        # If the worker has a previous version of the schema, try to
+        # only send the changes; schema changes are normally small
+        # compared to the size of the whole schema.
+        if (
+            self._schema_delta_sync
+            and isinstance(base, s_schema.FlatSchema)
+            and isinstance(schema, s_schema.FlatSchema)
+        ):
+            pickled = _pickle_schema_delta(base, schema)
+            if pickled is not None:
+                mode = 'delta'
+            else:
+                pickled = _pickle_memoized(schema)
+                mode = 'full'
+        else:
+            pickled = _pickle_memoized(schema)
+            mode = 'full'
+
+        metrics.compiler_schema_syncs.inc(1.0, mode)
+        metrics.compiler_schema_sync_bytes.inc(len(pickled), mode)
+        return pickled
+
     async def _compute_compile_preargs(
         self,
         worker,
@@ -295,9 +384,9 @@ class AbstractPool:
 
         if worker_db is None:
             preargs += (
-                _pickle_memoized(user_schema),
+                self._pickle_schema(None, user_schema),
                 _pickle_memoized(reflection_cache),
-                _pickle_memoized(global_schema),
+                self._pickle_schema(None, global_schema),
                 _pickle_memoized(database_config),
                 _pickle_memoized(system_config),
             )
@@ -311,7 +400,7 @@ class AbstractPool:
         else:
             if worker_db.user_schema is not user_schema:
                 preargs += (
-                    _pickle_memoized(user_schema),
+                    self._pickle_schema(worker_db.user_schema, user_schema),
                 )
                 to_update['user_schema'] = user_schema
             else:
@@ -327,7 +416,7 @@ class AbstractPool:
 
             if worker._global_schema is not global_schema:
                 preargs += (
-                    _pickle_memoized(global_schema),
+                    self._pickle_schema(worker._global_schema, global_schema),
                 )
                 to_update['global_schema'] = global_schema
             else:
@@ -361,7 +450,63 @@ class AbstractPool:
 
         return preargs, callback
 
-    async def _acquire_worker(self, *, condition=None, weighter=None):
+    async def _call_with_state(
+        self,
+        worker,
+        method_name,
+        dbname,
+        user_schema,
+        global_schema,
+        reflection_cache,
+        database_config,
+        system_config,
+        *compile_args,
+    ):
+        state_args = (
+            dbname,
+            user_schema,
+            global_schema,
+            reflection_cache,
+            database_config,
+            system_config,
+        )
+        preargs, sync_state = await self._compute_compile_preargs(
+            worker, *state_args)
+
+        try:
+            return await worker.call(
+                method_name,
+                *preargs,
+                *compile_args,
+                sync_state=sync_state
+            )
+        except state.FailedStateSync:
+            if not self._schema_delta_sync or dbname not in worker._dbs:
+                raise
+
+        # The worker could not apply a schema delta, most likely because
+        # its copy of the schema is not what we think it is.  Forget what
+        # we know about the worker state and send it over in full.
+        logger.warning(
+            "failed to sync compiler worker state, retrying with full sync")
+        worker._dbs = worker._dbs.delete(dbname)
+        preargs, sync_state = await self._compute_compile_preargs(
+            worker, *state_args)
+        return await worker.call(
+            method_name,
+            *preargs,
+            *compile_args,
+            sync_state=sync_state
+        )
+
+    async def _acquire_worker(
+        self,
+        *,
+        condition=None,
+        weighter=None,
+        request_class=queue.RequestClass.Interactive,
+        dbname=None,
+    ):
         raise NotImplementedError
 
     def _release_worker(self, worker, *, put_in_front: bool = True):
@@ -377,25 +522,24 @@ class AbstractPool:
         system_config,
         *compile_args
     ):
-        worker = await self._acquire_worker()
+        worker = await self._acquire_worker(
+            request_class=_classify_source(compile_args[0]),
+            dbname=dbname,
+        )
         try:
-            preargs, sync_state = await self._compute_compile_preargs(
+            result = await self._call_with_state(
                 worker,
+                'compile',
                 dbname,
                 user_schema,
                 global_schema,
                 reflection_cache,
                 database_config,
                 system_config,
-            )
-
-            result = await worker.call(
-                'compile',
-                *preargs,
                 *compile_args,
-                sync_state=sync_state
             )
             worker._last_pickled_state = result[1]
+            self._report_compile_timings(compile_args[0], result[0])
             if len(result) == 2:
                 return *result, 0
             else:
@@ -404,6 +548,55 @@ class AbstractPool:
         finally:
             self._release_worker(worker)
 
+    async def compile_batch(
+        self,
+        dbname,
+        user_schema,
+        global_schema,
+        reflection_cache,
+        database_config,
+        system_config,
+        sources,
+        *compile_args
+    ):
+        """Compile a number of independent queries in one worker call.
+
+        Every source is compiled outside of a transaction with the same
+        *compile_args*, which are the arguments of compile() that follow
+        the source.  Returns a list with a QueryUnitGroup or an exception
+        raised when compiling each of the *sources*.
+        """
+        worker = await self._acquire_worker(
+            request_class=queue.RequestClass.Background,
+            dbname=dbname,
+        )
+        try:
+            results = await self._call_with_state(
+                worker,
+                'compile_batch',
+                dbname,
+                user_schema,
+                global_schema,
+                reflection_cache,
+                database_config,
+                system_config,
+                list(sources),
+                *compile_args,
+            )
+        finally:
+            self._release_worker(worker)
+
+        rv = []
+        for source, (status, *data) in zip(sources, results):
+            if status == 0:
+                self._report_compile_timings(source, data[0])
+                rv.append(data[0])
+            else:
+                exc, tb = data
+                exc.__formatted_error__ = tb
+                rv.append(exc)
+        return rv
+
     async def compile_in_tx(
         self, txid, pickled_state, state_id, *compile_args
     ):
@@ -429,7 +622,8 @@ class AbstractPool:
         # stored in edgecon; we never modify it, so `is` is sufficient and
         # is faster than `==`.
         worker = await self._acquire_worker(
-            condition=lambda w: (w._last_pickled_state is pickled_state)
+            condition=lambda w: (w._last_pickled_state is pickled_state),
+            request_class=_classify_source(compile_args[0]),
         )
 
         if worker._last_pickled_state is pickled_state:
@@ -447,6 +641,7 @@ class AbstractPool:
                 *compile_args
             )
             worker._last_pickled_state = new_pickled_state
+            self._report_compile_timings(compile_args[0], units)
             return units, new_pickled_state, 0
 
         finally:
@@ -456,6 +651,34 @@ class AbstractPool:
             # `True` is higher.
             self._release_worker(worker, put_in_front=False)
 
+    def _report_compile_timings(self, source, unit_group) -> None:
+        timings = unit_group.compile_timings
+        if timings is None:
+            return
+        # Only the compilation itself is measured, not the compiled
+        # query, so don't keep the timings in the query caches.
+        unit_group.compile_timings = None
+
+        for phase, duration in timings.items():
+            metrics.edgeql_query_compilation_phase_duration.observe(
+                duration, phase)
+
+        threshold = self._slow_compile_log_threshold
+        total = sum(timings.values())
+        if threshold is not None and total >= threshold:
+            text = source.text()
+            if len(text) > SLOW_COMPILE_LOG_TEXT_LIMIT:
+                text = text[:SLOW_COMPILE_LOG_TEXT_LIMIT] + '...'
+            logger.warning(
+                'slow compilation: %.3fs (%s) of %s',
+                total,
+                ', '.join(
+                    f'{phase}: {duration:.3f}s'
+                    for phase, duration in timings.items()
+                ),
+                text,
+            )
+
     async def compile_notebook(
         self,
         dbname,
@@ -466,23 +689,18 @@ class AbstractPool:
         system_config,
         *compile_args
     ):
-        worker = await self._acquire_worker()
+        worker = await self._acquire_worker(dbname=dbname)
         try:
-            preargs, sync_state = await self._compute_compile_preargs(
+            return await self._call_with_state(
                 worker,
+                'compile_notebook',
                 dbname,
                 user_schema,
                 global_schema,
                 reflection_cache,
                 database_config,
                 system_config,
-            )
-
-            return await worker.call(
-                'compile_notebook',
-                *preargs,
                 *compile_args,
-                sync_state=sync_state
             )
 
         finally:
@@ -513,34 +731,85 @@ class AbstractPool:
         system_config,
         *compile_args
     ):
-        worker = await self._acquire_worker()
+        worker = await self._acquire_worker(
+            request_class=queue.RequestClass.GraphQL,
+            dbname=dbname,
+        )
         try:
-            preargs, sync_state = await self._compute_compile_preargs(
+            unit_group, gql_op, build_duration = await self._call_with_state(
                 worker,
+                'compile_graphql',
                 dbname,
                 user_schema,
                 global_schema,
                 reflection_cache,
                 database_config,
                 system_config,
-            )
-
-            return await worker.call(
-                'compile_graphql',
-                *preargs,
                 *compile_args,
-                sync_state=sync_state
             )
 
         finally:
             self._release_worker(worker)
 
+        if build_duration is not None:
+            metrics.graphql_schema_build_duration.observe(
+                build_duration, 'request')
+        return unit_group, gql_op
+
+    async def build_graphql_schema(
+        self,
+        dbname,
+        user_schema,
+        global_schema,
+        reflection_cache,
+        database_config,
+        system_config,
+    ):
+        """Build the GraphQL schema of a database in every worker.
+
+        Called after the schema of a database with the GraphQL extension
+        changes, so that GraphQL queries don't wait for the workers to
+        rebuild it.  The workers are synced and built one by one with
+        the lowest priority.
+        """
+        built = set()
+        while True:
+            worker = await self._acquire_worker(
+                condition=lambda w: w not in built,
+                request_class=queue.RequestClass.Background,
+                dbname=dbname,
+            )
+            try:
+                if worker in built:
+                    # Every worker that is not busy has the schema
+                    # already, the busy ones will build it on first use.
+                    return
+                build_duration = await self._call_with_state(
+                    worker,
+                    'build_graphql_schema',
+                    dbname,
+                    user_schema,
+                    global_schema,
+                    reflection_cache,
+                    database_config,
+                    system_config,
+                )
+                built.add(worker)
+            finally:
+                self._release_worker(worker)
+
+            if build_duration is not None:
+                metrics.graphql_schema_build_duration.observe(
+                    build_duration, 'ddl')
+
     async def describe_database_dump(
         self,
         *args,
         **kwargs
     ):
-        worker = await self._acquire_worker()
+        worker = await self._acquire_worker(
+            request_class=queue.RequestClass.Describe,
+        )
         try:
             return await worker.call(
                 'describe_database_dump',
@@ -556,7 +825,9 @@ class AbstractPool:
         *args,
         **kwargs
     ):
-        worker = await self._acquire_worker()
+        worker = await self._acquire_worker(
+            request_class=queue.RequestClass.Describe,
+        )
         try:
             return await worker.call(
                 'describe_database_restore',
@@ -576,6 +847,7 @@ class BaseLocalPool(
     _worker_mod = "worker"
     _workers_queue: queue.WorkerQueue[Worker]
     _workers: Dict[int, Worker]
+    _schema_delta_sync = True
 
     def __init__(
         self,
@@ -601,6 +873,10 @@ class BaseLocalPool(
 
         self._server = amsg.Server(self._poolsock_name, self._loop, self)
         self._ready_evt = asyncio.Event()
+        self._snapshot_path = None
+        # The init args the snapshot was written from, which is the
+        # state of the workers forked after loading it.
+        self._snapshot_init_args = None
 
         self._running = None
 
@@ -614,7 +890,14 @@ class BaseLocalPool(
         if not self._running:
             return
         logger.debug("Sending init args to worker with PID %s.", pid)
-        init_args, init_args_pickled = self._get_init_args()
+        if self._snapshot_path is not None:
+            # The worker has loaded the init args from the snapshot
+            # before it was forked from the template process, so its
+            # state is the one of the snapshot, however old it is.
+            init_args = self._snapshot_init_args
+            init_args_pickled = state.INIT_FROM_SNAPSHOT_MARKER
+        else:
+            init_args, init_args_pickled = self._get_init_args()
         worker = self._worker_class(  # type: ignore
             self,
             self._server,
@@ -698,6 +981,10 @@ class BaseLocalPool(
             cmdline.extend([
                 '--numproc', str(numproc),
             ])
+            if self._snapshot_path is not None:
+                cmdline.extend([
+                    '--snapshot', self._snapshot_path,
+                ])
 
         transport, _ = await self._loop.subprocess_exec(
             lambda: self,
@@ -743,24 +1030,44 @@ class BaseLocalPool(
             self._stats_killed,
         )
 
-    async def _acquire_worker(self, *, condition=None, weighter=None):
+    async def _acquire_worker(
+        self,
+        *,
+        condition=None,
+        weighter=None,
+        request_class=queue.RequestClass.Interactive,
+        dbname=None,
+    ):
+        started_at = time.monotonic()
         while (
             worker := await self._workers_queue.acquire(
-                condition=condition, weighter=weighter
+                condition=condition,
+                weighter=weighter,
+                request_class=request_class,
+                dbname=dbname,
             )
         ).get_pid() not in self._workers:
             # The worker was disconnected; skip to the next one.
-            pass
+            self._workers_queue.discard(worker)
+        metrics.compiler_pool_queue_wait_duration.observe(
+            time.monotonic() - started_at, request_class.label)
         return worker
 
     def _release_worker(self, worker, *, put_in_front: bool = True):
         # Skip disconnected workers
         if worker.get_pid() in self._workers:
             self._workers_queue.release(worker, put_in_front=put_in_front)
+        else:
+            self._workers_queue.discard(worker)
 
 
 @srvargs.CompilerPoolMode.Fixed.assign_implementation
 class FixedPool(BaseLocalPool):
+
+    # Whether the template process should load the initial worker state
+    # before forking the workers, see _publish_snapshot().
+    _shared_snapshot = True
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._template_transport = None
@@ -795,8 +1102,32 @@ class FixedPool(BaseLocalPool):
             return self._template_transport.get_pid()
 
     async def _start(self):
+        if self._shared_snapshot:
+            self._publish_snapshot()
         await self._create_template_proc(retry=False)
 
+    def _publish_snapshot(self):
+        # Write the pickled init args into a file that the template
+        # process maps and loads before forking the workers.  This way
+        # the std, reflection and user schemas are unpickled only once
+        # and their memory is shared by all workers, and attaching a
+        # worker (including the ones respawned by the template process)
+        # does not involve sending and unpickling all of the schemas.
+        init_args, init_args_pickled = self._get_init_args()
+        path = os.path.join(self._runstate_dir, 'compiler-snapshot')
+        tmp_path = f'{path}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(init_args_pickled)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning(
+                "could not write compiler state snapshot to %s, workers "
+                "will be initialized individually", path, exc_info=True)
+        else:
+            self._snapshot_path = path
+            self._snapshot_init_args = init_args
+
     async def _create_template_proc(self, retry=True):
         self._template_proc_scheduled = False
         if not self._running:
@@ -836,6 +1167,14 @@ class FixedPool(BaseLocalPool):
             trans.terminate()
             await trans._wait()
 
+        path, self._snapshot_path = self._snapshot_path, None
+        self._snapshot_init_args = None
+        if path is not None:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
 
 @srvargs.CompilerPoolMode.OnDemand.assign_implementation
 class SimpleAdaptivePool(BaseLocalPool):
@@ -858,7 +1197,14 @@ class SimpleAdaptivePool(BaseLocalPool):
         for transport in transports.values():
             await transport._wait()
 
-    async def _acquire_worker(self, *, condition=None, weighter=None):
+    async def _acquire_worker(
+        self,
+        *,
+        condition=None,
+        weighter=None,
+        request_class=queue.RequestClass.Interactive,
+        dbname=None,
+    ):
         if (
             self._running and
             self._scale_up_handle is None
@@ -878,7 +1224,10 @@ class SimpleAdaptivePool(BaseLocalPool):
             self._scale_down_handle.cancel()
             self._scale_down_handle = None
         return await super()._acquire_worker(
-            condition=condition, weighter=weighter
+            condition=condition,
+            weighter=weighter,
+            request_class=request_class,
+            dbname=dbname,
         )
 
     def _release_worker(self, worker, *, put_in_front: bool = True):
@@ -1083,7 +1432,14 @@ class RemotePool(AbstractPool):
             self._worker = self._loop.create_future()
             self._loop.create_task(self.start(retry=True))
 
-    async def _acquire_worker(self, *, condition=None, cmp=None):
+    async def _acquire_worker(
+        self,
+        *,
+        condition=None,
+        cmp=None,
+        request_class=queue.RequestClass.Interactive,
+        dbname=None,
+    ):
         await self._semaphore.acquire()
         return await self._worker
 
@@ -1097,7 +1453,7 @@ class RemotePool(AbstractPool):
     ):
         worker = await self._acquire_worker()
         try:
-            return await worker.call(
+            result = await worker.call(
                 'compile_in_tx',
                 state.REUSE_LAST_STATE_MARKER,
                 state_id,
@@ -1105,7 +1461,7 @@ class RemotePool(AbstractPool):
                 *compile_args
             )
         except state.StateNotFound:
-            return await worker.call(
+            result = await worker.call(
                 'compile_in_tx',
                 pickled_state,
                 0,
@@ -1114,6 +1470,13 @@ class RemotePool(AbstractPool):
             )
         finally:
             self._release_worker(worker)
+        self._report_compile_timings(compile_args[0], result[0])
+        return result
+
+    async def build_graphql_schema(self, *args):
+        # The workers of the compiler server build the GraphQL schemas
+        # on their own.
+        pass
 
     async def _compute_compile_preargs(self, *args):
         preargs, callback = await super()._compute_compile_preargs(*args)
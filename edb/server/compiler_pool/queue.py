@@ -20,6 +20,7 @@ from __future__ import annotations
 
 import asyncio
 import collections
+import enum
 import typing
 
 
@@ -27,69 +28,152 @@ W = typing.TypeVar('W')
 W2 = typing.TypeVar('W2', contravariant=True)
 
 
+class RequestClass(enum.IntEnum):
+    """Classes of compiler requests, in the order of priority."""
+
+    Interactive = 0
+    GraphQL = 1
+    Describe = 2
+    DDL = 3
+    Background = 4
+
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+
+# The share of the workers that requests of a class may occupy at once.
+DEFAULT_CLASS_SHARES: typing.Mapping[RequestClass, float] = {
+    RequestClass.Interactive: 1.0,
+    RequestClass.GraphQL: 0.75,
+    RequestClass.Describe: 0.5,
+    RequestClass.DDL: 0.5,
+    RequestClass.Background: 0.25,
+}
+
+# Waiters that have waited for longer than this are served before any
+# higher priority ones, so that low priority classes don't starve.
+MAX_PRIORITY_WAIT: float = 2.0
+
+
 class _AcquireCondition(typing.Protocol[W2]):
 
     def __call__(self, worker: W2) -> bool:
         pass
 
 
+class _Waiter:
+
+    __slots__ = ('fut', 'request_class', 'dbname', 'since')
+
+    def __init__(
+        self,
+        fut: asyncio.Future[None],
+        request_class: RequestClass,
+        dbname: typing.Optional[str],
+        since: float,
+    ) -> None:
+        self.fut = fut
+        self.request_class = request_class
+        self.dbname = dbname
+        self.since = since
+
+
 class WorkerQueue(typing.Generic[W]):
+    """A queue of workers scheduling waiters by request class and database.
+
+    When a worker is released, the next waiter is picked from the highest
+    priority class that is under its concurrency limit (a share of all
+    workers), unless a waiter of any class has been waiting for too long.
+    Within a class, waiters of the databases that currently hold the
+    fewest workers go first, so that one busy database cannot occupy
+    the whole pool.
+    """
 
     loop: asyncio.AbstractEventLoop
 
-    _waiters: typing.Deque[asyncio.Future[None]]
+    _waiters: typing.Dict[RequestClass, typing.Deque[_Waiter]]
     _queue: typing.Deque[W]
+    _leases: typing.Dict[W, typing.Tuple[RequestClass, typing.Optional[str]]]
+    _class_active: typing.Counter[RequestClass]
+    _db_active: typing.Counter[typing.Optional[str]]
 
     def __init__(
         self,
         loop: asyncio.AbstractEventLoop,
+        *,
+        class_shares: typing.Optional[
+            typing.Mapping[RequestClass, float]
+        ]=None,
     ) -> None:
         self._loop = loop
-        self._waiters = collections.deque()
+        self._waiters = {rc: collections.deque() for rc in RequestClass}
         self._queue = collections.deque()
+        self._leases = {}
+        self._class_active = collections.Counter()
+        self._db_active = collections.Counter()
+        if class_shares is None:
+            class_shares = DEFAULT_CLASS_SHARES
+        self._class_shares = class_shares
 
     async def acquire(
         self,
         *,
         condition: typing.Optional[_AcquireCondition[W]]=None,
         weighter=None,
+        request_class: RequestClass=RequestClass.Interactive,
+        dbname: typing.Optional[str]=None,
     ) -> W:
         # There can be a race between a waiter scheduled for to wake up
         # and a worker being stolen (due to quota being enforced,
         # for example).  In which case the waiter might get finally
         # woken up with an empty queue -- hence we use a `while` loop here.
         attempts = 0
-        while not self._queue:
-            waiter = self._loop.create_future()
+        since = self._loop.time()
+        waiters = self._waiters[request_class]
+        while not self._queue or not self._can_start(request_class):
+            waiter = _Waiter(
+                self._loop.create_future(), request_class, dbname, since)
 
             attempts += 1
             if attempts > 1:
                 # If the waiter was woken up only to discover that
                 # it needs to wait again, we don't want it to lose
                 # its place in the waiters queue.
-                self._waiters.appendleft(waiter)
+                waiters.appendleft(waiter)
             else:
                 # On the first attempt the waiter goes to the end
                 # of the waiters queue.
-                self._waiters.append(waiter)
+                waiters.append(waiter)
 
             try:
-                await waiter
+                await waiter.fut
             except Exception:
-                if not waiter.done():
-                    waiter.cancel()
+                if not waiter.fut.done():
+                    waiter.fut.cancel()
                 try:
-                    self._waiters.remove(waiter)
+                    waiters.remove(waiter)
                 except ValueError:
                     # The waiter could be removed from self._waiters
                     # by a previous release() call.
                     pass
-                if self._queue and not waiter.cancelled():
+                if self._queue and not waiter.fut.cancelled():
                     # We were woken up by release(), but can't take
                     # the call.  Wake up the next in line.
                     self._wakeup_next_waiter()
                 raise
 
+        worker = self._take(condition, weighter)
+        self._leases[worker] = (request_class, dbname)
+        self._class_active[request_class] += 1
+        self._db_active[dbname] += 1
+        return worker
+
+    def _take(
+        self,
+        condition: typing.Optional[_AcquireCondition[W]],
+        weighter,
+    ) -> W:
         if len(self._queue) > 1:
             if condition is not None:
                 for w in self._queue:
@@ -112,21 +196,81 @@ class WorkerQueue(typing.Generic[W]):
         return self._queue.popleft()
 
     def release(self, worker: W, *, put_in_front: bool=True) -> None:
+        self._end_lease(worker)
         if put_in_front:
             self._queue.appendleft(worker)
         else:
             self._queue.append(worker)
         self._wakeup_next_waiter()
 
+    def discard(self, worker: W) -> None:
+        """Forget an acquired worker that will not be released."""
+        self._end_lease(worker)
+        self._wakeup_next_waiter()
+
     def qsize(self) -> int:
         return len(self._queue)
 
     def count_waiters(self) -> int:
-        return len(self._waiters)
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def _end_lease(self, worker: W) -> None:
+        lease = self._leases.pop(worker, None)
+        if lease is None:
+            # A new worker.
+            return
+        request_class, dbname = lease
+        self._class_active[request_class] -= 1
+        self._db_active[dbname] -= 1
+        if not self._db_active[dbname]:
+            del self._db_active[dbname]
+
+    def _can_start(self, request_class: RequestClass) -> bool:
+        num_workers = len(self._queue) + len(self._leases)
+        limit = max(1, int(num_workers * self._class_shares[request_class]))
+        return self._class_active[request_class] < limit
 
     def _wakeup_next_waiter(self) -> None:
-        while self._waiters:
-            waiter = self._waiters.popleft()
-            if not waiter.done():
-                waiter.set_result(None)
+        while self._queue:
+            waiter = self._pick_next_waiter()
+            if waiter is None:
+                break
+            self._waiters[waiter.request_class].remove(waiter)
+            if not waiter.fut.done():
+                waiter.fut.set_result(None)
                 break
+
+    def _pick_next_waiter(self) -> typing.Optional[_Waiter]:
+        now = self._loop.time()
+        candidates = None
+        overdue = None
+        # Dicts are ordered, so classes are iterated by priority.
+        for request_class, waiters in self._waiters.items():
+            if not waiters or not self._can_start(request_class):
+                continue
+            if candidates is None:
+                candidates = waiters
+            head = waiters[0]
+            if (
+                now - head.since > MAX_PRIORITY_WAIT
+                and (overdue is None or head.since < overdue[0].since)
+            ):
+                overdue = waiters
+
+        if overdue is not None:
+            candidates = overdue
+        if candidates is None:
+            return None
+
+        # Fair share between databases: prefer the waiter of the
+        # database that holds the fewest workers, in FIFO order.
+        rv = None
+        min_active = None
+        for waiter in candidates:
+            active = self._db_active[waiter.dbname]
+            if min_active is None or active < min_active:
+                rv = waiter
+                min_active = active
+                if not active:
+                    break
+        return rv
@@ -21,9 +21,11 @@ from __future__ import annotations
 from typing import *  # NoQA
 
 import pickle
+import traceback
 
 import immutables
 
+from edb import edgeql
 from edb import graphql
 
 from edb.common import debug
@@ -31,6 +33,7 @@ from edb.pgsql import params as pgparams
 from edb.schema import schema as s_schema
 from edb.server import compiler
 from edb.server import config
+from edb.server.cache import stdschema
 
 from . import state
 from . import worker_proc
@@ -67,6 +70,10 @@ def __init_worker__(
         schema_class_layout,
     ) = pickle.loads(init_args_pickled)
 
+    # Every compilation needs the std schema, so unpickle it right away;
+    # the compiler unpickles the reflection schema on the first DDL.
+    std_schema = stdschema.materialize(std_schema)
+
     INITED = True
     BACKEND_RUNTIME_PARAMS = backend_runtime_params
     COMPILER = compiler.Compiler(
@@ -206,6 +213,36 @@ def compile(
     return units, pickled_state
 
 
+def compile_batch(
+    client_id: int,
+    dbname: str,
+    sources: List[edgeql.Source],
+    *compile_args: Any,
+):
+    client_schema = clients[client_id]
+    db = client_schema.dbs[dbname]
+
+    results: List[Tuple[Any, ...]] = []
+    for source in sources:
+        try:
+            units, _ = COMPILER.compile(
+                db.user_schema,
+                client_schema.global_schema,
+                db.reflection_cache,
+                db.database_config,
+                client_schema.instance_config,
+                source,
+                *compile_args,
+            )
+        except Exception as ex:
+            worker_proc.prepare_exception(ex)
+            results.append((1, ex, traceback.format_exc()))
+        else:
+            results.append((0, units))
+
+    return results
+
+
 def compile_in_tx(cstate, _, *args, **kwargs):
     global LAST_STATE
     if cstate == state.REUSE_LAST_STATE_MARKER:
@@ -280,6 +317,8 @@ def call_for_client(client_id, pickled_schema, invalidation, msg, *args):
 
     if methname == "compile":
         meth = compile
+    elif methname == "compile_batch":
+        meth = compile_batch
     elif methname == "compile_notebook":
         meth = compile_notebook
     elif methname == "compile_graphql":
@@ -188,6 +188,7 @@ class MultiSchemaPool(pool_mod.FixedPool):
     _worker_class = Worker  # type: ignore
     _worker_mod = "remote_worker"
     _workers: typing.Dict[int, Worker]  # type: ignore
+    _shared_snapshot = False
     _clients: typing.Dict[int, ClientSchema]
 
     def __init__(self, cache_size, *, secret, **kwargs):
@@ -448,6 +449,7 @@ class MultiSchemaPool(pool_mod.FixedPool):
                 pickled = pickle.dumps((0, None), -1)
             elif method_name in {
                 "compile",
+                "compile_batch",
                 "compile_notebook",
                 "compile_graphql",
             }:
@@ -51,3 +51,4 @@ class IncompatibleClient(Exception):
 
 
 REUSE_LAST_STATE_MARKER = b'REUSE_LAST_STATE_MARKER'
+INIT_FROM_SNAPSHOT_MARKER = b'INIT_FROM_SNAPSHOT_MARKER'
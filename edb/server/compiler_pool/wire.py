@@ -0,0 +1,143 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Wire format of the RPC between the server and local compiler workers.
+
+Most of the bytes exchanged with the compiler workers are already
+serialized blobs: pickled schemas and configs sent to sync the worker
+state and pickled compiler states of transactions sent both ways.  With
+plain pickle every such blob is copied into the message when sending and
+out of it when receiving.  Here they are passed as pickle protocol 5
+out-of-band buffers instead: they are written to the socket as separate
+chunks and received as memoryviews into the message.
+
+A message is laid out as follows:
+
+    magic (4 bytes)
+    format version (uint8)
+    number of out-of-band buffers (uint16)
+    length of the pickle (uint64)
+    length of each of the buffers (uint64 each)
+    pickle
+    buffers
+
+Messages not starting with the magic are plain pickles; this is what
+the remote compiler server and its workers exchange.
+"""
+
+
+from __future__ import annotations
+from typing import *
+
+import pickle
+import struct
+
+
+MAGIC = b'\xedCW\x00'
+VERSION = 1
+
+# Smaller blobs are cheaper to copy than to send separately.
+OUT_OF_BAND_THRESHOLD = 4096
+
+_HEADER = struct.Struct('!4sBHQ')
+_LENGTH = struct.Struct('!Q')
+
+
+def is_encoded(msg: Any) -> bool:
+    return msg[:len(MAGIC)] == MAGIC
+
+
+def encode_request(method_name: str, args: Tuple[Any, ...]) -> List[Any]:
+    """Encode a call into a list of chunks to be written out in order."""
+    args, out_of_band = _wrap_blobs(args)
+    return _encode((method_name, args), out_of_band)
+
+
+def encode_response(data: Tuple[Any, ...]) -> List[Any]:
+    """Encode a ``(status, *data)`` response of a worker."""
+    if data[0] == 0 and isinstance(data[1], tuple):
+        result, out_of_band = _wrap_blobs(data[1])
+        return _encode((0, result), out_of_band)
+    return _encode(data, False)
+
+
+def decode(msg: Union[bytes, memoryview]) -> Any:
+    msgview = memoryview(msg)
+    magic, version, nbufs, pickle_len = _HEADER.unpack_from(msgview)
+    if magic != MAGIC:
+        raise ValueError('not a compiler RPC message')
+    if version != VERSION:
+        raise ValueError(
+            f'unsupported compiler RPC message format version {version}')
+
+    pos = _HEADER.size
+    if not nbufs:
+        return pickle.loads(msgview[pos:pos + pickle_len])
+
+    lengths = []
+    for _ in range(nbufs):
+        lengths.append(_LENGTH.unpack_from(msgview, pos)[0])
+        pos += _LENGTH.size
+
+    data = msgview[pos:pos + pickle_len]
+    pos += pickle_len
+
+    buffers = []
+    for length in lengths:
+        buffers.append(msgview[pos:pos + length])
+        pos += length
+
+    return pickle.loads(data, buffers=buffers)
+
+
+def _wrap_blobs(values: Tuple[Any, ...]) -> Tuple[Tuple[Any, ...], bool]:
+    wrapped = None
+    for i, v in enumerate(values):
+        if (
+            isinstance(v, (bytes, memoryview))
+            and len(v) >= OUT_OF_BAND_THRESHOLD
+        ):
+            if wrapped is None:
+                wrapped = list(values)
+            wrapped[i] = pickle.PickleBuffer(v)
+
+    if wrapped is None:
+        return values, False
+    else:
+        return tuple(wrapped), True
+
+
+def _encode(obj: Any, out_of_band: bool) -> List[Any]:
+    if not out_of_band:
+        # Pickling with a buffer callback is noticeably slower, so
+        # don't bother when there is nothing to send out-of-band.
+        data = pickle.dumps(obj, protocol=5)
+        return [_HEADER.pack(MAGIC, VERSION, 0, len(data)), data]
+
+    buffers: List[pickle.PickleBuffer] = []
+    data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    raw = [buf.raw() for buf in buffers]
+
+    chunks: List[Any] = [
+        _HEADER.pack(MAGIC, VERSION, len(raw), len(data)),
+    ]
+    chunks.extend(_LENGTH.pack(r.nbytes) for r in raw)
+    chunks.append(data)
+    chunks.extend(raw)
+    return chunks
@@ -20,17 +20,22 @@
 from __future__ import annotations
 from typing import *  # NoQA
 
+import mmap
 import pickle
+import time
+import traceback
 
 import immutables
 
 from edb import edgeql
 from edb import graphql
+from edb.edgeql.compiler import context as qlcontext
 from edb.pgsql import params as pgparams
 from edb.schema import schema as s_schema
 from edb.server import compiler
 from edb.server import config
 from edb.server import defines
+from edb.server.cache import stdschema
 
 from . import state
 from . import worker_proc
@@ -45,10 +50,41 @@ LAST_STATE: Optional[compiler.dbstate.CompilerConnectionState] = None
 STD_SCHEMA: s_schema.FlatSchema
 GLOBAL_SCHEMA: s_schema.FlatSchema
 INSTANCE_CONFIG: immutables.Map[str, config.SettingValue]
+# The GraphQL schema of every database along with the user and global
+# schemas it was built from.
+GQL_SCHEMAS: Dict[
+    str,
+    Tuple[s_schema.FlatSchema, s_schema.FlatSchema, graphql.GQLCoreSchema],
+] = {}
 
 
 def __init_worker__(
     init_args_pickled: bytes,
+) -> None:
+    if init_args_pickled == state.INIT_FROM_SNAPSHOT_MARKER:
+        # This worker was forked from a template process that had
+        # already been initialized with __load_snapshot__().
+        if not INITED:
+            raise RuntimeError(
+                "compiler worker was not started from a snapshot"
+            )
+        return
+
+    _init_worker(pickle.loads(init_args_pickled))
+
+
+def __load_snapshot__(
+    path: str,
+) -> None:
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            init_args = pickle.loads(buf)
+
+    _init_worker(init_args)
+
+
+def _init_worker(
+    init_args: Tuple[Any, ...],
 ) -> None:
     global INITED
     global DBS
@@ -66,10 +102,15 @@ def __init_worker__(
         schema_class_layout,
         global_schema,
         system_config,
-    ) = pickle.loads(init_args_pickled)
+    ) = init_args
+
+    # Every compilation needs the std schema, so unpickle it right away;
+    # the compiler unpickles the reflection schema on the first DDL.
+    std_schema = stdschema.materialize(std_schema)
 
     INITED = True
     DBS = dbs
+    _discard_dropped_gqlcores()
     BACKEND_RUNTIME_PARAMS = backend_runtime_params
     COMPILER = compiler.Compiler(
         backend_runtime_params=BACKEND_RUNTIME_PARAMS,
@@ -83,6 +124,19 @@ def __init_worker__(
     )
 
 
+def _load_schema(
+    pickled: bytes,
+    base: Optional[s_schema.Schema],
+) -> s_schema.Schema:
+    schema = pickle.loads(pickled)
+    if isinstance(schema, s_schema.FlatSchemaDelta):
+        # The IO process only sends a delta if it knows that we have
+        # the base schema.
+        assert isinstance(base, s_schema.FlatSchema)
+        schema = base.apply_delta(schema)
+    return schema
+
+
 def __sync__(
     dbname: str,
     user_schema: Optional[bytes],
@@ -115,7 +169,9 @@ def __sync__(
             updates = {}
 
             if user_schema is not None:
-                updates['user_schema'] = pickle.loads(user_schema)
+                updates['user_schema'] = _load_schema(
+                    user_schema, db.user_schema)
+                qlcontext.discard_persistent_ref_caches(db.user_schema)
             if reflection_cache is not None:
                 updates['reflection_cache'] = pickle.loads(reflection_cache)
             if database_config is not None:
@@ -126,7 +182,8 @@ def __sync__(
                 DBS = DBS.set(dbname, db)
 
         if global_schema is not None:
-            GLOBAL_SCHEMA = pickle.loads(global_schema)
+            qlcontext.discard_persistent_ref_caches(GLOBAL_SCHEMA)
+            GLOBAL_SCHEMA = _load_schema(global_schema, GLOBAL_SCHEMA)
 
         if system_config is not None:
             INSTANCE_CONFIG = pickle.loads(system_config)
@@ -171,11 +228,53 @@ def compile(
     LAST_STATE = cstate
     pickled_state = None
     if cstate is not None:
+        started_at = time.perf_counter()
         pickled_state = pickle.dumps(cstate, -1)
+        _add_timing(units, 'pickle', time.perf_counter() - started_at)
 
     return units, pickled_state
 
 
+def compile_batch(
+    dbname: str,
+    user_schema: Optional[bytes],
+    reflection_cache: Optional[bytes],
+    global_schema: Optional[bytes],
+    database_config: Optional[bytes],
+    system_config: Optional[bytes],
+    sources: List[edgeql.Source],
+    *compile_args: Any,
+):
+    db = __sync__(
+        dbname,
+        user_schema,
+        reflection_cache,
+        global_schema,
+        database_config,
+        system_config,
+    )
+
+    results: List[Tuple[Any, ...]] = []
+    for source in sources:
+        try:
+            units, _ = COMPILER.compile(
+                db.user_schema,
+                GLOBAL_SCHEMA,
+                db.reflection_cache,
+                db.database_config,
+                INSTANCE_CONFIG,
+                source,
+                *compile_args,
+            )
+        except Exception as ex:
+            worker_proc.prepare_exception(ex)
+            results.append((1, ex, traceback.format_exc()))
+        else:
+            results.append((0, units))
+
+    return results
+
+
 def compile_in_tx(cstate, *args, **kwargs):
     global LAST_STATE
     if cstate == state.REUSE_LAST_STATE_MARKER:
@@ -184,7 +283,20 @@ def compile_in_tx(cstate, *args, **kwargs):
         cstate = pickle.loads(cstate)
     units, cstate = COMPILER.compile_in_tx(cstate, *args, **kwargs)
     LAST_STATE = cstate
-    return units, pickle.dumps(cstate, -1)
+    started_at = time.perf_counter()
+    pickled_state = pickle.dumps(cstate, -1)
+    _add_timing(units, 'pickle', time.perf_counter() - started_at)
+    return units, pickled_state
+
+
+def _add_timing(
+    units: compiler.dbstate.QueryUnitGroup,
+    phase: str,
+    duration: float,
+) -> None:
+    if units.compile_timings is not None:
+        units.compile_timings[phase] = (
+            units.compile_timings.get(phase, 0.0) + duration)
 
 
 def compile_notebook(
@@ -233,7 +345,9 @@ def compile_graphql(
     system_config: Optional[bytes],
     *compile_args: Any,
     **compile_kwargs: Any,
-) -> tuple[compiler.QueryUnitGroup, graphql.TranspiledOperation]:
+) -> tuple[
+    compiler.QueryUnitGroup, graphql.TranspiledOperation, Optional[float]
+]:
     db = __sync__(
         dbname,
         user_schema,
@@ -243,6 +357,8 @@ def compile_graphql(
         system_config,
     )
 
+    gqlcore, build_duration = _get_gqlcore(db)
+
     gql_op = graphql.compile_graphql(
         STD_SCHEMA,
         db.user_schema,
@@ -250,6 +366,7 @@ def compile_graphql(
         db.database_config,
         INSTANCE_CONFIG,
         *compile_args,
+        gqlcore=gqlcore,
         **compile_kwargs
     )
 
@@ -277,12 +394,62 @@ def compile_graphql(
         protocol_version=defines.CURRENT_PROTOCOL,
     )
 
-    return unit_group, gql_op
+    return unit_group, gql_op, build_duration
+
+
+def build_graphql_schema(
+    dbname: str,
+    user_schema: Optional[bytes],
+    reflection_cache: Optional[bytes],
+    global_schema: Optional[bytes],
+    database_config: Optional[bytes],
+    system_config: Optional[bytes],
+) -> Optional[float]:
+    db = __sync__(
+        dbname,
+        user_schema,
+        reflection_cache,
+        global_schema,
+        database_config,
+        system_config,
+    )
+
+    _, build_duration = _get_gqlcore(db)
+    return build_duration
+
+
+def _get_gqlcore(
+    db: state.DatabaseState,
+) -> Tuple[graphql.GQLCoreSchema, Optional[float]]:
+    # Returns the GraphQL schema of the database and the time it took
+    # to build it, or None if it was already built.
+    cached = GQL_SCHEMAS.get(db.name)
+    if (
+        cached is not None
+        and cached[0] is db.user_schema
+        and cached[1] is GLOBAL_SCHEMA
+    ):
+        return cached[2], None
+
+    started_at = time.perf_counter()
+    gqlcore = graphql.build_gqlcore(STD_SCHEMA, db.user_schema, GLOBAL_SCHEMA)
+    # Replacing the entry lets go of the schema of the previous version.
+    GQL_SCHEMAS[db.name] = (db.user_schema, GLOBAL_SCHEMA, gqlcore)
+    _discard_dropped_gqlcores()
+    return gqlcore, time.perf_counter() - started_at
+
+
+def _discard_dropped_gqlcores() -> None:
+    # Let go of the GraphQL schemas of databases the worker no longer has.
+    for dbname in [name for name in GQL_SCHEMAS if name not in DBS]:
+        del GQL_SCHEMAS[dbname]
 
 
 def get_handler(methname):
     if methname == "__init_worker__":
         meth = __init_worker__
+    elif methname == "__load_snapshot__":
+        meth = __load_snapshot__
     else:
         if not INITED:
             raise RuntimeError(
@@ -290,12 +457,16 @@ def get_handler(methname):
             )
         if methname == "compile":
             meth = compile
+        elif methname == "compile_batch":
+            meth = compile_batch
         elif methname == "compile_in_tx":
             meth = compile_in_tx
         elif methname == "compile_notebook":
             meth = compile_notebook
         elif methname == "compile_graphql":
             meth = compile_graphql
+        elif methname == "build_graphql_schema":
+            meth = build_graphql_schema
         elif methname == "try_compile_rollback":
             meth = try_compile_rollback
         else:
@@ -31,6 +31,7 @@ from edb.common import markup
 from edb.edgeql import parser as ql_parser
 
 from . import amsg
+from . import wire
 
 
 # "created continuously" means the interval between two consecutive spawns
@@ -42,8 +43,13 @@ def worker(sockname, version_serial, get_handler):
     con = amsg.WorkerConnection(sockname, version_serial)
     try:
         for req_id, req in con.iter_request():
+            # Reply in the format of the request.
+            if wire.is_encoded(req):
+                decode, encode = wire.decode, wire.encode_response
+            else:
+                decode, encode = pickle.loads, _pickle_response
             try:
-                methname, args = pickle.loads(req)
+                methname, args = decode(req)
                 meth = get_handler(methname)
             except Exception as ex:
                 prepare_exception(ex)
@@ -61,17 +67,21 @@ def worker(sockname, version_serial, get_handler):
                     data = (1, ex, traceback.format_exc())
 
             try:
-                pickled = pickle.dumps(data, -1)
+                chunks = encode(data)
             except Exception as ex:
                 ex_tb = traceback.format_exc()
                 ex_str = f"{ex}:\n\n{ex_tb}"
-                pickled = pickle.dumps((2, ex_str), -1)
+                chunks = encode((2, ex_str))
 
-            con.reply(req_id, pickled)
+            con.reply(req_id, *chunks)
     finally:
         con.abort()
 
 
+def _pickle_response(data):
+    return [pickle.dumps(data, -1)]
+
+
 def run_worker(sockname, version_serial, get_handler):
     with devmode.CoverageConfig.enable_coverage_if_requested():
         worker(sockname, version_serial, get_handler)
@@ -107,9 +117,14 @@ def main(get_handler):
     parser.add_argument("--sockname")
     parser.add_argument("--numproc")
     parser.add_argument("--version-serial", type=int)
+    parser.add_argument("--snapshot")
     args = parser.parse_args()
 
     ql_parser.preload(allow_rebuild=False)
+    if args.snapshot:
+        # Load the initial state before forking, so that all workers
+        # share the memory it occupies.
+        get_handler("__load_snapshot__")(args.snapshot)
     gc.freeze()
 
     if args.numproc is None:
@@ -16,7 +16,7 @@
 # limitations under the License.
 #
 
-from .pool import Pool, _NaivePool  # NoQA
+from .pool import Pool, _NaivePool, DBQuota  # NoQA
 
 
-__all__ = ('Pool',)
+__all__ = ('Pool', 'DBQuota')
@@ -24,8 +24,12 @@ import typing
 import asyncio
 import collections
 import dataclasses
+import heapq
+import math
 import time
 
+from edb.server import metrics
+
 from . import rolavg
 
 
@@ -34,6 +38,12 @@ MIN_QUERY_TIME_THRESHOLD = 0.001
 MIN_LOG_TIME_THRESHOLD = 1
 CONNECT_FAILURE_RETRIES = 3
 MIN_IDLE_TIME_BEFORE_GC = 120
+# Seconds between samples of the per-block demand history that is used
+# to predict how many connections a block needs, see Pool._standby_tick()
+STANDBY_INTERVAL = 1
+STANDBY_HISTORY_SIZE = 10
+# Max new standby connections per block in one standby tick
+MAX_STANDBY_CONNECTS = 2
 
 logger = logging.getLogger("edb.server")
 
@@ -91,6 +101,20 @@ class Snapshot:
     successful_disconnects: int
 
 
+@dataclasses.dataclass(frozen=True)
+class DBQuota:
+    # Connections the database is guaranteed to keep while it needs them
+    min_conns: int = 0
+    # Hard cap of connections to the database, None means no cap
+    max_conns: typing.Optional[int] = None
+    # Share of the pool capacity relative to other databases, when the
+    # capacity is contended (Mode C)
+    weight: float = 1.0
+
+
+DEFAULT_DB_QUOTA = DBQuota()
+
+
 @dataclasses.dataclass
 class ConnectionState:
     in_use_since: float = 0
@@ -122,6 +146,7 @@ class Block(typing.Generic[C]):
     dbname: str
     conns: typing.Dict[C, ConnectionState]
     quota: int
+    db_quota: DBQuota
     pending_conns: int
     last_connect_timestamp: float
 
@@ -133,6 +158,8 @@ class Block(typing.Generic[C]):
 
     querytime_avg: rolavg.RollingAverage
     nwaiters_avg: rolavg.RollingAverage
+    demand_avg: rolavg.RollingAverage
+    peak_demand: int
 
     _cached_calibrated_demand: float
 
@@ -148,6 +175,7 @@ class Block(typing.Generic[C]):
         self.dbname = dbname
         self.conns = {}
         self.quota = 1
+        self.db_quota = DEFAULT_DB_QUOTA
         self.pending_conns = 0
         self.last_connect_timestamp = 0
 
@@ -161,6 +189,11 @@ class Block(typing.Generic[C]):
 
         self.querytime_avg = rolavg.RollingAverage(history_size=20)
         self.nwaiters_avg = rolavg.RollingAverage(history_size=3)
+        # Peak number of concurrent acquisitions in the recent standby
+        # intervals, used to predict the demand of the block.
+        self.demand_avg = rolavg.RollingAverage(
+            history_size=STANDBY_HISTORY_SIZE)
+        self.peak_demand = 0
 
         self._is_log_batching = False
         self._last_log_timestamp = 0
@@ -185,6 +218,16 @@ class Block(typing.Generic[C]):
         # Number of future connections that are still pending in connecting
         return self.pending_conns
 
+    def count_demand(self) -> int:
+        # The number of acquisitions, pending and acquired
+        return self.conn_waiters_num + self.conn_acquired_num
+
+    def is_in_use(self) -> bool:
+        # If the block has needed connections recently
+        return bool(
+            self.count_demand() or round(self.nwaiters_avg.avg())
+        )
+
     def count_conns_over_quota(self) -> int:
         # How many connections over the quota
         return max(self.count_conns() - self.quota, 0)
@@ -232,8 +275,10 @@ class Block(typing.Generic[C]):
         # for example).  In which case the waiter might get finally
         # woken up with an empty queue -- hence we use a `while` loop here.
         self.conn_waiters_num += 1
+        metrics.backend_pool_waiters.inc(1.0, self.dbname)
         try:
             attempts = 0
+            started_at = 0.0
 
             # Skip the waiters' queue if we can grab a connection from the
             # stack immediately - this is not completely fair, but it's
@@ -244,6 +289,8 @@ class Block(typing.Generic[C]):
                 waiter = self.loop.create_future()
 
                 attempts += 1
+                if attempts == 1:
+                    started_at = time.monotonic()
                 if attempts > 1:
                     # If the waiter was woken up only to discover that
                     # it needs to wait again, we don't want it to lose
@@ -271,10 +318,20 @@ class Block(typing.Generic[C]):
                         self._wakeup_next_waiter()
                     raise
 
+            if attempts:
+                metrics.backend_pool_acquires.inc(1.0, 'waited')
+                metrics.backend_pool_acquire_wait_duration.observe(
+                    time.monotonic() - started_at, self.dbname)
+            else:
+                metrics.backend_pool_acquires.inc(1.0, 'immediate')
+                metrics.backend_pool_acquire_wait_duration.observe(
+                    0.0, self.dbname)
+
             # Yield the most recently used connection from the top of the stack
             return self.conn_stack.pop()
         finally:
             self.conn_waiters_num -= 1
+            metrics.backend_pool_waiters.dec(1.0, self.dbname)
 
     def release(self, conn: C) -> None:
         # Put the connection (back) to the top of the stack,
@@ -547,6 +604,7 @@ class BasePool(typing.Generic[C]):
             block.pending_conns -= 1
         self._successful_connects += 1
         block.conns[conn] = ConnectionState()
+        metrics.backend_pool_connections.inc(1.0, block.dbname)
         block.last_connect_timestamp = ended_at
 
         # Release the connection to block waiters.
@@ -589,6 +647,7 @@ class BasePool(typing.Generic[C]):
         started_at = time.monotonic()
         assert not from_block.conns[from_conn].in_use
         from_block.conns.pop(from_conn)
+        metrics.backend_pool_connections.dec(1.0, from_block.dbname)
         to_block.pending_conns += 1
         if self._is_starving:
             self._blocks.move_to_end(to_block.dbname, last=True)
@@ -607,11 +666,15 @@ class BasePool(typing.Generic[C]):
             dbname=block.dbname, event='connect', value=block.count_conns())
         self._get_loop().create_task(self._connect(block, started_at, event))
 
-    async def _discard_conn(self, block: Block[C], conn: C) -> None:
+    def _forget_conn(self, block: Block[C], conn: C) -> None:
         assert not block.conns[conn].in_use
         block.conns.pop(conn)
+        metrics.backend_pool_connections.dec(1.0, block.dbname)
         self._log_to_snapshot(
             dbname=block.dbname, event='disconnect', value=block.count_conns())
+
+    async def _discard_conn(self, block: Block[C], conn: C) -> None:
+        self._forget_conn(block, conn)
         await self._disconnect(conn, block)
         block.log_connection("discarded")
 
@@ -655,6 +718,23 @@ class Pool(BasePool[C]):
     # Mode D reuses the framework of Mode C but runs separate logic in a
     # different if-else branch. In short, the pool reallocates the limited
     # total number of connections to different blocks in a round-robin fashion.
+    #
+    # Optionally (warm_standby > 0), the pool also keeps connections ready
+    # ahead of demand in Modes A and B, so that bursts of acquisitions don't
+    # have to wait for new connections to be established.  Every block keeps
+    # a history of its peak number of concurrent acquisitions, sampled once
+    # per STANDBY_INTERVAL, and the pool pre-creates connections until the
+    # block has as many as the average peak predicts, with at most
+    # warm_standby of them idle.  GC doesn't discard those connections, and
+    # they are created gradually to avoid churn; as they are idle, they are
+    # the first ones to be transferred to other blocks in Mode C.
+    #
+    # Databases may also have a DBQuota (see set_db_quotas()): a hard cap on
+    # the number of their connections that holds in all modes, a minimum
+    # number of connections they keep while they are in use, which other
+    # blocks cannot take away from them, and a weight that scales their
+    # demand when the capacity is distributed in Mode C.  The calibrated
+    # quotas are clamped to those bounds after every tick.
 
     _new_blocks_waitlist: collections.OrderedDict[Block[C], bool]
     _blocks_over_quota: typing.List[Block[C]]
@@ -663,6 +743,9 @@ class Pool(BasePool[C]):
     _to_drop: typing.List[Block[C]]
     _gc_interval: float  # minimum seconds between GC runs
     _gc_requests: int  # number of GC requests
+    _warm_standby: int  # max idle connections kept ready per block
+    _hstandby: typing.Optional[asyncio.Handle]
+    _db_quotas: typing.Dict[str, DBQuota]
 
     def __init__(
         self,
@@ -672,6 +755,7 @@ class Pool(BasePool[C]):
         max_capacity: int,
         stats_collector: typing.Optional[StatsCollector]=None,
         min_idle_time_before_gc: float = MIN_IDLE_TIME_BEFORE_GC,
+        warm_standby: int = 0,
     ) -> None:
         super().__init__(
             connect=connect,
@@ -690,6 +774,29 @@ class Pool(BasePool[C]):
         self._to_drop = []
         self._gc_interval = min_idle_time_before_gc
         self._gc_requests = 0
+        self._warm_standby = warm_standby
+        self._hstandby = None
+        self._db_quotas = {}
+
+    def set_db_quotas(self, quotas: typing.Mapping[str, DBQuota]) -> None:
+        # Replace the per-database quotas.  Blocks over their new cap
+        # give up connections as they are released.
+        self._db_quotas = dict(quotas)
+        for block in self._blocks.values():
+            block.db_quota = self._db_quotas.get(
+                block.dbname, DEFAULT_DB_QUOTA)
+
+    def _new_block(self, dbname: str) -> Block[C]:
+        block = super()._new_block(dbname)
+        block.db_quota = self._db_quotas.get(dbname, DEFAULT_DB_QUOTA)
+        return block
+
+    def _get_conn_limit(self, block: Block[C]) -> int:
+        # The max number of connections the block may have
+        max_conns = block.db_quota.max_conns
+        if max_conns is None or max_conns > self._max_capacity:
+            return self._max_capacity
+        return max_conns
 
     def _maybe_schedule_tick(self) -> None:
         if self._first_tick:
@@ -725,7 +832,7 @@ class Pool(BasePool[C]):
             self._is_starving = False
             if nblocks:
                 first_block = next(iter(self._blocks.values()))
-                first_block.quota = self._max_capacity
+                first_block.quota = self._get_conn_limit(first_block)
                 first_block.nwaiters_avg.add(first_block.count_waiters())
             return
 
@@ -758,7 +865,8 @@ class Pool(BasePool[C]):
 
             demand = (
                 max(nwaiters_avg, nwaiters) *
-                max(block.querytime_avg.avg(), MIN_QUERY_TIME_THRESHOLD)
+                max(block.querytime_avg.avg(), MIN_QUERY_TIME_THRESHOLD) *
+                block.db_quota.weight
             )
             total_calibrated_demand += demand
             block._cached_calibrated_demand = demand
@@ -778,6 +886,9 @@ class Pool(BasePool[C]):
             # The total demand for connections is lower than our max capacity,
             # we could bail out early.
 
+            if self._db_quotas:
+                self._apply_db_quotas()
+
             if self._cur_capacity >= self._max_capacity:
                 # GOTCHA: this is still Mode C, because the total_nwaiters
                 # number doesn't include the unused connections in the stacks
@@ -866,8 +977,115 @@ class Pool(BasePool[C]):
                 self._log_to_snapshot(
                     dbname=block.dbname, event='set-quota', value=block.quota)
 
+            if self._db_quotas:
+                self._apply_db_quotas()
+
             self._maybe_rebalance()
 
+    def _apply_db_quotas(self) -> None:
+        # Clamp the calibrated per-block quotas to the configured minimum
+        # and maximum of their databases, then bring the total back to the
+        # max capacity: guarantees may have pushed it over, and caps may
+        # have left some capacity unassigned.
+        total = 0
+        # (priority, index, number of connections, block)
+        excess: typing.List[typing.Tuple[float, int, int, Block[C]]] = []
+        unmet: typing.List[typing.Tuple[float, int, int, Block[C]]] = []
+        for i, block in enumerate(self._blocks.values()):
+            limit = self._get_conn_limit(block)
+            demand = block.count_demand()
+            weight = block.db_quota.weight
+            guaranteed = min(block.db_quota.min_conns, demand, limit)
+            quota = min(max(block.quota, guaranteed), limit)
+            if quota != block.quota:
+                block.quota = quota
+                self._log_to_snapshot(
+                    dbname=block.dbname, event='set-quota', value=quota)
+            total += quota
+            if quota > guaranteed:
+                n = quota - guaranteed
+                excess.append((-n / weight, i, n, block))
+            if quota < limit and demand > quota:
+                n = min(demand, limit) - quota
+                unmet.append((quota / weight, i, n, block))
+
+        # Take the excess from the blocks with the most connections above
+        # their guarantee relative to their weight, one at a time.
+        heapq.heapify(excess)
+        while total > self._max_capacity and excess:
+            _, i, n, block = heapq.heappop(excess)
+            block.quota -= 1
+            total -= 1
+            n -= 1
+            if n:
+                heapq.heappush(
+                    excess, (-n / block.db_quota.weight, i, n, block))
+
+        # Give the spare capacity to the blocks with unmet demand, to the
+        # one with the fewest connections relative to its weight first.
+        heapq.heapify(unmet)
+        while total < self._max_capacity and unmet:
+            _, i, n, block = heapq.heappop(unmet)
+            block.quota += 1
+            total += 1
+            n -= 1
+            if n:
+                heapq.heappush(
+                    unmet, (block.quota / block.db_quota.weight, i, n, block))
+
+    def _maybe_schedule_standby(self) -> None:
+        if not self._warm_standby or self._hstandby is not None:
+            return
+
+        self._hstandby = self._get_loop().call_later(
+            STANDBY_INTERVAL, self._standby_tick)
+
+    def _get_standby_target(self, block: Block[C]) -> int:
+        # The number of connections the block is predicted to need:
+        # the average of its recent peak demand, but with no more than
+        # `_warm_standby` connections idle.
+        if not self._warm_standby:
+            return 0
+        return min(
+            math.ceil(block.demand_avg.avg()),
+            block.conn_acquired_num + self._warm_standby,
+            self._get_conn_limit(block),
+        )
+
+    def _standby_tick(self) -> None:
+        self._hstandby = None
+
+        has_demand = False
+        for block in self._blocks.values():
+            block.demand_avg.add(block.peak_demand)
+            block.peak_demand = (
+                block.conn_acquired_num + block.count_waiters())
+            if block.demand_avg.avg():
+                has_demand = True
+
+        if not has_demand:
+            # Nothing to predict, acquire() will restart the ticks.
+            return
+        self._maybe_schedule_standby()
+
+        if self._is_starving or len(self._blocks) > self._max_capacity:
+            # Connections are scarce, leave them to the regular
+            # balancing logic.
+            return
+
+        for block in self._blocks.values():
+            if block.connect_failures_num:
+                continue
+            nconns = block.count_conns()
+            missing = min(
+                self._get_standby_target(block) - nconns,
+                MAX_STANDBY_CONNECTS,
+                self._max_capacity - self._cur_capacity,
+            )
+            for _ in range(missing):
+                self._schedule_new_conn(block, 'pre-established')
+                metrics.backend_pool_preconnects.inc()
+
     def _maybe_rebalance(self) -> None:
         if self._is_starving:
             return
@@ -897,12 +1115,24 @@ class Pool(BasePool[C]):
             )
 
     def _should_free_conn(self, from_block: Block[C]) -> bool:
+        from_block_size = from_block.count_conns()
+
+        # A block over the cap of its database always gives connections up.
+        if from_block_size > self._get_conn_limit(from_block):
+            return True
+
         # First, if we only manage one connection to one PostgreSQL DB --
         # we don't need to bother with rebalancing the pool. So we bail out.
         if len(self._blocks) <= 1:
             return False
 
-        from_block_size = from_block.count_conns()
+        # We also bail out if the block is in use and doesn't have more
+        # connections than its database is guaranteed.
+        if (
+            from_block_size <= from_block.db_quota.min_conns and
+            from_block.is_in_use()
+        ):
+            return False
 
         # Second, we bail out if:
         #
@@ -1051,8 +1281,11 @@ class Pool(BasePool[C]):
     async def _acquire(self, dbname: str) -> C:
         block = self._get_block(dbname)
 
-        room_for_new_conns = self._cur_capacity < self._max_capacity
         block_nconns = block.count_conns()
+        room_for_new_conns = (
+            self._cur_capacity < self._max_capacity and
+            block_nconns < self._get_conn_limit(block)
+        )
 
         if room_for_new_conns:
             # First, schedule new connections if needed.
@@ -1116,7 +1349,14 @@ class Pool(BasePool[C]):
         # within 1-2 GC intervals.
         only_older_than = time.monotonic() - self._gc_interval
         for block in self._blocks.values():
-            while (conn := block.try_steal(only_older_than)) is not None:
+            # Keep the connections the block is predicted to need.
+            nconns = block.count_conns()
+            keep = self._get_standby_target(block)
+            while (
+                nconns > keep
+                and (conn := block.try_steal(only_older_than)) is not None
+            ):
+                nconns -= 1
                 loop.create_task(self._discard_conn(block, conn))
 
     async def acquire(self, dbname: str) -> C:
@@ -1133,6 +1373,11 @@ class Pool(BasePool[C]):
         block.conns[conn].in_use = True
         block.conns[conn].in_use_since = time.monotonic()
 
+        demand = block.conn_acquired_num + block.count_waiters()
+        if demand > block.peak_demand:
+            block.peak_demand = demand
+        self._maybe_schedule_standby()
+
         return conn
 
     def release(self, dbname: str, conn: C, *, discard: bool=False) -> None:
@@ -1175,6 +1420,16 @@ class Pool(BasePool[C]):
                 self._schedule_new_conn(block)
                 return
 
+            if block.count_conns() > self._get_conn_limit(block):
+                # The cap of the database was lowered, and there is no
+                # other block to transfer the connection to.  Forget the
+                # connection right away, so that the next release sees
+                # the block without it.
+                self._forget_conn(block, conn)
+                self._get_loop().create_task(self._disconnect(conn, block))
+                block.log_connection("discarded")
+                return
+
             block.release(conn)
 
             # Only request for GC if the connection is released unused
@@ -1207,6 +1462,8 @@ class Pool(BasePool[C]):
             block.conn_stack.clear()
             for conn in block.conns:
                 coros.append(self._disconnect(conn, block))
+            metrics.backend_pool_connections.dec(
+                len(block.conns), block.dbname)
             block.conns.clear()
             self._log_to_snapshot(
                 dbname=block.dbname, event='disconnect', value=0)
@@ -65,6 +65,9 @@ cdef class DatabaseIndex:
         object _std_schema
         object _global_schema
         object _factory
+        object _query_cache_dir
+        object _workload_dir
+        int _workload_size
 
 
 cdef class Database:
@@ -75,6 +78,11 @@ cdef class Database:
         object _views
         object _introspection_lock
         object _state_serializers
+        object _persistent_cache
+        dict _persist_pending
+        object _persist_task
+        object _workload
+        dict _compiles_in_flight
 
         readonly str name
         readonly object dbver
@@ -83,11 +91,17 @@ cdef class Database:
         readonly object reflection_cache
         readonly object backend_ids
         readonly object extensions
+        readonly object graphql_persisted_queries
 
     cdef schedule_config_update(self)
 
     cdef _invalidate_caches(self)
+    cdef _invalidate_dependent_caches(self, old_schema, old_dbver)
     cdef _cache_compiled_query(self, key, query_unit)
+    cdef _update_persistent_cache_version(self)
+    cdef _persistent_cache_key(self, key, db_config)
+    cdef _persist_compiled_query(self, key, query_unit, db_config)
+    cdef _record_query_use(self, key)
     cdef _new_view(self, query_cache, protocol_version)
     cdef _remove_view(self, view)
     cdef _update_backend_ids(self, new_types)
@@ -22,6 +22,7 @@ from typing import (
 
 import asyncio
 import base64
+import functools
 import json
 import os.path
 import pickle
@@ -33,13 +34,16 @@ import weakref
 import immutables
 
 from edb import errors
-from edb.common import lru, uuidgen
+from edb.common import debug, lru, uuidgen
 from edb import edgeql
 from edb.edgeql import qltypes
 from edb.schema import extensions as s_ext
 from edb.schema import schema as s_schema
+from edb.schema import version as s_ver
 from edb.server import compiler, defines, config, metrics
-from edb.server.compiler import dbstate, sertypes
+from edb.server.cache import persistent as persistent_cache
+from edb.server.cache import workload as query_workload
+from edb.server.compiler import dbstate, dependencies, sertypes
 from edb.pgsql import dbops
 
 cimport cython
@@ -165,6 +169,34 @@ cdef class Database:
         self._eql_to_compiled = lru.LRUMapping(
             maxsize=defines._MAX_QUERIES_CACHE)
 
+        # Compilations in progress, see compile_coalesced().
+        self._compiles_in_flight = {}
+
+        # GraphQL queries registered by clients by their hash, see
+        # the GraphQL extension.
+        self.graphql_persisted_queries = lru.LRUMapping(
+            maxsize=defines.GRAPHQL_PERSISTED_QUERIES_CACHE_SIZE)
+
+        # Compiled queries persisted across server restarts; entries are
+        # only loaded from disk on a miss in `_eql_to_compiled`.  The disk
+        # is accessed in the default executor, new entries are queued in
+        # `_persist_pending` and written in batches by `_persist_task`.
+        if index._query_cache_dir is not None:
+            self._persistent_cache = persistent_cache.PersistentQueryCache(
+                index._query_cache_dir, name)
+        else:
+            self._persistent_cache = None
+        self._persist_pending = {}
+        self._persist_task = None
+
+        # Usage counts of cached queries, saved to a manifest to warm
+        # up the cache after a restart.
+        if index._workload_dir is not None:
+            self._workload = query_workload.QueryWorkload(
+                index._workload_dir, name, index._workload_size)
+        else:
+            self._workload = None
+
         self.db_config = db_config
         self.user_schema = user_schema
         self.reflection_cache = reflection_cache
@@ -177,6 +209,8 @@ cdef class Database:
         else:
             self.extensions = extensions
 
+        self._update_persistent_cache_version()
+
     @property
     def server(self):
         return self._index._server
@@ -194,6 +228,23 @@ cdef class Database:
         if new_schema is None:
             raise AssertionError('new_schema is not supposed to be None')
 
+        # Cached queries compiled against the old schema only survive
+        # if nothing else that affects compilation has changed.
+        old_schema = self.user_schema
+        partial = (
+            old_schema is not None
+            and (
+                reflection_cache is None
+                or reflection_cache == self.reflection_cache
+            )
+            and (
+                db_config is None
+                or config.get_compilation_config(db_config)
+                    == config.get_compilation_config(self.db_config)
+            )
+        )
+
+        old_dbver = self.dbver
         self.dbver = next_dbver()
 
         self.user_schema = new_schema
@@ -209,15 +260,63 @@ cdef class Database:
             self.reflection_cache = reflection_cache
         if db_config is not None:
             self.db_config = db_config
-        self._invalidate_caches()
+        if partial:
+            self._invalidate_dependent_caches(old_schema, old_dbver)
+        else:
+            self._invalidate_caches()
+        self._update_persistent_cache_version()
+
+        if old_schema is not None and self._workload is not None:
+            # Recompile the frequently used queries that were evicted.
+            self._index._server.schedule_query_workload_warmup(self.name)
+
+        if old_schema is not None and 'graphql' in self.extensions:
+            # Rebuild the GraphQL schema before the next GraphQL query.
+            self._index._server.schedule_graphql_schema_build(self.name)
 
     cdef _update_backend_ids(self, new_types):
         self.backend_ids.update(new_types)
 
     cdef _invalidate_caches(self):
+        evicted = len(self._eql_to_compiled)
+        if evicted:
+            metrics.edgeql_query_cache_invalidations.inc(evicted, 'evicted')
         self._eql_to_compiled.clear()
         self._state_serializers.clear()
 
+    cdef _invalidate_dependent_caches(self, old_schema, old_dbver):
+        # Only evict queries that depend on the changed schema objects
+        # and carry the rest over to the new dbver.
+        self._state_serializers.clear()
+
+        if not self._eql_to_compiled:
+            return
+
+        affected = dependencies.get_affected_deps(
+            old_schema, self.user_schema)
+
+        kept = evicted = 0
+        # Iterating in LRU order and re-setting the survivors preserves
+        # their relative recency.
+        for key in list(self._eql_to_compiled):
+            compiled, dbver = self._eql_to_compiled[key]
+            deps = compiled.schema_deps
+            if (
+                dbver != old_dbver
+                or deps is None
+                or not deps.isdisjoint(affected)
+            ):
+                del self._eql_to_compiled[key]
+                evicted += 1
+            else:
+                self._eql_to_compiled[key] = compiled, self.dbver
+                kept += 1
+
+        if kept:
+            metrics.edgeql_query_cache_invalidations.inc(kept, 'kept')
+        if evicted:
+            metrics.edgeql_query_cache_invalidations.inc(evicted, 'evicted')
+
     cdef _cache_compiled_query(self, key, compiled: dbstate.QueryUnitGroup):
         assert compiled.cacheable
 
@@ -228,6 +327,175 @@ cdef class Database:
 
         self._eql_to_compiled[key] = compiled, self.dbver
 
+    cdef _update_persistent_cache_version(self):
+        if self._persistent_cache is None or self.user_schema is None:
+            return
+
+        ver = self.user_schema.get_global(
+            s_ver.SchemaVersion, '__schema_version__', None)
+        if ver is None:
+            return
+
+        version = ver.get_version(self.user_schema)
+        if version == self._persistent_cache.schema_version:
+            return
+
+        # The queued entries were compiled for the old schema.
+        self._persist_pending.clear()
+        self._persistent_cache.set_schema_version(version)
+        asyncio.get_running_loop().run_in_executor(
+            None, self._persistent_cache.prune)
+
+    cdef _persistent_cache_key(self, key, db_config):
+        cdef QueryRequestInfo query_req
+        query_req, modaliases, session_config = key
+        return persistent_cache.make_key(
+            query_req.source.cache_key(),
+            protocol_version=query_req.protocol_version,
+            output_format=query_req.output_format,
+            input_format=query_req.input_format,
+            flags=(
+                query_req.expect_one,
+                query_req.implicit_limit,
+                query_req.inline_typeids,
+                query_req.inline_typenames,
+                query_req.inline_objectids,
+            ),
+            modaliases=modaliases,
+            session_config=session_config,
+            database_config=config.get_compilation_config(db_config),
+            system_config=self._index._comp_sys_config,
+        )
+
+    async def _lookup_persisted_query(self, key, db_config):
+        if (
+            self._persistent_cache is None
+            or self._persistent_cache.schema_version is None
+        ):
+            return None
+
+        dbver = self.dbver
+        pkey = self._persistent_cache_key(key, db_config)
+        compiled = self._persist_pending.get(pkey)
+        if compiled is None:
+            compiled = await asyncio.get_running_loop().run_in_executor(
+                None, self._persistent_cache.get, pkey)
+            if self.dbver != dbver:
+                # The schema or the config has changed in the meantime.
+                return None
+        if compiled is None:
+            metrics.query_persistent_cache_lookups.inc(1.0, 'miss')
+            return None
+
+        metrics.query_persistent_cache_lookups.inc(1.0, 'hit')
+        self._cache_compiled_query(key, compiled)
+        return compiled
+
+    cdef _persist_compiled_query(self, key, compiled, db_config):
+        if (
+            self._persistent_cache is None
+            or self._persistent_cache.schema_version is None
+        ):
+            return
+
+        self._persist_pending[
+            self._persistent_cache_key(key, db_config)] = compiled
+        if self._persist_task is None:
+            self._persist_task = asyncio.create_task(
+                self._write_persisted_queries())
+
+    async def _write_persisted_queries(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._persist_pending:
+                # Entries queued while a batch is being written are
+                # picked up by the next iteration.
+                batch = self._persist_pending
+                self._persist_pending = {}
+                await loop.run_in_executor(
+                    None,
+                    self._persistent_cache.put_many,
+                    self._persistent_cache.schema_version,
+                    batch,
+                )
+        finally:
+            self._persist_task = None
+
+    cdef _record_query_use(self, key):
+        query_req, modaliases, session_config = key
+        if self._workload is not None and not session_config:
+            # Queries run with a session config are not recorded, as
+            # the config cannot be faithfully saved to a manifest.
+            self._workload.record(key)
+
+    def save_query_workload(self):
+        """Save the most frequently used queries to the manifest."""
+        cdef QueryRequestInfo query_req
+
+        if self._workload is None:
+            return
+
+        entries = []
+        for key, uses in self._workload.most_common():
+            query_req, modaliases, _ = key
+            source = query_req.source
+            if isinstance(source, edgeql.NormalizedSource):
+                # Don't save the constants of queries, which might well
+                # be user data.
+                normalized = True
+                text = source.normalized_text()
+            else:
+                normalized = False
+                text = source.text()
+            entries.append({
+                'query': text,
+                'normalized': normalized,
+                'first_extra': source.first_extra(),
+                'extra_counts': list(source.extra_counts()),
+                'protocol_version': list(query_req.protocol_version),
+                'output_format': str(query_req.output_format),
+                'input_format': str(query_req.input_format),
+                'expect_one': query_req.expect_one,
+                'implicit_limit': query_req.implicit_limit,
+                'inline_typeids': query_req.inline_typeids,
+                'inline_typenames': query_req.inline_typenames,
+                'inline_objectids': query_req.inline_objectids,
+                'modaliases': sorted(
+                    ([k, v] for k, v in modaliases.items()),
+                    key=lambda i: (i[0] or '', i[1]),
+                ),
+                'uses': uses,
+            })
+        self._workload.save(entries)
+
+    async def warm_up_query_workload(self, *, from_manifest=False):
+        """Compile the most frequently used queries that are not cached.
+
+        With *from_manifest* the queries are taken from the manifest
+        saved by save_query_workload(), otherwise from the usage counts
+        collected since the server start.
+        """
+        if self._workload is None:
+            return 0
+
+        if from_manifest:
+            keys = []
+            for entry in self._workload.load():
+                try:
+                    key = _query_cache_key_from_manifest(entry)
+                except Exception:
+                    # Entries that fail to load are simply skipped;
+                    # e.g. the query might no longer parse.
+                    continue
+                self._workload.record(key, entry.get('uses', 1))
+                keys.append(key)
+        else:
+            keys = [key for key, _ in self._workload.most_common()]
+
+        if not keys:
+            return 0
+        return await self.warm_up_query_cache(keys)
+
     cdef _new_view(self, query_cache, protocol_version):
         view = DatabaseConnectionView(
             self, query_cache=query_cache, protocol_version=protocol_version
@@ -253,6 +521,142 @@ cdef class Database:
     def get_query_cache_size(self):
         return len(self._eql_to_compiled)
 
+    async def compile_coalesced(self, key, compile_fn, *args):
+        """Call *compile_fn* unless a compilation of *key* is in progress.
+
+        Connections that miss the query cache for the same query at the
+        same time all wait for a single compilation instead of each
+        occupying a compiler worker.  The compilation runs in its own
+        task, so a waiter going away does not cancel it for the others.
+        """
+        task = self._compiles_in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(compile_fn(*args))
+            self._compiles_in_flight[key] = task
+            task.add_done_callback(
+                functools.partial(self._on_compile_done, key))
+        else:
+            metrics.edgeql_query_compilations_coalesced.inc()
+        return await asyncio.shield(task)
+
+    def _on_compile_done(self, key, task):
+        if self._compiles_in_flight.get(key) is task:
+            del self._compiles_in_flight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved in case all waiters are
+            # gone; they have received it otherwise.
+            task.exception()
+
+    async def warm_up_query_cache(
+        self,
+        keys,
+        *,
+        batch_size=defines.QUERY_CACHE_WARMUP_BATCH_SIZE,
+        concurrency=defines.QUERY_CACHE_WARMUP_CONCURRENCY,
+    ):
+        """Compile and cache queries ahead of their first use.
+
+        *keys* are query cache keys, i.e. ``(query_req, modaliases,
+        session_config)`` tuples.  Queries compiled with the same options
+        are sent to the compiler pool in batches, running at most
+        *concurrency* batches at a time.  Returns the number of queries
+        that were compiled and cached.
+        """
+        await self.introspection()
+
+        dbver = self.dbver
+        db_config = self.db_config
+        batches = {}
+        for key in keys:
+            existing, qu_dbver = self._eql_to_compiled.get(key, DICTDEFAULT)
+            if existing is not None and qu_dbver == dbver:
+                continue
+            if await self._lookup_persisted_query(
+                key, db_config
+            ) is not None:
+                continue
+            query_req, modaliases, session_config = key
+            options = (
+                modaliases,
+                session_config,
+                query_req.protocol_version,
+                query_req.output_format,
+                query_req.input_format,
+                query_req.expect_one,
+                query_req.implicit_limit,
+                query_req.inline_typeids,
+                query_req.inline_typenames,
+                query_req.inline_objectids,
+            )
+            batch = batches.setdefault(options, [])
+            if batch and len(batch[-1]) < batch_size:
+                batch[-1].append(key)
+            else:
+                batch.append([key])
+
+        sem = asyncio.Semaphore(concurrency)
+        counts = await asyncio.gather(*(
+            self._warm_up_batch(sem, dbver, options, batch_keys)
+            for options, batch in batches.items()
+            for batch_keys in batch
+        ))
+        return sum(counts)
+
+    async def _warm_up_batch(self, sem, dbver, options, keys):
+        (
+            modaliases,
+            session_config,
+            protocol_version,
+            output_format,
+            input_format,
+            expect_one,
+            implicit_limit,
+            inline_typeids,
+            inline_typenames,
+            inline_objectids,
+        ) = options
+
+        async with sem:
+            if self.dbver != dbver:
+                return 0
+
+            compiler_pool = self._index._server.get_compiler_pool()
+            db_config = self.db_config
+            results = await compiler_pool.compile_batch(
+                self.name,
+                self.user_schema,
+                self._index._global_schema,
+                self.reflection_cache,
+                db_config,
+                self._index._comp_sys_config,
+                [key[0].source for key in keys],
+                modaliases,
+                session_config,
+                output_format,
+                expect_one,
+                implicit_limit,
+                inline_typeids,
+                inline_typenames,
+                False,  # skip_first
+                protocol_version,
+                inline_objectids,
+                input_format is compiler.InputFormat.JSON,
+            )
+
+        if self.dbver != dbver:
+            # The schema or the config has changed in the meantime.
+            return 0
+
+        cached = 0
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception) or not result.cacheable:
+                continue
+            self._cache_compiled_query(key, result)
+            self._persist_compiled_query(key, result, db_config)
+            cached += 1
+        metrics.edgeql_query_compilations.inc(cached, 'warmup')
+        return cached
+
     async def introspection(self):
         if self.user_schema is None:
             async with self._introspection_lock:
@@ -260,6 +664,33 @@ cdef class Database:
                     await self._index._server.introspect_db(self.name)
 
 
+def _query_cache_key_from_manifest(entry):
+    normalize = not debug.flags.edgeql_disable_normalization
+    if entry['normalized'] != normalize:
+        # The query would not match the cache key of the requests.
+        raise ValueError('query normalization has been toggled')
+    if entry['normalized']:
+        source = edgeql.NormalizedSource.from_normalized_text(
+            entry['query'], entry['first_extra'], entry['extra_counts'])
+    else:
+        source = edgeql.Source.from_string(entry['query'])
+
+    query_req = QueryRequestInfo(
+        source,
+        tuple(entry['protocol_version']),
+        output_format=compiler.OutputFormat(entry['output_format']),
+        input_format=compiler.InputFormat(entry['input_format']),
+        expect_one=entry['expect_one'],
+        implicit_limit=entry['implicit_limit'],
+        inline_typeids=entry['inline_typeids'],
+        inline_typenames=entry['inline_typenames'],
+        inline_objectids=entry['inline_objectids'],
+    )
+    modaliases = immutables.Map(
+        (k, v) for k, v in entry['modaliases'])
+    return query_req, modaliases, DEFAULT_CONFIG
+
+
 cdef class DatabaseConnectionView:
 
     _eql_to_compiled: typing.Mapping[bytes, dbstate.QueryUnitGroup]
@@ -715,6 +1146,8 @@ cdef class DatabaseConnectionView:
             self._eql_to_compiled[key] = query_unit_group
         else:
             self._db._cache_compiled_query(key, query_unit_group)
+            self._db._persist_compiled_query(
+                key, query_unit_group, self.get_database_config())
 
     cdef lookup_compiled_query(self, object key):
         if (self._tx_error or
@@ -734,6 +1167,18 @@ cdef class DatabaseConnectionView:
 
         return query_unit_group
 
+    async def _lookup_persisted_query(self, object key):
+        # Unlike lookup_compiled_query() this may have to read the entry
+        # from disk, so it is only tried right before compiling.
+        if (self._tx_error or
+                not self._query_cache_enabled or
+                self._in_tx_with_ddl):
+            return None
+
+        key = (key, self.get_modaliases(), self.get_session_config())
+        return await self._db._lookup_persisted_query(
+            key, self.get_database_config())
+
     cdef tx_error(self):
         if self._in_tx:
             self._tx_error = True
@@ -947,6 +1392,8 @@ cdef class DatabaseConnectionView:
     ) -> CompiledQuery:
         source = query_req.source
         query_unit_group = self.lookup_compiled_query(query_req)
+        if query_unit_group is None:
+            query_unit_group = await self._lookup_persisted_query(query_req)
         cached = True
         if query_unit_group is None:
             # Cache miss; need to compile this query.
@@ -992,6 +1439,10 @@ cdef class DatabaseConnectionView:
         if not cached and query_unit_group.cacheable:
             self.cache_compiled_query(query_req, query_unit_group)
 
+        if query_unit_group.cacheable and not self._in_tx_with_ddl:
+            self._db._record_query_use(
+                (query_req, self.get_modaliases(), self.get_session_config()))
+
         metrics.edgeql_query_compilations.inc(
             1.0,
             'cache' if cached else 'compiler'
@@ -1031,7 +1482,7 @@ cdef class DatabaseConnectionView:
                     self.in_tx_error(),
                 )
             else:
-                result = await compiler_pool.compile(
+                args = (
                     self.dbname,
                     self.get_user_schema(),
                     self.get_global_schema(),
@@ -1051,6 +1502,21 @@ cdef class DatabaseConnectionView:
                     query_req.inline_objectids,
                     query_req.input_format is compiler.InputFormat.JSON,
                 )
+                if self._query_cache_enabled:
+                    # The schemas and configs are compared by identity,
+                    # which is stable as the in-flight compilation keeps
+                    # them alive; configs may contain unhashable values.
+                    key = (
+                        query_req,
+                        self.get_modaliases(),
+                        self.get_session_config(),
+                        skip_first,
+                        tuple(id(arg) for arg in args[1:6]),
+                    )
+                    result = await self._db.compile_coalesced(
+                        key, compiler_pool.compile, *args)
+                else:
+                    result = await compiler_pool.compile(*args)
         finally:
             metrics.edgeql_query_compilation_duration.observe(
                 time.monotonic() - started_at)
@@ -1076,9 +1542,22 @@ cdef class DatabaseConnectionView:
 
 cdef class DatabaseIndex:
 
-    def __init__(self, server, *, std_schema, global_schema, sys_config):
+    def __init__(
+        self,
+        server,
+        *,
+        std_schema,
+        global_schema,
+        sys_config,
+        query_cache_dir=None,
+        workload_dir=None,
+        workload_size=0,
+    ):
         self._dbs = {}
         self._server = server
+        self._query_cache_dir = query_cache_dir
+        self._workload_dir = workload_dir if workload_size > 0 else None
+        self._workload_size = workload_size
         self._std_schema = std_schema
         self._global_schema = global_schema
         self.update_sys_config(sys_config)
@@ -1149,7 +1628,14 @@ cdef class DatabaseIndex:
             self._dbs[dbname] = db
 
     def unregister_db(self, dbname):
-        self._dbs.pop(dbname)
+        cdef Database db
+        db = self._dbs.pop(dbname)
+        if db._persistent_cache is not None:
+            db._persist_pending.clear()
+            asyncio.get_running_loop().run_in_executor(
+                None, db._persistent_cache.clear)
+        if db._workload is not None:
+            db._workload.clear()
 
     def iter_dbs(self):
         return iter(self._dbs.values())
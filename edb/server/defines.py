@@ -53,6 +53,31 @@ BACKEND_COMPILER_TEMPLATE_PROC_RESTART_INTERVAL = 1
 
 _MAX_QUERIES_CACHE = 1000
 
+# Queries compiled ahead of their first use are sent to the compiler
+# pool in batches of this size, with at most this many batches at once.
+QUERY_CACHE_WARMUP_BATCH_SIZE = 20
+QUERY_CACHE_WARMUP_CONCURRENCY = 4
+
+# The interval in seconds between saves of the query cache manifests.
+QUERY_WORKLOAD_SAVE_INTERVAL = 60
+
+# When a database is dumped over several backend connections, tables
+# larger than this number of pages are dumped in parts of at least that
+# size by different connections.
+DUMP_PART_PAGES = 8192
+
+# The number of data blocks received from the client that may wait
+# for being restored.
+RESTORE_QUEUE_SIZE = 2
+
+# The maximum number of consecutive client Execute messages sent to
+# a backend connection in one pipeline.
+MAX_PIPELINED_QUERIES = 64
+
+# The number of the most frequently used statements of a database that
+# are prepared on every new backend connection to it.
+BACKEND_HOT_STATEMENTS = 25
+
 _QUERY_ROLLING_AVG_LEN = 10
 _QUERIES_ROLLING_AVG_LEN = 300
 
@@ -68,6 +93,12 @@ MAX_UNIX_SOCKET_PATH_LENGTH = 21
 MAX_RUNSTATE_DIR_PATH = 104 - MAX_UNIX_SOCKET_PATH_LENGTH - 1
 
 HTTP_PORT_QUERY_CACHE_SIZE = 1000
+
+# The number of GraphQL queries persisted by their hash in every
+# database, and of compiled variants of each of them (the variants
+# differ in the values of the variables the compilation depends on).
+GRAPHQL_PERSISTED_QUERIES_CACHE_SIZE = 1000
+GRAPHQL_PERSISTED_QUERY_VARIANTS = 16
 HTTP_PORT_MAX_CONCURRENCY = 250  # XXX
 
 # The time in seconds the EdgeDB server shall wait between retries to connect
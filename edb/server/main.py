@@ -185,10 +185,20 @@ async def _run_server(
             cluster=cluster,
             runstate_dir=runstate_dir,
             internal_runstate_dir=internal_runstate_dir,
+            cache_dir=args.cache_dir,
+            query_cache_warmup=args.query_cache_warmup,
+            query_cache_manifest_size=args.query_cache_manifest_size,
+            wait_for_query_cache_warmup=args.wait_for_query_cache_warmup,
+            eager_introspection=args.eager_introspection,
+            eager_introspection_concurrency=(
+                args.eager_introspection_concurrency),
             max_backend_connections=args.max_backend_connections,
+            backend_standby_connections=args.backend_standby_connections,
+            dump_jobs=args.dump_jobs,
             compiler_pool_size=args.compiler_pool_size,
             compiler_pool_mode=args.compiler_pool_mode,
             compiler_pool_addr=args.compiler_pool_addr,
+            slow_compile_log_threshold=args.slow_compile_log_threshold,
             nethosts=args.bind_addresses,
             netport=args.port,
             listen_sockets=tuple(s for ss in sockets.values() for s in ss),
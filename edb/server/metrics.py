@@ -32,6 +32,26 @@ current_compiler_processes = registry.new_gauge(
     'Current number of active compiler processes.'
 )
 
+compiler_schema_syncs = registry.new_labeled_counter(
+    'compiler_schema_syncs_total',
+    'Number of schemas sent to compiler processes, in full or as deltas.',
+    labels=('mode',)
+)
+
+compiler_schema_sync_bytes = registry.new_labeled_counter(
+    'compiler_schema_sync_bytes_total',
+    'Number of bytes of schema data sent to compiler processes.',
+    labels=('mode',)
+)
+
+compiler_pool_queue_wait_duration = registry.new_labeled_histogram(
+    'compiler_pool_queue_wait_duration',
+    'Time compiler requests wait for a compiler process, '
+    'by request class.',
+    unit=prom.Unit.SECONDS,
+    labels=('class',),
+)
+
 total_backend_connections = registry.new_counter(
     'backend_connections_total',
     'Total number of backend connections established.'
@@ -59,12 +79,89 @@ backend_connection_aborted = registry.new_labeled_counter(
     labels=('pgcode',)
 )
 
+backend_pool_acquires = registry.new_labeled_counter(
+    'backend_pool_acquires_total',
+    'Number of backend connection acquisitions, by whether they had to '
+    'wait for a connection.',
+    labels=('result',),
+)
+
+backend_pool_acquire_wait_duration = registry.new_labeled_histogram(
+    'backend_pool_acquire_wait_duration',
+    'Time spent waiting for a backend connection, by database.',
+    unit=prom.Unit.SECONDS,
+    labels=('database',),
+)
+
+backend_pool_connections = registry.new_labeled_gauge(
+    'backend_pool_connections_current',
+    'Current number of backend connections in the pool, by database.',
+    labels=('database',),
+)
+
+backend_pool_waiters = registry.new_labeled_gauge(
+    'backend_pool_waiters_current',
+    'Current number of tasks waiting for a backend connection, '
+    'by database.',
+    labels=('database',),
+)
+
+backend_pool_preconnects = registry.new_counter(
+    'backend_pool_preconnects_total',
+    'Number of backend connections established ahead of predicted demand.'
+)
+
+backend_prepared_statement_lookups = registry.new_labeled_counter(
+    'backend_prepared_statement_lookups_total',
+    'Number of lookups of prepared statements on backend connections, '
+    'by database and whether the statement had to be parsed.',
+    labels=('database', 'result'),
+)
+
+backend_prepared_statement_evictions = registry.new_labeled_counter(
+    'backend_prepared_statement_evictions_total',
+    'Number of prepared statements evicted from backend connections, '
+    'by database.',
+    labels=('database',),
+)
+
+backend_prepared_statements_preloaded = registry.new_labeled_counter(
+    'backend_prepared_statements_preloaded_total',
+    'Number of frequently used statements prepared on new backend '
+    'connections ahead of use, by database.',
+    labels=('database',),
+)
+
 backend_query_duration = registry.new_histogram(
     'backend_query_duration',
     'Time it takes to run a query on a backend connection.',
     unit=prom.Unit.SECONDS,
 )
 
+eager_introspection_pending = registry.new_gauge(
+    'eager_introspection_pending_current',
+    'Current number of databases waiting to be introspected at startup.'
+)
+
+user_schema_load_duration = registry.new_labeled_histogram(
+    'user_schema_load_duration',
+    'Time it takes to load the schema of a database, '
+    'from the local cache or by reflection.',
+    unit=prom.Unit.SECONDS,
+    labels=('path',),
+)
+
+restore_block_throughput = registry.new_histogram(
+    'restore_block_bytes_per_second',
+    'Rate at which data blocks of dumps are restored, in bytes per second.',
+    buckets=[2 ** 20 * 2 ** i for i in range(11)],
+)
+
+backend_pipelined_queries = registry.new_counter(
+    'backend_pipelined_queries_total',
+    'Number of queries sent to a backend connection in pipelines.'
+)
+
 total_client_connections = registry.new_counter(
     'client_connections_total',
     'Total number of clients.'
@@ -86,12 +183,47 @@ edgeql_query_compilations = registry.new_labeled_counter(
     labels=('path',)
 )
 
+edgeql_query_compilations_coalesced = registry.new_counter(
+    'edgeql_query_compilations_coalesced_total',
+    'Number of query compilations served by a concurrent compilation '
+    'of the same query.'
+)
+
 edgeql_query_compilation_duration = registry.new_histogram(
     'edgeql_query_compilation_duration',
     'Time it takes to compile an EdgeQL query or script.',
     unit=prom.Unit.SECONDS,
 )
 
+edgeql_query_compilation_phase_duration = registry.new_labeled_histogram(
+    'edgeql_query_compilation_phase_duration',
+    'Time a compiler worker spends in every phase of compiling an EdgeQL '
+    'query or script.',
+    unit=prom.Unit.SECONDS,
+    labels=('phase',),
+)
+
+graphql_schema_build_duration = registry.new_labeled_histogram(
+    'graphql_schema_build_duration',
+    'Time a compiler process spends building the GraphQL schema of '
+    'a database, by what triggered the build.',
+    unit=prom.Unit.SECONDS,
+    labels=('trigger',),
+)
+
+edgeql_query_cache_invalidations = registry.new_labeled_counter(
+    'edgeql_query_cache_invalidations_total',
+    'Number of compiled query cache entries kept or evicted '
+    'on schema changes.',
+    labels=('outcome',)
+)
+
+query_persistent_cache_lookups = registry.new_labeled_counter(
+    'query_persistent_cache_lookups_total',
+    'Number of lookups in the on-disk compiled query cache.',
+    labels=('result',)
+)
+
 background_errors = registry.new_labeled_counter(
     'background_errors_total',
     'Number of unhandled errors in background server routines.',
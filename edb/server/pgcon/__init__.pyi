@@ -96,6 +96,12 @@ class PGConnection:
     ) -> list[bytes]:
         ...
 
+    def set_hot_statements(self, hot_stmts: Any) -> None:
+        ...
+
+    async def prepare_hot_statements(self, dbver: int) -> int:
+        ...
+
     def terminate(self) -> None:
         ...
 
@@ -83,6 +83,7 @@ cdef class PGConnection:
         readonly object aborted_with_error
 
         stmt_cache.StatementsCache prep_stmts
+        stmt_cache.HotStatements hot_stmts
         list last_parse_prep_stmts
 
         list log_listeners
@@ -117,7 +118,13 @@ cdef class PGConnection:
     cdef fallthrough_idle(self)
 
     cdef before_prepare(self, stmt_name, dbver, WriteBuffer outbuf)
+    cdef _get_stmts_dbname(self)
     cdef write_sync(self, WriteBuffer outbuf)
+    cdef tuple _build_parse_execute(
+        self, object query, WriteBuffer bind_data, bint use_prep_stmt,
+        bytes state, int dbver, WriteBuffer out, set parsed,
+        WriteBuffer close_out,
+    )
 
     cdef make_clean_stmt_message(self, bytes stmt_name)
     cdef make_auth_password_md5_message(self, bytes salt)
@@ -422,6 +422,7 @@ cdef class PGConnection:
         self.msg_waiter = None
 
         self.prep_stmts = stmt_cache.StatementsCache(maxsize=PREP_STMTS_CACHE)
+        self.hot_stmts = None
 
         self.connected_fut = loop.create_future()
         self.connected = False
@@ -521,6 +522,9 @@ cdef class PGConnection:
     def set_server(self, server):
         self.server = server
 
+    def set_hot_statements(self, stmt_cache.HotStatements hot_stmts):
+        self.hot_stmts = hot_stmts
+
     def mark_as_system_db(self):
         if self.server.get_backend_runtime_params().has_create_database:
             assert defines.EDGEDB_SYSTEM_DB in self.dbname
@@ -605,6 +609,12 @@ cdef class PGConnection:
                 # serialization conflicts.
                 raise error
 
+    cdef _get_stmts_dbname(self):
+        # The EdgeDB database to report prepared statement metrics for.
+        if self.hot_stmts is not None:
+            return self.hot_stmts.dbname
+        return self.dbname
+
     cdef before_prepare(self, stmt_name, dbver, WriteBuffer outbuf):
         parse = 1
 
@@ -612,6 +622,8 @@ cdef class PGConnection:
             stmt_name_to_clean = self.prep_stmts.cleanup_one()
             outbuf.write_buffer(
                 self.make_clean_stmt_message(stmt_name_to_clean))
+            metrics.backend_prepared_statement_evictions.inc(
+                1.0, self._get_stmts_dbname())
 
         if stmt_name in self.prep_stmts:
             if self.prep_stmts[stmt_name] == dbver:
@@ -624,8 +636,79 @@ cdef class PGConnection:
         else:
             store_stmt = 1
 
+        metrics.backend_prepared_statement_lookups.inc(
+            1.0, self._get_stmts_dbname(), 'miss' if parse else 'hit')
+
         return parse, store_stmt
 
+    async def prepare_hot_statements(self, int dbver):
+        """Prepare the statements most used in the database in one batch.
+
+        A new connection to a database would otherwise parse every
+        frequently executed statement anew when it is first executed on
+        it.  Returns the number of prepared statements.
+        """
+        cdef:
+            WriteBuffer out
+            WriteBuffer buf
+            list stmts
+            int prepared = 0
+
+        if self.hot_stmts is None:
+            return 0
+
+        stmts = [
+            (stmt_name, sql)
+            for stmt_name, sql in self.hot_stmts.get_hot(dbver)
+            if stmt_name not in self.prep_stmts
+        ]
+        if not stmts:
+            return 0
+
+        self.before_command()
+        try:
+            out = WriteBuffer.new()
+            for stmt_name, sql in stmts:
+                buf = WriteBuffer.new_message(b'P')
+                buf.write_bytestring(stmt_name)
+                buf.write_bytestring(sql)
+                buf.write_int16(0)
+                out.write_buffer(buf.end_message())
+            self.write_sync(out)
+            self.write(out)
+
+            while True:
+                if not self.buffer.take_message():
+                    await self.wait_for_message()
+                mtype = self.buffer.get_message_type()
+
+                if mtype == b'1':
+                    # ParseComplete, in the order of the Parse messages
+                    self.buffer.discard_message()
+                    self.prep_stmts[stmts[prepared][0]] = dbver
+                    prepared += 1
+
+                elif mtype == b'E':
+                    # The statement cannot be prepared anymore; Postgres
+                    # skips the rest of the batch until the Sync.
+                    er_cls, er_fields = self.parse_error_message()
+                    logger.debug(
+                        'could not prepare a hot statement in %s: %s',
+                        self._get_stmts_dbname(), er_fields.get('M'))
+
+                elif mtype == b'Z':
+                    self.parse_sync_message()
+                    break
+
+                else:
+                    self.fallthrough()
+        finally:
+            await self.after_command()
+
+        metrics.backend_prepared_statements_preloaded.inc(
+            prepared, self._get_stmts_dbname())
+        return prepared
+
     cdef write_sync(self, WriteBuffer outbuf):
         outbuf.write_bytes(_SYNC_MESSAGE)
         self.waiting_for_sync += 1
@@ -856,35 +939,30 @@ cdef class PGConnection:
             finally:
                 self.buffer.finish_message()
 
-    async def _parse_execute(
+    cdef tuple _build_parse_execute(
         self,
         query,
-        frontend.FrontendConnection fe_conn,
         WriteBuffer bind_data,
         bint use_prep_stmt,
         bytes state,
         int dbver,
+        WriteBuffer out,
+        set parsed,
+        WriteBuffer close_out,
     ):
         cdef:
-            WriteBuffer out
             WriteBuffer buf
             bytes stmt_name
 
-            int32_t dat_len
-
             bint store_stmt = 0
             bint parse = 1
             bint state_sync = 0
 
-            bint has_result = query.cardinality is not CARD_NO_RESULT
-            bint discard_result = (
-                fe_conn is not None and query.output_format == FMT_NONE)
-
             uint64_t msgs_num = <uint64_t>(len(query.sql))
-            uint64_t msgs_executed = 0
             uint64_t i
 
-        out = WriteBuffer.new()
+        if close_out is None:
+            close_out = out
 
         if state is not None:
             self._build_apply_state_req(state, out)
@@ -898,15 +976,24 @@ cdef class PGConnection:
 
         if use_prep_stmt:
             stmt_name = query.sql_hash
-            parse, store_stmt = self.before_prepare(
-                stmt_name, dbver, out)
+            if parsed is not None and stmt_name in parsed:
+                # Already parsed by an earlier query of the same pipeline,
+                # which hasn't been acknowledged by the server yet.
+                parse = 0
+            else:
+                parse, store_stmt = self.before_prepare(
+                    stmt_name, dbver, close_out)
+                if parse and parsed is not None:
+                    parsed.add(stmt_name)
+            if self.hot_stmts is not None:
+                self.hot_stmts.record(stmt_name, query.sql[0], dbver)
         else:
             stmt_name = b''
 
         if parse:
             if len(self.last_parse_prep_stmts):
                 for stmt_name_to_clean in self.last_parse_prep_stmts:
-                    out.write_buffer(
+                    close_out.write_buffer(
                         self.make_clean_stmt_message(stmt_name_to_clean))
                 self.last_parse_prep_stmts.clear()
 
@@ -958,108 +1045,162 @@ cdef class PGConnection:
             buf.write_int32(0)  # limit: 0 - return all rows
             out.write_buffer(buf.end_message())
 
-        self.write_sync(out)
-        self.write(out)
+        return parse, store_stmt, stmt_name, msgs_num, state_sync
 
-        result = None
+    async def _wait_parse_execute(
+        self,
+        query,
+        frontend.FrontendConnection fe_conn,
+        bint parse,
+        bint store_stmt,
+        bytes stmt_name,
+        uint64_t msgs_num,
+        bytes state,
+        bint state_sync,
+        int dbver,
+    ):
+        cdef:
+            WriteBuffer buf
 
-        try:
-            if state is not None:
-                await self.wait_for_state_resp(state, state_sync)
+            int32_t dat_len
 
-            buf = None
-            while True:
-                if not self.buffer.take_message():
-                    await self.wait_for_message()
-                mtype = self.buffer.get_message_type()
+            bint has_result = query.cardinality is not CARD_NO_RESULT
+            bint discard_result = (
+                fe_conn is not None and query.output_format == FMT_NONE)
 
-                try:
-                    if mtype == b'D':
-                        # DataRow
-                        if discard_result:
-                            self.buffer.discard_message()
-                            continue
-                        if not has_result and fe_conn is not None:
-                            raise errors.InternalServerError(
-                                f'query that was inferred to have '
-                                f'no data returned received a DATA package; '
-                                f'query: {query.sql}')
-
-                        if fe_conn is None:
-                            ncol = self.buffer.read_int16()
-                            row = []
-                            for i in range(ncol):
-                                dat_len = self.buffer.read_int32()
-                                if dat_len == -1:
-                                    row.append(None)
-                                else:
-                                    row.append(
-                                        self.buffer.read_bytes(dat_len))
-                            if result is None:
-                                result = []
-                            result.append(row)
-                        else:
-                            if buf is None:
-                                buf = WriteBuffer.new()
+            uint64_t msgs_executed = 0
+            uint64_t i
 
-                            self.buffer.redirect_messages(buf, b'D', 0)
-                            if buf.len() >= DATA_BUFFER_SIZE:
-                                fe_conn.write(buf)
-                                buf = None
+        result = None
+
+        if state is not None:
+            await self.wait_for_state_resp(state, state_sync)
 
-                    elif mtype == b'C':  ## result
-                        # CommandComplete
+        buf = None
+        while True:
+            if not self.buffer.take_message():
+                await self.wait_for_message()
+            mtype = self.buffer.get_message_type()
+
+            try:
+                if mtype == b'D':
+                    # DataRow
+                    if discard_result:
                         self.buffer.discard_message()
-                        if buf is not None:
+                        continue
+                    if not has_result and fe_conn is not None:
+                        raise errors.InternalServerError(
+                            f'query that was inferred to have '
+                            f'no data returned received a DATA package; '
+                            f'query: {query.sql}')
+
+                    if fe_conn is None:
+                        ncol = self.buffer.read_int16()
+                        row = []
+                        for i in range(ncol):
+                            dat_len = self.buffer.read_int32()
+                            if dat_len == -1:
+                                row.append(None)
+                            else:
+                                row.append(
+                                    self.buffer.read_bytes(dat_len))
+                        if result is None:
+                            result = []
+                        result.append(row)
+                    else:
+                        if buf is None:
+                            buf = WriteBuffer.new()
+
+                        self.buffer.redirect_messages(buf, b'D', 0)
+                        if buf.len() >= DATA_BUFFER_SIZE:
                             fe_conn.write(buf)
                             buf = None
-                        msgs_executed += 1
-                        if msgs_executed == msgs_num:
-                            break
 
-                    elif mtype == b'1' and parse:
-                        # ParseComplete
-                        self.buffer.discard_message()
-                        if store_stmt:
-                            self.prep_stmts[stmt_name] = dbver
+                elif mtype == b'C':  ## result
+                    # CommandComplete
+                    self.buffer.discard_message()
+                    if buf is not None:
+                        fe_conn.write(buf)
+                        buf = None
+                    msgs_executed += 1
+                    if msgs_executed == msgs_num:
+                        break
 
-                    elif mtype == b'E':  ## result
-                        # ErrorResponse
-                        er_cls, er_fields = self.parse_error_message()
-                        raise er_cls(fields=er_fields)
+                elif mtype == b'1' and parse:
+                    # ParseComplete
+                    self.buffer.discard_message()
+                    if store_stmt:
+                        self.prep_stmts[stmt_name] = dbver
 
-                    elif mtype == b'n':
-                        # NoData
-                        self.buffer.discard_message()
+                elif mtype == b'E':  ## result
+                    # ErrorResponse
+                    er_cls, er_fields = self.parse_error_message()
+                    raise er_cls(fields=er_fields)
 
-                    elif mtype == b's':  ## result
-                        # PortalSuspended
-                        self.buffer.discard_message()
-                        break
+                elif mtype == b'n':
+                    # NoData
+                    self.buffer.discard_message()
 
-                    elif mtype == b'2':
-                        # BindComplete
-                        self.buffer.discard_message()
+                elif mtype == b's':  ## result
+                    # PortalSuspended
+                    self.buffer.discard_message()
+                    break
 
-                    elif mtype == b'I':  ## result
-                        # EmptyQueryResponse
-                        self.buffer.discard_message()
-                        break
+                elif mtype == b'2':
+                    # BindComplete
+                    self.buffer.discard_message()
 
-                    elif mtype == b'3':
-                        # CloseComplete
-                        self.buffer.discard_message()
+                elif mtype == b'I':  ## result
+                    # EmptyQueryResponse
+                    self.buffer.discard_message()
+                    break
 
-                    else:
-                        self.fallthrough()
+                elif mtype == b'3':
+                    # CloseComplete
+                    self.buffer.discard_message()
 
-                finally:
-                    self.buffer.finish_message()
-        finally:
-            await self.wait_for_sync()
+                else:
+                    self.fallthrough()
+
+            finally:
+                self.buffer.finish_message()
 
         return result
 
+    async def _parse_execute(
+        self,
+        query,
+        frontend.FrontendConnection fe_conn,
+        WriteBuffer bind_data,
+        bint use_prep_stmt,
+        bytes state,
+        int dbver,
+    ):
+        cdef:
+            WriteBuffer out = WriteBuffer.new()
+
+        parse, store_stmt, stmt_name, msgs_num, state_sync = (
+            self._build_parse_execute(
+                query, bind_data, use_prep_stmt, state, dbver, out, None,
+                None))
+        self.write_sync(out)
+        self.write(out)
+
+        try:
+            return await self._wait_parse_execute(
+                query,
+                fe_conn,
+                parse,
+                store_stmt,
+                stmt_name,
+                msgs_num,
+                state,
+                state_sync,
+                dbver,
+            )
+        finally:
+            await self.wait_for_sync()
+
     async def parse_execute(
         self,
         *,
@@ -1085,6 +1226,78 @@ cdef class PGConnection:
             metrics.backend_query_duration.observe(time.monotonic() - started_at)
             await self.after_command()
 
+    async def parse_execute_pipeline(
+        self,
+        *,
+        list queries,
+        list bind_datas,
+        frontend.FrontendConnection fe_conn,
+        object on_complete,
+        bytes state = None,
+        int dbver = 0,
+    ):
+        """Execute a sequence of read-only queries in one round trip.
+
+        All queries are sent in a single write followed by a single SYNC,
+        and their results are forwarded to *fe_conn* in order;
+        *on_complete* is called with the index of each query as soon as
+        its results have been forwarded.  Just like with a client sending
+        several Execute messages before a Sync, once a query fails Postgres
+        skips the rest of them and the error is raised.
+
+        The queries share an implicit transaction, so only queries that
+        don't modify anything must be passed here.
+        """
+        cdef:
+            WriteBuffer out = WriteBuffer.new()
+            WriteBuffer closes = WriteBuffer.new()
+            set parsed = set()
+            list pending = []
+            bytes query_state = state
+
+        self.before_command()
+        started_at = time.monotonic()
+        try:
+            for query, bind_data in zip(queries, bind_datas):
+                # Prepared statements are always used here: only
+                # single-statement queries can be pipelined.
+                pending.append(self._build_parse_execute(
+                    query, bind_data, True, query_state, dbver, out, parsed,
+                    closes))
+                query_state = None
+            self.write_sync(out)
+            # The statements evicted from the cache or prepared for another
+            # dbver are closed before anything else: once a query fails
+            # Postgres skips all messages up to the Sync, and a skipped
+            # Close would leave a statement prep_stmts no longer knows of.
+            closes.write_buffer(out)
+            self.write(closes)
+
+            query_state = state
+            try:
+                for i, query in enumerate(queries):
+                    parse, store_stmt, stmt_name, msgs_num, state_sync = (
+                        pending[i])
+                    await self._wait_parse_execute(
+                        query,
+                        fe_conn,
+                        parse,
+                        store_stmt,
+                        stmt_name,
+                        msgs_num,
+                        query_state,
+                        state_sync,
+                        dbver,
+                    )
+                    query_state = None
+                    on_complete(i)
+            finally:
+                await self.wait_for_sync()
+        finally:
+            metrics.backend_query_duration.observe(time.monotonic() - started_at)
+            metrics.backend_pipelined_queries.inc(len(queries))
+            await self.after_command()
+
     async def sql_fetch(
         self,
         sql: bytes | tuple[bytes, ...],
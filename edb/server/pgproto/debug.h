@@ -0,0 +1,3 @@
+#ifndef PG_DEBUG
+#define PG_DEBUG 0
+#endif
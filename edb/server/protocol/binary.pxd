@@ -113,6 +113,7 @@ cdef class EdgeConnection(frontend.FrontendConnection):
     cdef interpret_backend_error(self, exc)
 
     cdef dbview.QueryRequestInfo parse_execute_request(self)
+    cdef bint _can_pipeline(self, compiled, bytes in_tid, bytes out_tid)
     cdef parse_output_format(self, bytes mode)
     cdef parse_cardinality(self, bytes card)
     cdef char render_cardinality(self, query_unit) except -1
@@ -68,6 +68,7 @@ from edb.server.compiler import errormech
 from edb.server.compiler import enums
 from edb.server.compiler import sertypes
 from edb.server.protocol import execute
+from edb.server.protocol cimport args_ser
 from edb.server.protocol cimport frontend
 from edb.server.pgcon cimport pgcon
 from edb.server.pgcon import errors as pgerror
@@ -75,6 +76,8 @@ from edb.server import metrics
 
 from edb.schema import objects as s_obj
 
+from edb.pgsql import common as pg_common
+
 from edb import errors
 from edb.errors import base as base_errors, EdgeQLSyntaxError
 from edb.common import debug, taskgroup
@@ -1181,7 +1184,7 @@ cdef class EdgeConnection(frontend.FrontendConnection):
         self.write(buf)
         self.flush()
 
-    async def execute(self):
+    async def _read_execute(self):
         cdef:
             dbview.QueryRequestInfo query_req
             dbview.DatabaseConnectionView _dbview
@@ -1237,6 +1240,60 @@ cdef class EdgeConnection(frontend.FrontendConnection):
                 errors.DisabledCapabilityError,
             )
 
+        if self.debug:
+            self.debug_print('EXECUTE', query_req.source.text())
+
+        return compiled, in_tid, out_tid, args
+
+    cdef bint _can_pipeline(self, compiled, bytes in_tid, bytes out_tid):
+        cdef:
+            dbview.DatabaseConnectionView _dbview = self.get_dbview()
+
+        query_unit_group = compiled.query_unit_group
+        if (
+            _dbview.in_tx()
+            or _dbview.in_tx_error()
+            or len(query_unit_group) != 1
+            or query_unit_group.capabilities
+            or query_unit_group.in_type_id != in_tid
+            or query_unit_group.out_type_id != out_tid
+        ):
+            return False
+
+        query_unit = query_unit_group[0]
+        return (
+            len(query_unit.sql) == 1
+            and bool(query_unit.sql_hash)
+            and not query_unit.set_global
+            and not query_unit.config_ops
+            and not query_unit.system_config
+        )
+
+    async def execute(self):
+        compiled, in_tid, out_tid, args = await self._read_execute()
+
+        if (
+            self._can_pipeline(compiled, in_tid, out_tid)
+            and self.buffer.take_message_type(b'O')
+        ):
+            await self._execute_pipeline(compiled, args)
+        else:
+            await self._execute_compiled(compiled, in_tid, out_tid, args)
+
+        self.flush()
+
+    async def _execute_compiled(
+        self,
+        compiled: dbview.CompiledQuery,
+        in_tid: bytes,
+        out_tid: bytes,
+        args: bytes,
+    ):
+        cdef:
+            dbview.DatabaseConnectionView _dbview = self.get_dbview()
+
+        query_unit_group = compiled.query_unit_group
+
         if query_unit_group.in_type_id != in_tid:
             self.write(self.make_command_data_description_msg(compiled))
             raise errors.ParameterTypeMismatchError(
@@ -1249,9 +1306,6 @@ cdef class EdgeConnection(frontend.FrontendConnection):
             # so provide one.
             self.write(self.make_command_data_description_msg(compiled))
 
-        if self.debug:
-            self.debug_print('EXECUTE', query_req.source.text())
-
         metrics.edgeql_query_compilations.inc(1.0, 'cache')
         if (
             _dbview.in_tx_error()
@@ -1280,7 +1334,84 @@ cdef class EdgeConnection(frontend.FrontendConnection):
                 compiled.query_unit_group[-1].status,
             )
         )
-        self.flush()
+
+    async def _execute_pipeline(
+        self,
+        compiled: dbview.CompiledQuery,
+        args: bytes,
+    ):
+        # Send all the read-only queries of consecutive Execute messages
+        # that are already in the buffer to the backend at once, instead of
+        # waiting for the results of every one of them before reading the
+        # next message.  The first one has already been read and the next
+        # message is taken.
+        cdef:
+            dbview.DatabaseConnectionView _dbview = self.get_dbview()
+            pgcon.PGConnection conn
+
+        state = _dbview.serialize_state()
+        queries = [compiled]
+        bind_datas = [args_ser.recode_bind_args(_dbview, compiled, args)]
+        pending = None
+        error = None
+
+        while True:
+            try:
+                pending = await self._read_execute()
+                if (
+                    not self._can_pipeline(pending[0], pending[1], pending[2])
+                    or _dbview.serialize_state() != state
+                ):
+                    break
+                bind_datas.append(args_ser.recode_bind_args(
+                    _dbview, pending[0], pending[3]))
+            except Exception as ex:
+                # Report the error after the queries preceding the
+                # message, just like it would happen without pipelining.
+                error = ex
+                pending = None
+                break
+
+            queries.append(pending[0])
+            pending = None
+            if (
+                len(queries) >= edbdef.MAX_PIPELINED_QUERIES
+                or not self.buffer.take_message_type(b'O')
+            ):
+                break
+
+        def on_complete(i):
+            query_unit_group = queries[i].query_unit_group
+            self.write(
+                self.make_command_complete_msg(
+                    query_unit_group.capabilities,
+                    query_unit_group[-1].status,
+                )
+            )
+
+        metrics.edgeql_query_compilations.inc(len(queries), 'cache')
+        conn = await self.get_pgcon()
+        try:
+            await execute.execute_pipeline(
+                conn,
+                _dbview,
+                queries,
+                bind_datas,
+                state,
+                fe_conn=self,
+                on_complete=on_complete,
+            )
+        finally:
+            self.maybe_release_pgcon(conn)
+
+        if self._cancelled:
+            raise ConnectionAbortedError
+
+        if error is not None:
+            raise error
+
+        if pending is not None:
+            await self._execute_compiled(*pending)
 
     async def sync(self):
         self.buffer.consume_message()
@@ -1810,6 +1941,7 @@ cdef class EdgeConnection(frontend.FrontendConnection):
 
         dbname = _dbview.dbname
         pgcon = await server.acquire_pgcon(dbname)
+        worker_pgcons = []
         self._in_dump_restore = True
         try:
             # To avoid having races, we want to:
@@ -1894,15 +2026,48 @@ cdef class EdgeConnection(frontend.FrontendConnection):
             self._transport.write(memoryview(msg_buf.end_message()))
             self.flush()
 
+            njobs = min(server.get_dump_jobs(), len(blocks))
+            if njobs > 1:
+                # Every extra connection imports the snapshot of the
+                # transaction started above, so that all of them dump
+                # the same state of the database.
+                snapshot_id = await pgcon.sql_fetch_val(
+                    b'SELECT pg_export_snapshot()')
+                for _ in range(njobs - 1):
+                    worker_pgcon = await server.acquire_pgcon(dbname)
+                    worker_pgcons.append(worker_pgcon)
+                    await worker_pgcon.sql_execute(
+                        b'''START TRANSACTION
+                                ISOLATION LEVEL SERIALIZABLE
+                                READ ONLY;
+                            SET TRANSACTION SNAPSHOT '''
+                        + pg_common.quote_literal(
+                            snapshot_id.decode()).encode()
+                        + b''';
+                            SET idle_in_transaction_session_timeout = 0;
+                            SET statement_timeout = 0;
+                        ''',
+                    )
+                blocks = await self._split_dump_blocks(pgcon, blocks, njobs)
+
             blocks_queue = collections.deque(blocks)
             output_queue = asyncio.Queue(maxsize=2)
+            # Parts of a table dumped by different connections are all
+            # numbered from zero, so number the blocks sent to the client
+            # here.
+            block_nums = {}
+
+            # Every connection signals the end of its part with a None,
+            # even if there are no blocks to dump at all.
+            dump_pgcons = [pgcon, *worker_pgcons]
 
             async with taskgroup.TaskGroup() as g:
-                g.create_task(pgcon.dump(
-                    blocks_queue,
-                    output_queue,
-                    DUMP_BLOCK_SIZE,
-                ))
+                for worker_pgcon in dump_pgcons:
+                    g.create_task(worker_pgcon.dump(
+                        blocks_queue,
+                        output_queue,
+                        DUMP_BLOCK_SIZE,
+                    ))
 
                 nstops = 0
                 while True:
@@ -1912,11 +2077,12 @@ cdef class EdgeConnection(frontend.FrontendConnection):
                     out = await output_queue.get()
                     if out is None:
                         nstops += 1
-                        if nstops == 1:
-                            # we only have one worker right now
+                        if nstops == len(dump_pgcons):
                             break
                     else:
-                        block, block_num, data = out
+                        block, _, data = out
+                        block_num = block_nums.get(block.schema_object_id, 0)
+                        block_nums[block.schema_object_id] = block_num + 1
 
                         msg_buf = WriteBuffer.new_message(b'=')
                         msg_buf.write_int16(4)  # number of headers
@@ -1937,10 +2103,14 @@ cdef class EdgeConnection(frontend.FrontendConnection):
                         if self._write_waiter:
                             await self._write_waiter
 
+            for worker_pgcon in worker_pgcons:
+                await worker_pgcon.sql_execute(b"ROLLBACK;")
             await pgcon.sql_execute(b"ROLLBACK;")
 
         finally:
             self._in_dump_restore = False
+            for worker_pgcon in worker_pgcons:
+                server.release_pgcon(dbname, worker_pgcon)
             server.release_pgcon(dbname, pgcon)
 
         msg_buf = WriteBuffer.new_message(b'C')
@@ -1952,6 +2122,63 @@ cdef class EdgeConnection(frontend.FrontendConnection):
         self.write(msg_buf.end_message())
         self.flush()
 
+    async def _split_dump_blocks(self, pgcon, blocks, int njobs):
+        # Dump tables of more than DUMP_PART_PAGES pages in up to njobs
+        # parts, each covering a range of pages.  Ranges of ctid can only
+        # be scanned efficiently since Postgres 14.  The blocks are
+        # returned ordered by size, so that the largest ones get popped
+        # from the queue first.
+        tables = {
+            block.sql_table_name for block in blocks if block.sql_table_name
+        }
+        if not tables:
+            return blocks
+
+        table_list = ', '.join(pg_common.quote_literal(t) for t in tables)
+        info = json.loads(await pgcon.sql_fetch_val(
+            f'''
+                SELECT json_build_object(
+                    'pg_version', current_setting('server_version_num')::int,
+                    'pages', (
+                        SELECT json_object_agg(
+                            t,
+                            pg_relation_size(t::regclass)
+                                / current_setting('block_size')::int
+                        )
+                        FROM unnest(ARRAY[{table_list}]::text[]) AS t
+                    )
+                )::text
+            '''.encode(),
+        ))
+        can_split = info['pg_version'] >= 140000
+
+        parts = []
+        for block in blocks:
+            pages = info['pages'].get(block.sql_table_name, 0)
+            nparts = min(njobs, pages // edbdef.DUMP_PART_PAGES)
+            if not can_split or nparts < 2:
+                parts.append((pages, block))
+                continue
+
+            part_pages = pages // nparts
+            for i in range(nparts):
+                conds = []
+                if i > 0:
+                    conds.append(f"ctid >= '({i * part_pages},0)'::tid")
+                if i < nparts - 1:
+                    conds.append(f"ctid < '({(i + 1) * part_pages},0)'::tid")
+                stmt = (
+                    f'COPY (SELECT {block.sql_columns} '
+                    f'FROM {block.sql_table_name} '
+                    f'WHERE {" AND ".join(conds)}) '
+                    f'TO STDOUT WITH BINARY'
+                ).encode()
+                parts.append(
+                    (part_pages, block._replace(sql_copy_stmt=stmt)))
+
+        parts.sort(key=lambda part: part[0])
+        return [block for _, block in parts]
+
     async def _execute_utility_stmt(self, eql: str, pgcon):
         cdef dbview.DatabaseConnectionView _dbview
 
@@ -1996,7 +2223,7 @@ cdef class EdgeConnection(frontend.FrontendConnection):
             )
 
         self.reject_headers()
-        self.buffer.read_int16()  # discard -j level
+        restore_jobs = self.buffer.read_int16()  # -j level
 
         # Now parse the embedded dump header message:
 
@@ -2120,6 +2347,11 @@ cdef class EdgeConnection(frontend.FrontendConnection):
 
             await pgcon.sql_execute(disable_trigger_q.encode())
 
+            # Secondary indexes are built once all the data is loaded,
+            # which is a lot cheaper than updating them row by row.
+            deferred_indexes = await self._defer_restore_indexes(
+                pgcon, tables)
+
             # Send "RestoreReadyMessage"
             msg = WriteBuffer.new_message(b'+')
             msg.write_int16(0)  # no headers
@@ -2127,6 +2359,90 @@ cdef class EdgeConnection(frontend.FrontendConnection):
             self.write(msg.end_message())
             self.flush()
 
+            # Blocks are read from the client and prepared in a separate
+            # task, so that the next block is received while the current
+            # one is being copied into the backend.
+            data_queue = asyncio.Queue(maxsize=edbdef.RESTORE_QUEUE_SIZE)
+            reader = self.loop.create_task(
+                self._read_restore_data(restore_blocks, data_queue))
+            try:
+                while True:
+                    item = await data_queue.get()
+                    if item is None:
+                        break
+                    elif isinstance(item, Exception):
+                        raise item
+
+                    restore_block, block_data, type_id_map = item
+                    started_at = time.monotonic()
+                    await pgcon.restore(restore_block, block_data, type_id_map)
+                    elapsed = time.monotonic() - started_at
+
+                    if elapsed > 0:
+                        metrics.restore_block_throughput.observe(
+                            len(block_data) / elapsed)
+                    logger.debug(
+                        'restored %d bytes of block %s of database %s '
+                        'in %.3fs',
+                        len(block_data), restore_block.schema_object_id,
+                        dbname, elapsed)
+            finally:
+                reader.cancel()
+
+            if deferred_indexes:
+                if restore_jobs > 1:
+                    # Let Postgres honor the requested level of
+                    # parallelism when building the indexes, up to the
+                    # number of workers it can run at all.
+                    await pgcon.sql_execute(
+                        f"""
+                        SELECT set_config(
+                            'max_parallel_maintenance_workers',
+                            least(
+                                {restore_jobs - 1},
+                                current_setting('max_worker_processes')::int
+                            )::text,
+                            true
+                        );
+                        """.encode())
+                await pgcon.sql_execute(
+                    ';\n'.join(deferred_indexes).encode())
+
+            await pgcon.sql_execute(enable_trigger_q.encode())
+
+        except Exception:
+            await pgcon.sql_execute(b'ROLLBACK')
+            _dbview.abort_tx()
+            raise
+
+        else:
+            await self._execute_utility_stmt('COMMIT', pgcon)
+
+        finally:
+            self._transport.resume_reading()
+            self._in_dump_restore = False
+            server.release_pgcon(dbname, pgcon)
+
+        await server.introspect_db(dbname)
+
+        if _dbview.is_state_desc_changed():
+            self.write(self.make_state_data_description_msg())
+
+        state_tid, state_data = _dbview.encode_state()
+
+        msg = WriteBuffer.new_message(b'C')
+        msg.write_int16(0)  # no headers
+        msg.write_int64(0)  # capabilities
+        msg.write_len_prefixed_bytes(b'RESTORE')
+        msg.write_bytes(state_tid.bytes)
+        msg.write_len_prefixed_bytes(state_data)
+        self.write(msg.end_message())
+        self.flush()
+
+    async def _read_restore_data(self, restore_blocks, data_queue):
+        # Put the data blocks sent by the client into data_queue, followed
+        # by None or by the error that stopped the reading.
+        try:
             while True:
                 if not self.buffer.take_message():
                     # Don't report idling when restoring a dump.
@@ -2163,8 +2479,10 @@ cdef class EdgeConnection(frontend.FrontendConnection):
                     restore_block = restore_blocks[block_id]
                     type_id_map = self._build_type_id_map_for_restore_mending(
                         restore_block)
-                    self._transport.pause_reading()
-                    await pgcon.restore(restore_block, block_data, type_id_map)
+                    if data_queue.full():
+                        self._transport.pause_reading()
+                    await data_queue.put(
+                        (restore_block, block_data, type_id_map))
                     self._transport.resume_reading()
 
                 elif mtype == b'.':
@@ -2174,36 +2492,50 @@ cdef class EdgeConnection(frontend.FrontendConnection):
                 else:
                     self.fallthrough()
 
-            await pgcon.sql_execute(enable_trigger_q.encode())
-
-        except Exception:
-            await pgcon.sql_execute(b'ROLLBACK')
-            _dbview.abort_tx()
-            raise
-
+        except Exception as ex:
+            await data_queue.put(ex)
         else:
-            await self._execute_utility_stmt('COMMIT', pgcon)
-
-        finally:
-            self._transport.resume_reading()
-            self._in_dump_restore = False
-            server.release_pgcon(dbname, pgcon)
-
-        await server.introspect_db(dbname)
-
-        if _dbview.is_state_desc_changed():
-            self.write(self.make_state_data_description_msg())
-
-        state_tid, state_data = _dbview.encode_state()
-
-        msg = WriteBuffer.new_message(b'C')
-        msg.write_int16(0)  # no headers
-        msg.write_int64(0)  # capabilities
-        msg.write_len_prefixed_bytes(b'RESTORE')
-        msg.write_bytes(state_tid.bytes)
-        msg.write_len_prefixed_bytes(state_data)
-        self.write(msg.end_message())
-        self.flush()
+            await data_queue.put(None)
+
+    async def _defer_restore_indexes(self, pgcon, tables):
+        # Drop the indexes of the restored tables that nothing depends
+        # on and that don't back a constraint, and return the statements
+        # re-creating them.
+        if not tables:
+            return []
+
+        table_list = ', '.join(pg_common.quote_literal(t) for t in tables)
+        indexes = json.loads(await pgcon.sql_fetch_val(
+            f'''
+                SELECT coalesce(json_agg(json_build_array(
+                    quote_ident(n.nspname) || '.' || quote_ident(c.relname),
+                    pg_get_indexdef(i.indexrelid)
+                )), '[]')::text
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE
+                    i.indrelid = ANY(ARRAY[{table_list}]::regclass[])
+                    AND NOT i.indisprimary
+                    AND NOT i.indisreplident
+                    AND NOT EXISTS (
+                        SELECT FROM pg_depend d
+                        WHERE
+                            d.refclassid = 'pg_class'::regclass
+                            AND d.refobjid = i.indexrelid
+                    )
+                    AND NOT EXISTS (
+                        SELECT FROM pg_constraint con
+                        WHERE con.conindid = i.indexrelid
+                    )
+            '''.encode(),
+        ))
+        if not indexes:
+            return []
+
+        await pgcon.sql_execute(
+            f'DROP INDEX {", ".join(name for name, _ in indexes)};'.encode())
+        return [indexdef for _, indexdef in indexes]
 
     def _build_type_id_map_for_restore_mending(self, restore_block):
         type_map = {}
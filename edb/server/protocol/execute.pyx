@@ -157,6 +157,53 @@ async def execute(
     return data
 
 
+async def execute_pipeline(
+    be_conn: pgcon.PGConnection,
+    dbv: dbview.DatabaseConnectionView,
+    compiled_queries: list,
+    bind_datas: list,
+    state: bytes,
+    *,
+    fe_conn: frontend.FrontendConnection,
+    on_complete: object,
+):
+    """Execute a sequence of read-only queries in one backend round trip.
+
+    *bind_datas* must be the recoded arguments of the queries and *state*
+    the serialized state they were all sent with; see
+    PGConnection.parse_execute_pipeline() for the rest.
+    """
+    cdef:
+        bytes orig_state = state
+
+    query_units = [
+        compiled.query_unit_group[0] for compiled in compiled_queries
+    ]
+
+    if be_conn.last_state == state:
+        state = None
+
+    try:
+        for query_unit in query_units:
+            dbv.start(query_unit)
+        await be_conn.parse_execute_pipeline(
+            queries=query_units,
+            bind_datas=bind_datas,
+            fe_conn=fe_conn,
+            on_complete=on_complete,
+            state=state,
+            dbver=dbv.dbver,
+        )
+    except Exception:
+        dbv.on_error()
+        raise
+    else:
+        for query_unit in query_units:
+            dbv.on_success(query_unit, None)
+        if state is not None:
+            be_conn.last_state = orig_state
+
+
 async def execute_script(
     conn: pgcon.PGConnection,
     dbv: dbview.DatabaseConnectionView,
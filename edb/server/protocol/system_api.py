@@ -85,6 +85,25 @@ async def handle_status_request(
     response,
     server,
 ):
+    if not server.is_introspection_complete():
+        done, total = server.get_introspection_progress()
+        _response_error(
+            response,
+            http.HTTPStatus.SERVICE_UNAVAILABLE,
+            f'the databases are being introspected ({done} of {total})',
+            errors.AvailabilityError,
+        )
+        return
+
+    if not server.is_query_cache_warm():
+        _response_error(
+            response,
+            http.HTTPStatus.SERVICE_UNAVAILABLE,
+            'the query cache is being warmed up',
+            errors.AvailabilityError,
+        )
+        return
+
     response.status = http.HTTPStatus.OK
     response.content_type = b'application/json'
     db = server.get_db(dbname=edbdef.EDGEDB_SYSTEM_DB)
@@ -24,6 +24,7 @@ from typing import *
 
 import asyncio
 import collections
+import fnmatch
 import ipaddress
 import json
 import logging
@@ -41,7 +42,9 @@ import immutables
 from jwcrypto import jwk
 
 from edb import errors
+from edb import edgeql
 
+from edb.common import debug
 from edb.common import devmode
 from edb.common import taskgroup
 from edb.common import windowedsum
@@ -52,6 +55,9 @@ from edb.schema import schema as s_schema
 
 from edb.server import args as srvargs
 from edb.server import cache
+from edb.server.cache import schema as schema_cache
+from edb.server.cache import stdschema
+from edb.server import compiler
 from edb.server import config
 from edb.server import connpool
 from edb.server import compiler_pool
@@ -99,7 +105,8 @@ class Server(ha_base.ClusterProtocol):
     _report_config_data: bytes
 
     _std_schema: s_schema.Schema
-    _refl_schema: s_schema.Schema
+    _std_schema_pickle: stdschema.LazySchema
+    _refl_schema: stdschema.LazySchema
     _schema_class_layout: s_refl.SchemaTypeLayout
 
     _sys_pgcon_waiter: asyncio.Lock
@@ -129,10 +136,21 @@ class Server(ha_base.ClusterProtocol):
         cluster,
         runstate_dir,
         internal_runstate_dir,
+        cache_dir: Optional[pathlib.Path] = None,
+        query_cache_warmup: Optional[
+            Mapping[str, List[srvargs.WarmupQuery]]
+        ] = None,
+        query_cache_manifest_size: int = 0,
+        wait_for_query_cache_warmup: bool = False,
+        eager_introspection: Sequence[str] = (),
+        eager_introspection_concurrency: int = 4,
         max_backend_connections,
+        backend_standby_connections: int = 0,
+        dump_jobs: int = 1,
         compiler_pool_size,
         compiler_pool_mode: srvargs.CompilerPoolMode,
         compiler_pool_addr,
+        slow_compile_log_threshold: Optional[float] = None,
         nethosts,
         netport,
         new_instance: bool,
@@ -177,19 +195,34 @@ class Server(ha_base.ClusterProtocol):
             connect=self._pg_connect,
             disconnect=self._pg_disconnect,
             max_capacity=pool_capacity,
+            warm_standby=backend_standby_connections,
         )
         self._pg_unavailable_msg = None
+        self._hot_stmts = {}
 
         # DB state will be initialized in init().
         self._dbindex = None
 
         self._runstate_dir = runstate_dir
         self._internal_runstate_dir = internal_runstate_dir
+        self._cache_dir = cache_dir
+        self._query_cache_warmup = query_cache_warmup or {}
+        self._query_cache_manifest_size = query_cache_manifest_size
+        self._wait_for_query_cache_warmup = wait_for_query_cache_warmup
+        self._query_cache_warmup_task = None
+        self._query_workload_saver = None
+        self._eager_introspection = tuple(eager_introspection)
+        self._eager_introspection_concurrency = (
+            eager_introspection_concurrency)
+        self._eager_introspection_task = None
+        self._eager_introspection_progress = (0, 0)
         self._max_backend_connections = max_backend_connections
+        self._dump_jobs = dump_jobs
         self._compiler_pool = None
         self._compiler_pool_size = compiler_pool_size
         self._compiler_pool_mode = compiler_pool_mode
         self._compiler_pool_addr = compiler_pool_addr
+        self._slow_compile_log_threshold = slow_compile_log_threshold
         self._suggested_client_pool_size = max(
             min(max_backend_connections,
                 defines.MAX_SUGGESTED_CLIENT_POOL_SIZE),
@@ -240,6 +273,12 @@ class Server(ha_base.ClusterProtocol):
         self._http_query_cache = cache.StatementsCache(
             maxsize=defines.HTTP_PORT_QUERY_CACHE_SIZE)
 
+        schema_cache_dir = self._get_cache_dir('schemas')
+        if schema_cache_dir is not None:
+            self._schema_cache = schema_cache.SchemaCache(schema_cache_dir)
+        else:
+            self._schema_cache = None
+
         self._http_last_minute_requests = windowedsum.WindowedSum()
         self._http_request_logger = None
 
@@ -374,6 +413,11 @@ class Server(ha_base.ClusterProtocol):
                 time.monotonic() - started_at)
         if ha_serial == self._ha_master_serial:
             rv.set_server(self)
+            try:
+                await self._prepare_hot_statements(dbname, rv)
+            except Exception:
+                rv.terminate()
+                raise
             if self._backend_adaptive_ha is not None:
                 self._backend_adaptive_ha.on_pgcon_made(
                     dbname == defines.EDGEDB_SYSTEM_DB
@@ -385,6 +429,20 @@ class Server(ha_base.ClusterProtocol):
             rv.terminate()
             raise ConnectionError("connected to outdated Postgres master")
 
+    async def _prepare_hot_statements(self, dbname, conn):
+        hot_stmts = self._hot_stmts.get(dbname)
+        if hot_stmts is None:
+            hot_stmts = cache.HotStatements(
+                dbname, maxsize=defines.BACKEND_HOT_STATEMENTS)
+            self._hot_stmts[dbname] = hot_stmts
+        conn.set_hot_statements(hot_stmts)
+
+        if self._dbindex is None:
+            return
+        db = self._dbindex.maybe_get_db(dbname)
+        if db is not None:
+            await conn.prepare_hot_statements(db.dbver)
+
     async def _pg_disconnect(self, conn):
         metrics.current_backend_connections.dec()
         conn.terminate()
@@ -408,6 +466,9 @@ class Server(ha_base.ClusterProtocol):
                 std_schema=self._std_schema,
                 global_schema=global_schema,
                 sys_config=sys_config,
+                query_cache_dir=self._get_cache_dir('queries'),
+                workload_dir=self._get_cache_dir('workload'),
+                workload_size=self._query_cache_manifest_size,
             )
 
             self._fetch_roles()
@@ -420,6 +481,7 @@ class Server(ha_base.ClusterProtocol):
             self._sys_pgcon_ready_evt.set()
 
             self._populate_sys_auth()
+            self._populate_backend_connection_quotas()
 
             if not self._listen_hosts:
                 self._listen_hosts = (
@@ -496,9 +558,10 @@ class Server(ha_base.ClusterProtocol):
             dbindex=self._dbindex,
             runstate_dir=self._internal_runstate_dir,
             backend_runtime_params=self.get_backend_runtime_params(),
-            std_schema=self._std_schema,
+            std_schema=self._std_schema_pickle,
             refl_schema=self._refl_schema,
             schema_class_layout=self._schema_class_layout,
+            slow_compile_log_threshold=self._slow_compile_log_threshold,
         )
         if self._compiler_pool_mode == srvargs.CompilerPoolMode.Remote:
             args['address'] = self._compiler_pool_addr
@@ -514,6 +577,39 @@ class Server(ha_base.ClusterProtocol):
         auth = config.lookup('auth', cfg) or ()
         self._sys_auth = tuple(sorted(auth, key=lambda a: a.priority))
 
+    def _populate_backend_connection_quotas(self):
+        cfg = self._dbindex.get_sys_config()
+        quotas = {}
+        for quota in config.lookup('backend_connection_quotas', cfg) or ():
+            max_conns = quota.max_connections
+            if max_conns is not None and max_conns < 1:
+                logger.warning(
+                    'max_connections of the backend connection quota of '
+                    'database %r must be positive, using 1',
+                    quota.database)
+                max_conns = 1
+            min_conns = max(quota.min_connections, 0)
+            if max_conns is not None and min_conns > max_conns:
+                min_conns = max_conns
+            weight = quota.weight
+            if weight < 1:
+                logger.warning(
+                    'weight of the backend connection quota of '
+                    'database %r must be positive, using 1',
+                    quota.database)
+                weight = 1
+            quotas[quota.database] = connpool.DBQuota(
+                min_conns=min_conns,
+                max_conns=max_conns,
+                weight=weight,
+            )
+        self._pg_pool.set_db_quotas(quotas)
+
+    def _get_cache_dir(self, kind: str) -> Optional[pathlib.Path]:
+        if self._cache_dir is None:
+            return None
+        return self._cache_dir / self._tenant_id / kind
+
     def _get_pgaddr(self):
         return self._cluster.get_connection_spec()
 
@@ -523,6 +619,9 @@ class Server(ha_base.ClusterProtocol):
     def get_suggested_client_pool_size(self) -> int:
         return self._suggested_client_pool_size
 
+    def get_dump_jobs(self) -> int:
+        return self._dump_jobs
+
     def get_db(self, *, dbname: str):
         assert self._dbindex is not None
         return self._dbindex.get_db(dbname)
@@ -531,6 +630,173 @@ class Server(ha_base.ClusterProtocol):
         assert self._dbindex is not None
         return self._dbindex.maybe_get_db(dbname)
 
+    def is_query_cache_warm(self) -> bool:
+        """Tell if the server is ready as far as the query cache goes."""
+        return (
+            not self._wait_for_query_cache_warmup
+            or self._query_cache_warmup_task is None
+            or self._query_cache_warmup_task.done()
+        )
+
+    def is_introspection_complete(self) -> bool:
+        """Tell if the databases to introspect at startup are ready."""
+        return (
+            self._eager_introspection_task is None
+            or self._eager_introspection_task.done()
+        )
+
+    def get_introspection_progress(self) -> Tuple[int, int]:
+        """Return (done, total) for the startup introspection."""
+        return self._eager_introspection_progress
+
+    async def _introspect_dbs_eagerly(self):
+        assert self._dbindex is not None
+        dbs = [
+            db for db in self._dbindex.iter_dbs()
+            if any(
+                fnmatch.fnmatchcase(db.name, pattern)
+                for pattern in self._eager_introspection
+            )
+        ]
+        if not dbs:
+            return
+
+        logger.info('introspecting %d databases', len(dbs))
+        started_at = time.monotonic()
+        sem = asyncio.Semaphore(self._eager_introspection_concurrency)
+        done = 0
+        self._eager_introspection_progress = (done, len(dbs))
+        metrics.eager_introspection_pending.set(len(dbs))
+
+        async def introspect(db):
+            nonlocal done
+            async with sem:
+                try:
+                    await db.introspection()
+                except Exception:
+                    # The database will be introspected on the first
+                    # connection to it anyway.
+                    metrics.background_errors.inc(1.0, 'eager_introspection')
+                    logger.exception(
+                        'could not introspect database %r', db.name)
+                finally:
+                    done += 1
+                    self._eager_introspection_progress = (done, len(dbs))
+                    metrics.eager_introspection_pending.dec()
+
+        try:
+            async with taskgroup.TaskGroup(name='introspect DBs') as g:
+                for db in dbs:
+                    g.create_task(introspect(db))
+        finally:
+            metrics.eager_introspection_pending.set(0)
+
+        logger.info(
+            'introspected %d databases in %.2fs',
+            len(dbs), time.monotonic() - started_at)
+
+    async def _warm_up_query_caches(self):
+        await self._warm_up_query_cache_from_file()
+
+        if self._query_cache_manifest_size:
+            assert self._dbindex is not None
+            for db in list(self._dbindex.iter_dbs()):
+                await self._warm_up_query_workload(db, from_manifest=True)
+
+    async def _warm_up_query_workload(self, db, *, from_manifest=False):
+        started_at = time.monotonic()
+        try:
+            cached = await db.warm_up_query_workload(
+                from_manifest=from_manifest)
+        except Exception:
+            metrics.background_errors.inc(1.0, 'warm_up_query_workload')
+            logger.exception(
+                "failed to warm up query cache of database '%s'", db.name)
+            return
+        if cached:
+            logger.info(
+                "compiled %d frequently used queries of database '%s' "
+                "in %.2fs", cached, db.name, time.monotonic() - started_at)
+
+    def schedule_query_workload_warmup(self, dbname):
+        # A warmup started earlier will stop on its own, as the results
+        # compiled for an outdated schema are discarded.
+        db = self.maybe_get_db(dbname=dbname)
+        if db is not None and self._accept_new_tasks:
+            self.create_task(
+                self._warm_up_query_workload(db), interruptable=True)
+
+    def schedule_graphql_schema_build(self, dbname):
+        db = self.maybe_get_db(dbname=dbname)
+        if db is not None and self._accept_new_tasks:
+            self.create_task(
+                self._build_graphql_schema(db), interruptable=True)
+
+    async def _build_graphql_schema(self, db):
+        try:
+            await self._compiler_pool.build_graphql_schema(
+                db.name,
+                db.user_schema,
+                self.get_global_schema(),
+                db.reflection_cache,
+                db.db_config,
+                self.get_compilation_system_config(),
+            )
+        except Exception:
+            metrics.background_errors.inc(1.0, 'build_graphql_schema')
+            logger.exception(
+                "failed to build the GraphQL schema of database '%s'",
+                db.name)
+
+    async def _save_query_workloads(self):
+        while True:
+            await asyncio.sleep(defines.QUERY_WORKLOAD_SAVE_INTERVAL)
+            self._save_query_workload_manifests()
+
+    def _save_query_workload_manifests(self):
+        if self._dbindex is None:
+            return
+        for db in self._dbindex.iter_dbs():
+            db.save_query_workload()
+
+    async def _warm_up_query_cache_from_file(self):
+        modaliases = immutables.Map({None: defines.DEFAULT_MODULE_ALIAS})
+        session_config = immutables.Map()
+
+        for dbname, queries in self._query_cache_warmup.items():
+            db = self.maybe_get_db(dbname=dbname)
+            if db is None:
+                logger.warning(
+                    "cannot warm up query cache of database '%s': "
+                    "the database does not exist", dbname)
+                continue
+
+            keys = []
+            for query in queries:
+                if debug.flags.edgeql_disable_normalization:
+                    source = edgeql.Source.from_string(query.text)
+                else:
+                    source = edgeql.NormalizedSource.from_string(query.text)
+                query_req = dbview.QueryRequestInfo(
+                    source,
+                    defines.CURRENT_PROTOCOL,
+                    output_format=compiler.OutputFormat(
+                        query.output_format.upper()),
+                    expect_one=query.expect_one,
+                )
+                keys.append((query_req, modaliases, session_config))
+
+            started_at = time.monotonic()
+            try:
+                cached = await db.warm_up_query_cache(keys)
+            except Exception:
+                logger.exception(
+                    "failed to warm up query cache of database '%s'", dbname)
+                continue
+            logger.info(
+                "compiled %d of %d queries of database '%s' in %.2fs",
+                cached, len(keys), dbname, time.monotonic() - started_at)
+
     async def new_dbview(self, *, dbname, query_cache, protocol_version):
         db = self.get_db(dbname=dbname)
         await db.introspection()
@@ -593,6 +859,7 @@ class Server(ha_base.ClusterProtocol):
         cfg = await self.load_sys_config()
         self._dbindex.update_sys_config(cfg)
         self._reinit_idle_gc_collector()
+        self._populate_backend_connection_quotas()
 
     def schedule_reported_config_if_needed(self, setting_name):
         setting = self._config_settings[setting_name]
@@ -651,7 +918,26 @@ class Server(ha_base.ClusterProtocol):
         self._dbindex.update_global_schema(new_global_schema)
         self._fetch_roles()
 
-    async def introspect_user_schema(self, conn):
+    async def introspect_user_schema(self, conn, dbname=None):
+        loop = asyncio.get_running_loop()
+        version = None
+        if dbname is not None and self._schema_cache is not None:
+            # The version must be fetched before the reflection data, so
+            # that a concurrent DDL can only make the saved schema stale.
+            version = await conn.sql_fetch_val(
+                b'SELECT version::text FROM edgedb."_SchemaSchemaVersion"')
+
+        if version is not None:
+            version = uuid.UUID(version.decode())
+            started_at = time.monotonic()
+            user_schema = await loop.run_in_executor(
+                None, self._schema_cache.load, dbname, version)
+            if user_schema is not None:
+                metrics.user_schema_load_duration.observe(
+                    time.monotonic() - started_at, 'cache')
+                return user_schema
+
+        started_at = time.monotonic()
         json_data = await conn.sql_fetch_val(self._local_intro_query)
 
         base_schema = s_schema.ChainedSchema(
@@ -660,12 +946,20 @@ class Server(ha_base.ClusterProtocol):
             self.get_global_schema(),
         )
 
-        return s_refl.parse_into(
+        user_schema = s_refl.parse_into(
             base_schema=base_schema,
             schema=s_schema.FlatSchema(),
             data=json_data,
             schema_class_layout=self._schema_class_layout,
         )
+        metrics.user_schema_load_duration.observe(
+            time.monotonic() - started_at, 'reflection')
+
+        if version is not None:
+            await loop.run_in_executor(
+                None, self._schema_cache.save, dbname, version, user_schema)
+
+        return user_schema
 
     async def _acquire_intro_pgcon(self, dbname):
         try:
@@ -706,7 +1000,7 @@ class Server(ha_base.ClusterProtocol):
             return
 
         try:
-            user_schema = await self.introspect_user_schema(conn)
+            user_schema = await self.introspect_user_schema(conn, dbname)
 
             reflection_cache_json = await conn.sql_fetch_val(
                 b'''
@@ -851,32 +1145,49 @@ class Server(ha_base.ClusterProtocol):
                 WHERE key = 'global_intro_query';
             ''')
 
-            result = await syscon.sql_fetch_val(b'''\
-                SELECT bin FROM edgedbinstdata.instdata
-                WHERE key = 'stdschema';
-            ''')
+            std_cache_dir = self._get_cache_dir('std')
+            std_cache = None
+            std_pickles = None
+            if std_cache_dir is not None:
+                # Hashing the pickles in the backend is much cheaper
+                # than fetching them.
+                checksum = await syscon.sql_fetch_val(b'''\
+                    SELECT md5(string_agg(bin, ''::bytea ORDER BY key))
+                    FROM edgedbinstdata.instdata
+                    WHERE key IN ('stdschema', 'reflschema', 'classlayout');
+                ''')
+                std_cache = stdschema.StdSchemaCache(
+                    std_cache_dir, checksum.decode())
+                std_pickles = std_cache.load()
+
+            if std_pickles is None:
+                std_pickles = []
+                for key in (b'stdschema', b'reflschema', b'classlayout'):
+                    result = await syscon.sql_fetch_val(
+                        b'SELECT bin FROM edgedbinstdata.instdata '
+                        b'WHERE key = $1',
+                        args=[key],
+                    )
+                    std_pickles.append(result[2:])
+                if std_cache is not None:
+                    std_cache.save(*std_pickles)
+
+            std_pickle, refl_pickle, layout_pickle = std_pickles
+
+            # The std schema is needed right away, but the reflection
+            # schema is only used by the compiler workers, and only when
+            # they compile DDL.
+            self._std_schema_pickle = stdschema.LazySchema(std_pickle)
             try:
-                self._std_schema = pickle.loads(result[2:])
+                self._std_schema = self._std_schema_pickle.materialize()
             except Exception as e:
                 raise RuntimeError(
                     'could not load std schema pickle') from e
 
-            result = await syscon.sql_fetch_val(b'''\
-                SELECT bin FROM edgedbinstdata.instdata
-                WHERE key = 'reflschema';
-            ''')
-            try:
-                self._refl_schema = pickle.loads(result[2:])
-            except Exception as e:
-                raise RuntimeError(
-                    'could not load refl schema pickle') from e
+            self._refl_schema = stdschema.LazySchema(refl_pickle)
 
-            result = await syscon.sql_fetch_val(b'''\
-                SELECT bin FROM edgedbinstdata.instdata
-                WHERE key = 'classlayout';
-            ''')
             try:
-                self._schema_class_layout = pickle.loads(result[2:])
+                self._schema_class_layout = pickle.loads(layout_pickle)
             except Exception as e:
                 raise RuntimeError(
                     'could not load schema class layout pickle') from e
@@ -1027,6 +1338,9 @@ class Server(ha_base.ClusterProtocol):
         try:
             assert self._dbindex is not None
             self._dbindex.unregister_db(dbname)
+            self._hot_stmts.pop(dbname, None)
+            if self._schema_cache is not None:
+                self._schema_cache.discard(dbname)
         except Exception:
             metrics.background_errors.inc(1.0, 'on_after_drop_db')
             raise
@@ -1080,6 +1394,8 @@ class Server(ha_base.ClusterProtocol):
         try:
             if setting_name == 'auth':
                 self._populate_sys_auth()
+            elif setting_name == 'backend_connection_quotas':
+                self._populate_backend_connection_quotas()
         except Exception:
             metrics.background_errors.inc(1.0, 'after_system_config_add')
             raise
@@ -1089,6 +1405,8 @@ class Server(ha_base.ClusterProtocol):
         try:
             if setting_name == 'auth':
                 self._populate_sys_auth()
+            elif setting_name == 'backend_connection_quotas':
+                self._populate_backend_connection_quotas()
         except Exception:
             metrics.background_errors.inc(1.0, 'after_system_config_rem')
             raise
@@ -1657,6 +1975,16 @@ class Server(ha_base.ClusterProtocol):
         await self._cluster.start_watching(self)
         await self._create_compiler_pool()
 
+        if self._eager_introspection:
+            self._eager_introspection_task = self.create_task(
+                self._introspect_dbs_eagerly(), interruptable=True)
+        if self._query_cache_warmup or self._query_cache_manifest_size:
+            self._query_cache_warmup_task = self.create_task(
+                self._warm_up_query_caches(), interruptable=True)
+        if self._query_cache_manifest_size:
+            self._query_workload_saver = self.create_task(
+                self._save_query_workloads(), interruptable=True)
+
         if self._startup_script and self._new_instance:
             await binary.run_script(
                 server=self,
@@ -1725,6 +2053,9 @@ class Server(ha_base.ClusterProtocol):
             self._cluster.stop_watching()
             if self._http_request_logger is not None:
                 self._http_request_logger.cancel()
+            if self._query_workload_saver is not None:
+                self._query_workload_saver.cancel()
+                self._save_query_workload_manifests()
 
             await self._stop_servers(self._servers.values())
             self._servers = {}
@@ -1460,6 +1460,7 @@ class _EdgeDBServer:
         max_allowed_connections: Optional[int],
         compiler_pool_size: int,
         compiler_pool_mode: Optional[edgedb_args.CompilerPoolMode] = None,
+        dump_jobs: Optional[int] = None,
         debug: bool,
         backend_dsn: Optional[str] = None,
         data_dir: Optional[str] = None,
@@ -1487,6 +1488,7 @@ class _EdgeDBServer:
         self.max_allowed_connections = max_allowed_connections
         self.compiler_pool_size = compiler_pool_size
         self.compiler_pool_mode = compiler_pool_mode
+        self.dump_jobs = dump_jobs
         self.debug = debug
         self.backend_dsn = backend_dsn
         self.data_dir = data_dir
@@ -1564,6 +1566,9 @@ class _EdgeDBServer:
         if self.compiler_pool_mode is not None:
             cmd.extend(('--compiler-pool-mode', self.compiler_pool_mode.value))
 
+        if self.dump_jobs is not None:
+            cmd.extend(('--dump-jobs', str(self.dump_jobs)))
+
         for addr in self.bind_addrs:
             cmd.extend(('--bind-address', addr))
 
@@ -1750,6 +1755,7 @@ def start_edgedb_server(
     max_allowed_connections: Optional[int]=10,
     compiler_pool_size: int=2,
     compiler_pool_mode: Optional[edgedb_args.CompilerPoolMode] = None,
+    dump_jobs: Optional[int] = None,
     adjacent_to: Optional[tconn.Connection]=None,
     debug: bool=debug.flags.server,
     backend_dsn: Optional[str] = None,
@@ -1799,6 +1805,7 @@ def start_edgedb_server(
         adjacent_to=adjacent_to,
         compiler_pool_size=compiler_pool_size,
         compiler_pool_mode=compiler_pool_mode,
+        dump_jobs=dump_jobs,
         debug=debug,
         backend_dsn=backend_dsn,
         tenant_id=tenant_id,
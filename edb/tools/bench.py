@@ -0,0 +1,261 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Micro-benchmarks of server internals."""
+
+
+from __future__ import annotations
+from typing import *
+
+import difflib
+import os
+import pickle
+import sys
+import time
+
+import click
+
+from edb.tools.edb import edbcommands
+
+
+@edbcommands.group('bench')
+def bench():
+    """Run micro-benchmarks of server internals."""
+
+
+def _timeit(fn: Callable[[], Any], iterations: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started_at) / iterations
+
+
+def _report(name: str, baseline: float, timing: float) -> None:
+    print(
+        f'{name:<32} {baseline * 1e6:>12.1f}us {timing * 1e6:>12.1f}us '
+        f'{baseline / timing:>8.2f}x'
+    )
+
+
+@bench.command('compiler-wire')
+@click.option(
+    '--iterations', type=int, default=1000, show_default=True,
+    help='number of round trips to measure for every message size')
+def compiler_wire(iterations: int):
+    """Compare compiler pool RPC encodings.
+
+    Measures encoding and decoding of a compile request carrying a
+    schema update and of a response carrying a transaction state with
+    plain pickle and with the compiler pool wire format.
+    """
+    from edb.server.compiler_pool import amsg
+    from edb.server.compiler_pool import wire
+
+    def frame(chunks):
+        # What the receiving side gets from the socket.
+        size = sum(len(c) for c in chunks)
+        msg = b''.join((amsg._uint64_packer(size + 8), b'\0' * 8, *chunks))
+        return next(iter(amsg.MessageStream().feed_data(msg)))[8:]
+
+    print(f'{"message":<32} {"pickle":>14} {"wire":>14} {"speedup":>9}')
+    for size in (1 << 10, 1 << 14, 1 << 18, 1 << 22):
+        blob = os.urandom(size)
+        args = ('db', blob, None, None, None, None, 'SELECT 1', 42)
+        result = (0, (('unit',) * 8, blob))
+
+        def pickle_request():
+            pickle.loads(frame([pickle.dumps(('compile', args))]))
+
+        def wire_request():
+            wire.decode(frame(wire.encode_request('compile', args)))
+
+        def pickle_response():
+            pickle.loads(frame([pickle.dumps(result, -1)]))
+
+        def wire_response():
+            wire.decode(frame(wire.encode_response(result)))
+
+        _report(
+            f'request, {size >> 10}KiB schema',
+            _timeit(pickle_request, iterations),
+            _timeit(wire_request, iterations),
+        )
+        _report(
+            f'response, {size >> 10}KiB state',
+            _timeit(pickle_response, iterations),
+            _timeit(wire_response, iterations),
+        )
+
+
+@bench.command('schema-objects')
+@click.option(
+    '--objects', type=int, default=50000, show_default=True,
+    help='number of objects in the schema')
+@click.option(
+    '--modules', type=int, default=50, show_default=True,
+    help='number of modules the objects are spread over')
+@click.option(
+    '--iterations', type=int, default=20, show_default=True,
+    help='number of listings to measure for every query')
+def schema_objects(objects: int, modules: int, iterations: int):
+    """Compare schema object listing with and without indexes.
+
+    Measures Schema.get_objects() on a schema with many objects against
+    scanning every object of the schema, which is what get_objects()
+    did before the schema kept its class and module indexes.
+    """
+    from edb.common import uuidgen
+    from edb.schema import annos as s_anno
+    from edb.schema import modules as s_mod
+    from edb.schema import name as sn
+    from edb.schema import objtypes as s_objtypes
+    from edb.schema import scalars as s_scalars
+    from edb.schema import schema as s_schema
+
+    schema = s_schema.FlatSchema()
+    for m in range(modules):
+        schema, _ = s_mod.Module.create_in_schema(
+            schema, id=uuidgen.uuid1mc(), name=sn.UnqualName(f'm{m}'))
+
+    classes = (s_objtypes.ObjectType, s_scalars.ScalarType, s_anno.Annotation)
+    for i in range(objects):
+        sclass = classes[i % len(classes)]
+        schema, _ = sclass.create_in_schema(
+            schema,
+            id=uuidgen.uuid1mc(),
+            name=sn.QualName(f'm{i % modules}', f'o{i}'),
+        )
+
+    queries: List[Tuple[str, Dict[str, Any]]] = [
+        ('by type', dict(type=s_scalars.ScalarType)),
+        ('by module', dict(included_modules=[sn.UnqualName('m0')])),
+        ('by type and module', dict(
+            type=s_objtypes.ObjectType,
+            included_modules=[sn.UnqualName('m0')],
+        )),
+        ('all', dict()),
+    ]
+
+    print(f'{"query":<32} {"scan":>14} {"indexed":>14} {"speedup":>9}')
+    for name, query in queries:
+        def scan():
+            list(s_schema.SchemaIterator(
+                schema,
+                schema._id_to_type,
+                included_modules=query.get('included_modules'),
+                excluded_modules=None,
+                type=query.get('type'),
+            ))
+
+        def indexed():
+            list(schema.get_objects(**query))
+
+        _report(
+            name,
+            _timeit(scan, iterations),
+            _timeit(indexed, iterations),
+        )
+
+
+@bench.command('migration-delta')
+@click.option(
+    '--types', type=int, default=400, show_default=True,
+    help='number of object types in the schema')
+@click.option(
+    '--iterations', type=int, default=3, show_default=True,
+    help='number of diffs to measure')
+def migration_delta(types: int, iterations: int):
+    """Compare schema diffing with and without rename candidate pruning.
+
+    Diffs two schemas with many changed object types, a quarter of them
+    renamed, comparing every pair of changed objects and only the
+    plausible rename candidates, and checks that both produce the same
+    DDL renaming the renamed types.  Exits with 1 if they don't.
+    """
+    from edb.schema import ddl as s_ddl
+    from edb.schema import delta as s_delta
+    from edb.testbase import lang as tb_lang
+
+    def make_schema(ddl: List[str]):
+        return s_ddl.apply_ddl_script(
+            '\n'.join(['CREATE MODULE default;', *ddl]),
+            schema=tb_lang._load_std_schema(),
+        )
+
+    old_ddl = []
+    new_ddl = []
+    for i in range(types):
+        props = (
+            f'CREATE PROPERTY p{i} -> std::str; '
+            f'CREATE PROPERTY n -> std::int64;'
+        )
+        old_ddl.append(f'CREATE TYPE default::T{i} {{ {props} }};')
+        if i % 4 == 0:
+            new_ddl.append(f'CREATE TYPE default::R{i} {{ {props} }};')
+        elif i % 4 == 1:
+            new_ddl.append(
+                f'CREATE TYPE default::T{i} {{ {props} '
+                f'CREATE PROPERTY q -> std::bool; }};')
+        elif i % 4 == 2:
+            new_ddl.append(f'CREATE TYPE default::N{i} {{ {props} }};')
+    old_schema = make_schema(old_ddl)
+    new_schema = make_schema(new_ddl)
+
+    deltas: Dict[int, str] = {}
+
+    def diff(threshold: int) -> Callable[[], None]:
+        def run() -> None:
+            orig = s_delta.PRUNE_COMPARISONS_ABOVE
+            s_delta.PRUNE_COMPARISONS_ABOVE = threshold
+            try:
+                delta = s_ddl.delta_schemas(old_schema, new_schema)
+            finally:
+                s_delta.PRUNE_COMPARISONS_ABOVE = orig
+            deltas[threshold] = s_ddl.ddl_text_from_delta(
+                old_schema, new_schema, delta)
+        return run
+
+    exhaustive = sys.maxsize
+    pruned = 0
+
+    print(f'{"diff":<32} {"exhaustive":>14} {"pruned":>14} {"speedup":>9}')
+    _report(
+        f'{types} types',
+        _timeit(diff(exhaustive), iterations),
+        _timeit(diff(pruned), iterations),
+    )
+    renames = deltas[pruned].count('RENAME TO default::R')
+    if renames != (types + 3) // 4:
+        print(f'pruned delta has {renames} renames instead of '
+              f'{(types + 3) // 4}')
+        sys.exit(1)
+    if deltas[exhaustive] == deltas[pruned]:
+        print('deltas are identical')
+    else:
+        print('deltas differ:')
+        diff_lines = difflib.unified_diff(
+            deltas[exhaustive].splitlines(),
+            deltas[pruned].splitlines(),
+            'exhaustive',
+            'pruned',
+            lineterm='',
+        )
+        for line in diff_lines:
+            print(line)
+        sys.exit(1)
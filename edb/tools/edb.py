@@ -59,6 +59,7 @@ def server(version=False, **kwargs):
 
 # Import at the end of the file so that "edb.tools.edb.edbcommands"
 # is defined for all of the below modules when they try to import it.
+from . import bench  # noqa
 from . import cli  # noqa
 from . import dflags  # noqa
 from . import gen_errors  # noqa
@@ -69,4 +70,5 @@ from . import inittestdb  # noqa
 from . import test  # noqa
 from . import wipe  # noqa
 from . import gen_test_dumps  # noqa
+from .poolsim import cli as poolsim_cli  # noqa
 from .profiling import cli as prof_cli  # noqa
@@ -0,0 +1,161 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from __future__ import annotations
+from typing import *
+
+import json
+import random
+
+import click
+
+from edb.server import connpool
+from edb.tools.edb import edbcommands
+
+from . import sim
+
+
+POOLS = {
+    'pool': connpool.Pool,
+    'naive': connpool._NaivePool,
+}
+
+METRICS = (
+    # key, title, scale
+    ('queries', 'queries', 1),
+    ('wait_p50', 'wait p50 (ms)', 1000),
+    ('wait_p99', 'wait p99 (ms)', 1000),
+    ('wait_max', 'wait max (ms)', 1000),
+    ('fairness', 'fairness', 1),
+    ('churn', '(dis-)connects', 1),
+    ('utilization', 'utilization', 1),
+)
+
+
+def _format(value: float, scale: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return f'{value * scale:.3f}'
+
+
+@edbcommands.command('pool-sim')
+@click.option(
+    '--spec', type=click.File('r'),
+    help='JSON file with the pool capacity, connection costs and a '
+         'synthetic workload: {"capacity": 10, "dbs": [{"db": "t0", '
+         '"start_at": 0, "end_at": 10, "qps": 50, "query_cost_base": 0.03, '
+         '"query_cost_var": 0.005}, ...]}')
+@click.option(
+    '--trace', type=click.File('r'),
+    help='recorded workload to replay instead of the synthetic one, one '
+         'JSON object per line: {"at": 0.5, "db": "t0", "duration": 0.03}')
+@click.option(
+    '--capacity', type=int,
+    help='max number of backend connections, overrides the spec')
+@click.option(
+    '--pool', 'pools', type=click.Choice(list(POOLS)), multiple=True,
+    help='pool implementation(s) to simulate, all of them by default')
+@click.option(
+    '--warm-standby', type=int, default=0, show_default=True,
+    help='number of standby connections of the QoS pool')
+@click.option(
+    '--seed', type=int, default=0, show_default=True,
+    help='seed of the synthetic workload and connection costs')
+@click.option(
+    '--per-db', is_flag=True,
+    help='also report waits of every database')
+@click.option(
+    '--json', 'as_json', is_flag=True,
+    help='print results as JSON')
+def pool_sim(
+    spec: Optional[TextIO],
+    trace: Optional[TextIO],
+    capacity: Optional[int],
+    pools: Tuple[str, ...],
+    warm_standby: int,
+    seed: int,
+    per_db: bool,
+    as_json: bool,
+):
+    """Simulate the backend connection pool offline.
+
+    Replays a synthetic or a recorded workload of connection
+    acquisitions against the pool implementations on a virtual clock and
+    reports acquisition waits, fairness of the mean wait across
+    databases (Jain's index, 1.0 is perfectly fair), connection churn and
+    utilization (the share of the connection time spent in queries).
+    Results are deterministic for the same inputs and seed.
+    """
+    if spec is not None:
+        pool_spec = sim.Spec.from_dict(json.load(spec))
+    elif capacity is not None:
+        pool_spec = sim.Spec(capacity=capacity)
+    else:
+        raise click.UsageError('either --spec or --capacity is required')
+    if capacity is not None:
+        pool_spec.capacity = capacity
+
+    if trace is not None:
+        queries = sim.load_trace(trace)
+    elif pool_spec.dbs:
+        queries = sim.synthesize_trace(pool_spec, random.Random(seed))
+    else:
+        raise click.UsageError(
+            'either --trace or a spec with a workload is required')
+
+    results = []
+    for name in pools or POOLS:
+        options: Dict[str, Any] = {}
+        if name == 'pool':
+            options['warm_standby'] = warm_standby
+        results.append((
+            name,
+            sim.simulate(
+                pool_spec, queries, POOLS[name],
+                seed=seed, pool_options=options),
+        ))
+
+    if as_json:
+        print(json.dumps({
+            name: {
+                'elapsed': result.elapsed,
+                **result.summary(),
+                **({'dbs': result.per_db()} if per_db else {}),
+            }
+            for name, result in results
+        }, indent=2))
+        return
+
+    summaries = [result.summary() for _, result in results]
+    print(f'{"":<16}' + ''.join(f'{name:>14}' for name, _ in results))
+    for key, title, scale in METRICS:
+        print(f'{title:<16}' + ''.join(
+            f'{_format(s[key], scale):>14}' for s in summaries))
+
+    if per_db:
+        for name, result in results:
+            print(f'\n{name}:')
+            print(f'{"database":<16}{"queries":>14}'
+                  f'{"wait p50 (ms)":>14}{"wait p99 (ms)":>14}')
+            for db, stats in result.per_db().items():
+                print(
+                    f'{db:<16}{stats["queries"]:>14}'
+                    f'{stats["wait_p50"] * 1000:>14.3f}'
+                    f'{stats["wait_p99"] * 1000:>14.3f}'
+                )
@@ -0,0 +1,350 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Deterministic simulation of the backend connection pool.
+
+The pool is driven by a workload of acquisitions on an event loop with a
+virtual clock: the clock jumps to the next scheduled callback whenever
+all tasks are waiting, instead of actually sleeping.  Simulating minutes
+of traffic takes seconds, and a workload always produces the same
+results for the same seed.
+
+A workload is either synthesized from a :class:`Spec` (per-database
+query rates and costs over time) or recorded: a list of :class:`Query`
+entries saying when a query to which database started and how long it
+held its connection.
+"""
+
+
+from __future__ import annotations
+from typing import *
+
+import asyncio
+import collections
+import contextlib
+import dataclasses
+import itertools
+import json
+import random
+import selectors
+import types
+
+from edb.common import taskgroup
+from edb.server.connpool import pool as pool_impl
+
+
+class SimulationError(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class DBSpec:
+    db: str
+    start_at: float
+    end_at: float
+    qps: float
+    query_cost_base: float
+    query_cost_var: float = 0.0
+
+
+@dataclasses.dataclass
+class Spec:
+    capacity: int
+    dbs: List[DBSpec] = dataclasses.field(default_factory=list)
+    conn_cost_base: float = 0.05
+    conn_cost_var: float = 0.01
+    disconn_cost_base: float = 0.006
+    disconn_cost_var: float = 0.0015
+    desc: str = ''
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> Spec:
+        data = dict(data)
+        dbs = [DBSpec(**db) for db in data.pop('dbs', ())]
+        return cls(dbs=dbs, **data)
+
+
+@dataclasses.dataclass(frozen=True)
+class Query:
+    at: float  # seconds since the start of the simulation
+    db: str
+    duration: float  # seconds the connection is held for
+
+
+def load_trace(lines: Iterable[str]) -> List[Query]:
+    """Load a recorded workload, one JSON-encoded Query per line."""
+    queries = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            queries.append(Query(**json.loads(line)))
+    queries.sort(key=lambda q: q.at)
+    return queries
+
+
+def _sample_cost(rng: random.Random, base: float, var: float) -> float:
+    return max(base + rng.triangular(-var, var), 0.001)
+
+
+def synthesize_trace(spec: Spec, rng: random.Random) -> List[Query]:
+    """Generate Poisson-distributed queries described by *spec*."""
+    queries = []
+    for db in spec.dbs:
+        if db.qps <= 0:
+            continue
+        at = db.start_at + rng.expovariate(db.qps)
+        while at < db.end_at:
+            queries.append(Query(
+                at=at,
+                db=db.db,
+                duration=_sample_cost(
+                    rng, db.query_cost_base, db.query_cost_var),
+            ))
+            at += rng.expovariate(db.qps)
+    queries.sort(key=lambda q: q.at)
+    return queries
+
+
+class FakeConnection:
+    def __init__(self, db: str):
+        self._locked = False
+        self._db = db
+
+    def lock(self, db):
+        if self._db != db:
+            raise RuntimeError('a connection for different DB')
+        if self._locked:
+            raise RuntimeError(
+                "attempting to use a connection that's already in use")
+        self._locked = True
+
+    def unlock(self, db):
+        if self._db != db:
+            raise RuntimeError('a connection for different DB')
+        if not self._locked:
+            raise RuntimeError(
+                "attempting to stop using a connection that wasn't used")
+        self._locked = False
+
+    def on_connect(self):
+        if self._locked:
+            raise RuntimeError(
+                "attempting to re-connect a connection "
+                "that's currently in use")
+
+    def on_disconnect(self):
+        if self._locked:
+            raise RuntimeError(
+                "attempting to disconnect a connection "
+                "that's currently in use")
+
+
+class _VirtualSelector(selectors.BaseSelector):
+    # Instead of waiting for I/O, advances the virtual clock by the
+    # timeout the event loop would wait for.
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self._map: Dict[int, selectors.SelectorKey] = {}
+
+    def register(self, fileobj, events, data=None):
+        fd = fileobj if isinstance(fileobj, int) else fileobj.fileno()
+        key = selectors.SelectorKey(fileobj, fd, events, data)
+        self._map[fd] = key
+        return key
+
+    def unregister(self, fileobj):
+        fd = fileobj if isinstance(fileobj, int) else fileobj.fileno()
+        return self._map.pop(fd)
+
+    def select(self, timeout=None):
+        if timeout is None:
+            raise SimulationError(
+                'simulation is stuck: all tasks are waiting, but nothing '
+                'is scheduled to wake them up')
+        self.now += timeout
+        return []
+
+    def get_map(self):
+        return types.MappingProxyType(self._map)
+
+
+class VirtualClockEventLoop(asyncio.SelectorEventLoop):
+
+    def __init__(self) -> None:
+        self._vselector = _VirtualSelector()
+        super().__init__(self._vselector)
+
+    def time(self) -> float:
+        return self._vselector.now
+
+
+@contextlib.contextmanager
+def _pool_clock(loop: asyncio.AbstractEventLoop) -> Iterator[None]:
+    # The pool reads time.monotonic() directly, make it see virtual time.
+    orig_time = pool_impl.time
+    pool_impl.time = types.SimpleNamespace(  # type: ignore
+        monotonic=loop.time)
+    try:
+        yield
+    finally:
+        pool_impl.time = orig_time  # type: ignore
+
+
+def _quantile(values: Sequence[float], q: float) -> float:
+    # *values* must be sorted.
+    if not values:
+        return 0.0
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def jain_index(values: Sequence[float]) -> float:
+    """Jain's fairness index: 1.0 if all values are equal, 1/n at worst."""
+    sq_sum = sum(v * v for v in values)
+    if not sq_sum:
+        return 1.0
+    return sum(values) ** 2 / (len(values) * sq_sum)
+
+
+@dataclasses.dataclass
+class Result:
+    pool_name: str
+    waits: Dict[str, List[float]] = dataclasses.field(
+        default_factory=lambda: collections.defaultdict(list))
+    elapsed: float = 0
+    busy_time: float = 0  # connection-seconds spent running queries
+    open_time: float = 0  # connection-seconds connections were open
+    connects: int = 0
+    disconnects: int = 0
+
+    def summary(self) -> Dict[str, float]:
+        waits = sorted(itertools.chain.from_iterable(self.waits.values()))
+        return {
+            'queries': len(waits),
+            'wait_p50': _quantile(waits, 0.5),
+            'wait_p99': _quantile(waits, 0.99),
+            'wait_max': waits[-1] if waits else 0.0,
+            # Fairness of the mean wait across databases.
+            'fairness': jain_index([
+                sum(w) / len(w) for w in self.waits.values() if w
+            ]),
+            'churn': self.connects + self.disconnects,
+            'utilization': (
+                self.busy_time / self.open_time if self.open_time else 0.0),
+        }
+
+    def per_db(self) -> Dict[str, Dict[str, float]]:
+        rv = {}
+        for db, waits in sorted(self.waits.items()):
+            waits = sorted(waits)
+            rv[db] = {
+                'queries': len(waits),
+                'wait_p50': _quantile(waits, 0.5),
+                'wait_p99': _quantile(waits, 0.99),
+            }
+        return rv
+
+
+async def _simulate(
+    spec: Spec,
+    queries: Sequence[Query],
+    pool_cls: Type[pool_impl.BasePool[FakeConnection]],
+    rng: random.Random,
+    pool_options: Mapping[str, Any],
+) -> Result:
+    loop = asyncio.get_running_loop()
+    result = Result(pool_name=pool_cls.__name__)
+    open_since: Dict[FakeConnection, float] = {}
+
+    async def connect(dbname: str) -> FakeConnection:
+        await asyncio.sleep(
+            _sample_cost(rng, spec.conn_cost_base, spec.conn_cost_var))
+        conn = FakeConnection(dbname)
+        conn.on_connect()
+        open_since[conn] = loop.time()
+        return conn
+
+    async def disconnect(conn: FakeConnection) -> None:
+        conn.on_disconnect()
+        result.open_time += loop.time() - open_since.pop(conn)
+        await asyncio.sleep(
+            _sample_cost(rng, spec.disconn_cost_base, spec.disconn_cost_var))
+        conn.on_disconnect()
+
+    pool = pool_cls(
+        connect=connect,
+        disconnect=disconnect,
+        max_capacity=spec.capacity,
+        **pool_options,
+    )
+
+    async def run_query(query: Query) -> None:
+        started_at = loop.time()
+        conn = await pool.acquire(query.db)  # type: ignore
+        result.waits[query.db].append(loop.time() - started_at)
+        conn.lock(query.db)
+        await asyncio.sleep(query.duration)
+        conn.unlock(query.db)
+        result.busy_time += query.duration
+        pool.release(query.db, conn)  # type: ignore
+
+    async with taskgroup.TaskGroup() as g:
+        for query in queries:
+            delay = query.at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            g.create_task(run_query(query))
+
+    result.elapsed = loop.time()
+    for since in open_since.values():
+        result.open_time += result.elapsed - since
+    result.connects = pool._successful_connects
+    result.disconnects = pool._successful_disconnects
+    return result
+
+
+def simulate(
+    spec: Spec,
+    queries: Sequence[Query],
+    pool_cls: Type[pool_impl.BasePool[FakeConnection]],
+    *,
+    seed: int = 0,
+    pool_options: Optional[Mapping[str, Any]] = None,
+) -> Result:
+    """Run *queries* against a new instance of *pool_cls*.
+
+    Connection costs are sampled from *spec* with a random generator
+    seeded with *seed*.
+    """
+    rng = random.Random(seed)
+    loop = VirtualClockEventLoop()
+    try:
+        with _pool_clock(loop):
+            try:
+                return loop.run_until_complete(_simulate(
+                    spec, queries, pool_cls, rng, pool_options or {}))
+            finally:
+                # Like asyncio.run(), cancel whatever the pool left running.
+                tasks = asyncio.all_tasks(loop)
+                for task in tasks:
+                    task.cancel()
+                if tasks:
+                    loop.run_until_complete(
+                        asyncio.gather(*tasks, return_exceptions=True))
+    finally:
+        loop.close()
@@ -86,8 +86,8 @@ def perfviz(
 ) -> None:
     """Aggregate raw profiling traces into textual and graphical formats.
 
-    Generates aggregate .prof and .singledispatch files, an aggregate textual
-    .pstats file, as well as two SVG flame graphs.
+    Generates aggregate .prof, .singledispatch and .counters files, an
+    aggregate textual .pstats file, as well as two SVG flame graphs.
 
     For more comprehensive documentation read edb/tools/profiling/README.md.
     """
@@ -52,6 +52,14 @@ STAT_SUFFIX = ".pstats"
 PROF_SUFFIX = ".prof"
 SVG_SUFFIX = ".svg"
 SINGLEDISPATCH_SUFFIX = ".singledispatch"
+COUNTERS_SUFFIX = ".counters"
+
+# Functions returning counters to report along with the profile, as
+# (module, function) pairs.  Counters of modules that the profiled
+# process never imported are skipped.
+COUNTER_SOURCES = [
+    ("edb.edgeql.compiler.context", "get_ref_cache_stats"),
+]
 
 
 T = TypeVar("T", bound=Callable[..., Any])
@@ -171,6 +179,10 @@ class profile:
         if done_dispatches:
             with open(self.dump_file + ".singledispatch", "wb") as sd_file:
                 pickle.dump(done_dispatches, sd_file, pickle.HIGHEST_PROTOCOL)
+        counters = collect_counters()
+        if counters:
+            with open(self.dump_file + COUNTERS_SUFFIX, "wb") as c_file:
+                pickle.dump(counters, c_file, pickle.HIGHEST_PROTOCOL)
 
     def aggregate(
         self,
@@ -236,6 +248,14 @@ class profile:
                     singledispatch_traces, sd_file, pickle.HIGHEST_PROTOCOL
                 )
 
+        counters = self.accumulate_counters()
+        if counters:
+            counters_path = out_path.with_suffix(COUNTERS_SUFFIX)
+            with counters_path.open("w") as c_file:
+                for name, value in sorted(counters.items()):
+                    c_file.write(f"{name}: {value}\n")
+                    print(f"{name}: {value}", file=sys.stderr)
+
         # Mypy is wrong below, `stats` is there on all pstats.Stats objects
         stats = ps.stats  # type: ignore
         filter_singledispatch_in_place(stats, singledispatch_traces)
@@ -255,6 +275,16 @@ class profile:
         )
         return success, failure
 
+    def accumulate_counters(self) -> Dict[str, int]:
+        result: Dict[str, int] = {}
+        d = self.dir.glob(self.prefix + "*" + self.suffix + COUNTERS_SUFFIX)
+        for f in d:
+            with open(str(f), "rb") as file:
+                counters = pickle.load(file)
+            for name, value in counters.items():
+                result[name] = result.get(name, 0) + value
+        return result
+
     def accumulate_singledispatch_traces(self) -> Dict[FunctionID, CallCounts]:
         result: Dict[FunctionID, CallCounts] = {}
         d = self.dir.glob(
@@ -272,6 +302,18 @@ class profile:
         return result
 
 
+def collect_counters() -> Dict[str, int]:
+    """Return the counters of COUNTER_SOURCES, prefixed by module name."""
+    result: Dict[str, int] = {}
+    for mod_name, func_name in COUNTER_SOURCES:
+        mod = sys.modules.get(mod_name)
+        if mod is None:
+            continue
+        for name, value in getattr(mod, func_name)().items():
+            result[f"{mod_name}.{name}"] = value
+    return result
+
+
 def profile_memory(func: Callable[[], Any]) -> MemoryFrame:
     """Profile memory and return a tree of statistics.
 
@@ -358,3 +358,63 @@ class TestPrometheusClient(unittest.TestCase):
         pmc_r = run_pmc()
         emc_r = run_emc()
         self.assertEqual(pmc_r, emc_r)
+
+    def test_prometheus_08(self):
+
+        def run_pmc():
+            registry = PMC.Registry()
+
+            test_hist = PMC.Histogram(
+                'test_labeled_hist_seconds', 'A  test info',
+                labelnames=['h1', 'h2'], buckets=[0.1, 0.5, 1.0],
+                registry=registry)
+
+            r1 = PMC.generate(registry)
+
+            test_hist.labels('blah', 'spam').observe(0.22)
+            test_hist.labels('blah', 'spam').observe(0.05)
+
+            r2 = PMC.generate(registry)
+
+            test_hist.labels('blah', 'ha"\nm').observe(2.0)
+            test_hist.labels('blah', 'spam').observe(0.7)
+
+            r3 = PMC.generate(registry)
+
+            return [r1, r2, r3]
+
+        def run_emc():
+            r = EP.Registry()
+
+            test_hist = r.new_labeled_histogram(
+                'test_labeled_hist', 'A  test info',
+                unit=prom.Unit.SECONDS,
+                buckets=[0.1, 0.5, 1.0],
+                labels=('h1', 'h2'),
+            )
+
+            r1 = r.generate()
+
+            test_hist.observe(0.22, 'blah', 'spam')
+            test_hist.observe(0.05, 'blah', 'spam')
+
+            r2 = r.generate()
+
+            test_hist.observe(2.0, 'blah', 'ha"\nm')
+            test_hist.observe(0.7, 'blah', 'spam')
+
+            r3 = r.generate()
+
+            return [r1, r2, r3]
+
+        pmc_r = run_pmc()
+        emc_r = run_emc()
+        self.assertEqual(pmc_r, emc_r)
+
+        r = EP.Registry()
+        test_hist = r.new_labeled_histogram(
+            'test_labeled_hist', 'A  test info',
+            labels=('h1',),
+        )
+        with self.assertRaisesRegex(ValueError, 'missing values'):
+            test_hist.observe(1.0)
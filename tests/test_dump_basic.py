@@ -21,6 +21,8 @@ import os
 import random
 import tempfile
 
+import edgedb
+
 from edb.testbase import server as tb
 
 
@@ -118,3 +120,124 @@ class TestDumpBasics(tb.DatabaseTestCase, tb.CLITestCaseMixin):
         finally:
             await con2.aclose()
             await self.con.execute(f'DROP DATABASE {restored_dbname}')
+
+    async def test_dump_empty_01(self):
+        if not self.has_create_database:
+            self.skipTest('create database is not supported by the backend')
+
+        # A database without any user data has no blocks to dump.
+        dbname = f'{self.get_database_name()}_empty'
+        restored_dbname = f'{dbname}_restored'
+
+        await self.con.execute(f'CREATE DATABASE {dbname}')
+        try:
+            with tempfile.NamedTemporaryFile() as f:
+                self.run_cli('-d', dbname, 'dump', f.name)
+
+                await self.con.execute(f'CREATE DATABASE {restored_dbname}')
+                try:
+                    self.run_cli('-d', restored_dbname, 'restore', f.name)
+                finally:
+                    await self.con.execute(
+                        f'DROP DATABASE {restored_dbname}')
+        finally:
+            await self.con.execute(f'DROP DATABASE {dbname}')
+
+    async def test_dump_jobs_01(self):
+        # A server with several dump jobs dumps the tables over several
+        # backend connections that share one snapshot.
+        async with tb.start_edgedb_server(dump_jobs=4) as sd:
+            con = await sd.connect()
+            try:
+                await con.execute('CREATE DATABASE dumpjobs')
+                await con.execute('CREATE DATABASE dumpjobs_restored')
+            finally:
+                await con.aclose()
+
+            con = await sd.connect(database='dumpjobs')
+            try:
+                for name in ('A', 'B', 'C', 'D', 'E'):
+                    await con.execute(f'''
+                        CREATE TYPE default::{name} {{
+                            CREATE REQUIRED PROPERTY n -> std::int64;
+                        }};
+                        FOR x IN {{std::range_unpack(range(0, 1000))}}
+                        UNION (INSERT default::{name} {{ n := x }});
+                    ''')
+            finally:
+                await con.aclose()
+
+            with tempfile.NamedTemporaryFile() as f:
+                self.run_cli_on_connection(
+                    sd.get_connect_args(), '-d', 'dumpjobs', 'dump', f.name)
+                self.run_cli_on_connection(
+                    sd.get_connect_args(),
+                    '-d', 'dumpjobs_restored', 'restore', f.name)
+
+            con = await sd.connect(database='dumpjobs_restored')
+            try:
+                for name in ('A', 'B', 'C', 'D', 'E'):
+                    self.assertEqual(
+                        await con.query_single(f'''
+                            SELECT (count(default::{name}),
+                                    sum(default::{name}.n))
+                        '''),
+                        (1000, 499500),
+                    )
+            finally:
+                await con.aclose()
+
+    async def test_dump_exclusive_01(self):
+        if not self.has_create_database:
+            self.skipTest('create database is not supported by the backend')
+
+        # The indexes backing exclusive constraints are kept while the
+        # data is restored, unlike the other secondary indexes.
+        dbname = f'{self.get_database_name()}_excl'
+        restored_dbname = f'{dbname}_restored'
+
+        await self.con.execute(f'CREATE DATABASE {dbname}')
+        try:
+            con = await self.connect(database=dbname)
+            try:
+                await con.execute('''
+                    CREATE TYPE default::Named {
+                        CREATE REQUIRED PROPERTY name -> std::str {
+                            CREATE CONSTRAINT std::exclusive;
+                        };
+                        CREATE INDEX ON (.name);
+                    };
+                    FOR x IN {'a', 'b', 'c'} UNION (
+                        INSERT default::Named { name := x }
+                    );
+                ''')
+            finally:
+                await con.aclose()
+
+            with tempfile.NamedTemporaryFile() as f:
+                self.run_cli('-d', dbname, 'dump', f.name)
+
+                await self.con.execute(f'CREATE DATABASE {restored_dbname}')
+                try:
+                    self.run_cli('-d', restored_dbname, 'restore', f.name)
+                    con2 = await self.connect(database=restored_dbname)
+                    try:
+                        self.assertEqual(
+                            await con2.query('''
+                                WITH N := default::Named
+                                SELECT N.name ORDER BY N.name
+                            '''),
+                            ['a', 'b', 'c'],
+                        )
+                        with self.assertRaises(
+                            edgedb.ConstraintViolationError
+                        ):
+                            await con2.execute(
+                                "INSERT default::Named { name := 'a' }")
+                    finally:
+                        await con2.aclose()
+                finally:
+                    await self.con.execute(
+                        f'DROP DATABASE {restored_dbname}')
+        finally:
+            await self.con.execute(f'DROP DATABASE {dbname}')
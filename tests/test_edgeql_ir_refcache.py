@@ -0,0 +1,88 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import os.path
+
+from edb.testbase import lang as tb
+
+from edb.edgeql import compiler
+from edb.edgeql import parser as qlparser
+from edb.edgeql.compiler import context as qlcontext
+from edb.ir import typeutils as irtyputils
+from edb.schema import name as s_name
+
+
+class TestEdgeQLIRRefCache(tb.BaseEdgeQLCompilerTest):
+    """Unit tests for the persistent TypeRef and PointerRef caches."""
+
+    SCHEMA = os.path.join(os.path.dirname(__file__), 'schemas',
+                          'cards.esdl')
+
+    def compile(self, source):
+        return compiler.compile_ast_to_ir(
+            qlparser.parse(source),
+            self.schema,
+            options=compiler.CompilerOptions(
+                modaliases={None: 'default'},
+                persistent_ref_cache=True,
+            ),
+        )
+
+    def test_edgeql_ir_refcache_hits_01(self):
+        query = 'SELECT User { name, deck: { name, @count } }'
+        self.compile(query)
+        before = qlcontext.get_ref_cache_stats()
+        self.compile(query)
+        after = qlcontext.get_ref_cache_stats()
+
+        for counter in ('typeref_hits', 'ptrref_hits'):
+            self.assertGreater(
+                after.get(counter, 0), before.get(counter, 0), counter)
+
+    def test_edgeql_ir_refcache_copies_01(self):
+        persistent = qlcontext.get_persistent_ref_cache(self.schema)
+        user = self.schema.get('default::User')
+        deck = user.getptr(self.schema, s_name.UnqualName('deck'))
+
+        refs = [
+            irtyputils.ptrref_from_ptrcls(
+                schema=self.schema,
+                ptrcls=deck,
+                cache=qlcontext.PointerRefCache(persistent),
+                typeref_cache=qlcontext.TypeRefCache(persistent),
+            )
+            for _ in range(2)
+        ]
+
+        # Every compilation gets its own copy of a pointer ref,
+        # changing it must not affect other compilations.
+        self.assertIsNot(refs[0], refs[1])
+        self.assertEqual(refs[0].name, refs[1].name)
+        refs[0].is_computable = True
+        self.assertFalse(refs[1].is_computable)
+
+    def test_edgeql_ir_refcache_discard_01(self):
+        persistent = qlcontext.get_persistent_ref_cache(self.schema)
+        self.assertIs(
+            qlcontext.get_persistent_ref_cache(self.schema), persistent)
+
+        # The cache of a superseded schema is dropped right away.
+        qlcontext.discard_persistent_ref_caches(self.schema)
+        self.assertIsNot(
+            qlcontext.get_persistent_ref_cache(self.schema), persistent)
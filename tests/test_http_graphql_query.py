@@ -17,6 +17,7 @@
 #
 
 
+import hashlib
 import json
 import os
 import uuid
@@ -130,6 +131,60 @@ class TestGraphQLFunctional(tb.GraphQLTestCase):
             with self.assertRaises(OSError):
                 self.http_con_request(con, {}, path='non-existant')
 
+    def test_graphql_http_persisted_query_01(self):
+        query = r"""
+            query {
+                Setting(order: {value: {dir: ASC}}) {
+                    value
+                }
+            }
+        """
+        extensions = json.dumps({
+            'persistedQuery': {
+                'version': 1,
+                'sha256Hash': hashlib.sha256(query.encode()).hexdigest(),
+            },
+        })
+
+        with self.http_con() as con:
+            data, _, status = self.http_con_request(
+                con, {'extensions': extensions})
+            self.assertEqual(status, 200)
+            [error] = json.loads(data)['errors']
+            self.assertEqual(error['message'], 'PersistedQueryNotFound')
+            self.assertEqual(
+                error['extensions'], {'code': 'PERSISTED_QUERY_NOT_FOUND'})
+
+            # Registers the query.
+            data, _, status = self.http_con_request(
+                con, {'query': query, 'extensions': extensions})
+            self.assertEqual(status, 200)
+            expected = {'Setting': [{'value': 'blue'}, {'value': 'full'},
+                                    {'value': 'none'}]}
+            self.assertEqual(json.loads(data)['data'], expected)
+
+            for _ in range(3):
+                data, _, status = self.http_con_request(
+                    con, {'extensions': extensions})
+                self.assertEqual(status, 200)
+                self.assertEqual(json.loads(data)['data'], expected)
+
+    def test_graphql_http_persisted_query_02(self):
+        with self.http_con() as con:
+            data, headers, status = self.http_con_request(con, {
+                'query': '{ Setting { value } }',
+                'extensions': json.dumps({
+                    'persistedQuery': {
+                        'version': 1,
+                        'sha256Hash': hashlib.sha256(b'blah').hexdigest(),
+                    },
+                }),
+            })
+
+            self.assertEqual(status, 400)
+            self.assertEqual(headers['connection'], 'close')
+            self.assertIn(b'does not match the query', data)
+
     def test_graphql_functional_query_01(self):
         for _ in range(10):  # repeat to test prepared pgcon statements
             self.assert_graphql_query_result(r"""
@@ -31,7 +31,7 @@ from edb.testbase.protocol.test import ProtocolTestCase
 
 class TestProtocol(ProtocolTestCase):
 
-    async def _execute(self, command_text, sync=True, data=False, cc=None):
+    def _make_execute(self, command_text, data=False, cc=None):
         exec_args = dict(
             annotations=[],
             allowed_capabilities=protocol.Capability.ALL,
@@ -51,8 +51,10 @@ class TestProtocol(ProtocolTestCase):
             exec_args['state_data'] = cc.state_data
         if data:
             exec_args['output_format'] = protocol.OutputFormat.BINARY
+        return protocol.Execute(**exec_args)
 
-        args = (protocol.Execute(**exec_args),)
+    async def _execute(self, command_text, sync=True, data=False, cc=None):
+        args = (self._make_execute(command_text, data=data, cc=cc),)
         if sync:
             args += (protocol.Sync(),)
         await self.con.send(*args)
@@ -394,6 +396,75 @@ class TestProtocol(ProtocolTestCase):
 
         self.assertNotEqual(cdd1.output_typedesc_id, cdd2.output_typedesc_id)
 
+    async def test_proto_pipeline_01(self):
+        # Consecutive read-only Execute messages without a Sync in
+        # between are sent to the backend at once.
+        await self.con.connect()
+
+        await self.con.send(
+            self._make_execute('SELECT 1'),
+            self._make_execute('SELECT 2'),
+            self._make_execute('SELECT 1'),
+            self._make_execute('SELECT 3'),
+            protocol.Sync(),
+        )
+        for _ in range(4):
+            await self.con.recv_match(
+                protocol.CommandComplete,
+                status='SELECT'
+            )
+        await self.con.recv_match(
+            protocol.ReadyForCommand,
+            transaction_state=protocol.TransactionState.NOT_IN_TRANSACTION,
+        )
+
+    async def test_proto_pipeline_02(self):
+        # A query failing in the middle of a pipeline makes the backend
+        # skip the rest of it, which must not lose the Close of a
+        # statement prepared for an older schema.
+        await self.con.connect()
+
+        await self._execute('SELECT 2')
+        await self.con.recv_match(
+            protocol.CommandComplete,
+            status='SELECT'
+        )
+        await self.con.recv_match(protocol.ReadyForCommand)
+
+        await self._execute('CREATE TYPE PipelineTest')
+        await self.con.recv_match(
+            protocol.CommandComplete,
+            status='CREATE TYPE'
+        )
+        await self.con.recv_match(protocol.ReadyForCommand)
+
+        await self.con.send(
+            self._make_execute('SELECT 1/0'),
+            self._make_execute('SELECT 2'),
+            protocol.Sync(),
+        )
+        await self.con.recv_match(
+            protocol.ErrorResponse,
+            message='division by zero'
+        )
+        await self.con.recv_match(
+            protocol.ReadyForCommand,
+            transaction_state=protocol.TransactionState.NOT_IN_TRANSACTION,
+        )
+
+        # The statement is prepared anew.
+        for _ in range(2):
+            await self._execute('SELECT 2')
+            await self.con.recv_match(
+                protocol.CommandComplete,
+                status='SELECT'
+            )
+            await self.con.recv_match(
+                protocol.ReadyForCommand,
+                transaction_state=(
+                    protocol.TransactionState.NOT_IN_TRANSACTION),
+            )
+
 
 class TestServerCancellation(tb.TestCase):
     @contextlib.asynccontextmanager
@@ -20,7 +20,9 @@
 from __future__ import annotations
 from typing import *
 
+import pickle
 import re
+import unittest.mock
 
 from edb import errors
 
@@ -31,16 +33,18 @@ from edb.edgeql import parser as qlparser
 from edb.edgeql import qltypes
 
 from edb.schema import ddl as s_ddl
+from edb.schema import delta as s_delta
 from edb.schema import links as s_links
 from edb.schema import name as s_name
 from edb.schema import objtypes as s_objtypes
+from edb.schema import scalars as s_scalars
+from edb.schema import schema as s_schema
+
+from edb.server.compiler import dependencies
 
 from edb.testbase import lang as tb
 from edb.tools import test
 
-if TYPE_CHECKING:
-    from edb.schema import schema as s_schema
-
 
 class TestSchema(tb.BaseSchemaLoadTest):
     DEFAULT_MODULE = 'test'
@@ -1982,6 +1986,190 @@ class TestSchema(tb.BaseSchemaLoadTest):
             }
         """
 
+    def test_schema_query_deps_01(self):
+        schema = self.load_schema('''
+            type Object1 {
+                property foo -> str;
+            };
+            type Object2 extending Object1;
+            type Unrelated;
+            function fn(x: str) -> str using (x);
+        ''')
+
+        def deps(query):
+            ir = qlcompiler.compile_ast_to_ir(
+                qlparser.parse(query, {None: 'test'}),
+                schema,
+                options=qlcompiler.CompilerOptions(
+                    modaliases={None: 'test'},
+                ),
+            )
+            return dependencies.get_query_deps(ir.schema, ir.schema_refs)
+
+        def affected(ddl):
+            new_schema = self.run_ddl(schema, ddl)
+            return dependencies.get_affected_deps(schema, new_schema)
+
+        obj1 = deps('SELECT Object1 { foo }')
+        unrelated = deps('SELECT Unrelated')
+        func = deps('SELECT fn(<str>$0)')
+        length = deps('SELECT len(<str>$0)')
+
+        changes = affected('CREATE TYPE test::Object5;')
+        self.assertTrue(obj1.isdisjoint(changes))
+        self.assertTrue(unrelated.isdisjoint(changes))
+        self.assertTrue(func.isdisjoint(changes))
+        self.assertTrue(length.isdisjoint(changes))
+
+        # A new subtype changes what a query on the base type returns.
+        changes = affected('''
+            CREATE TYPE test::Object3 EXTENDING test::Object1;
+        ''')
+        self.assertFalse(obj1.isdisjoint(changes))
+        self.assertTrue(unrelated.isdisjoint(changes))
+
+        changes = affected('''
+            ALTER TYPE test::Unrelated CREATE PROPERTY bar -> str;
+        ''')
+        self.assertTrue(obj1.isdisjoint(changes))
+        self.assertFalse(unrelated.isdisjoint(changes))
+
+        changes = affected('''
+            ALTER TYPE test::Object1 {
+                ALTER PROPERTY foo CREATE CONSTRAINT exclusive;
+            };
+        ''')
+        self.assertFalse(obj1.isdisjoint(changes))
+        self.assertTrue(unrelated.isdisjoint(changes))
+
+        changes = affected('''
+            ALTER FUNCTION test::fn(x: str) USING (x ++ x);
+        ''')
+        self.assertFalse(func.isdisjoint(changes))
+        self.assertTrue(obj1.isdisjoint(changes))
+
+        # New objects may shadow or overload the ones a query uses.
+        changes = affected('''
+            CREATE FUNCTION test::len(x: str) -> int64 using (0);
+        ''')
+        self.assertFalse(length.isdisjoint(changes))
+        self.assertTrue(func.isdisjoint(changes))
+
+        changes = affected('''
+            CREATE FUNCTION test::fn(x: int64) -> str using (<str>x);
+        ''')
+        self.assertFalse(func.isdisjoint(changes))
+        self.assertTrue(length.isdisjoint(changes))
+
+    def test_schema_delta_01(self):
+        schema = self.load_schema('''
+            type Object1 {
+                property foo -> str;
+            };
+            type Object2;
+        ''')
+
+        new_schema = self.run_ddl(schema, '''
+            ALTER TYPE test::Object1 CREATE PROPERTY bar -> int64;
+            DROP TYPE test::Object2;
+            CREATE TYPE test::Object3 EXTENDING test::Object1;
+        ''')
+
+        delta = pickle.loads(pickle.dumps(new_schema.get_delta(schema)))
+        base = pickle.loads(pickle.dumps(schema))
+        patched = base.apply_delta(delta)
+
+        self.assertEqual(patched.get_changed_ids(new_schema), set())
+        # The indexes are rebuilt from the changes to the other maps.
+        self.assertEqual(patched._type_to_ids, new_schema._type_to_ids)
+        self.assertEqual(patched._module_to_ids, new_schema._module_to_ids)
+        self.assertIsNotNone(
+            patched.get('test::Object3', type=s_objtypes.ObjectType))
+        self.assertIsNone(patched.get('test::Object2', None))
+
+        # The delta only applies to the schema it was computed against.
+        with self.assertRaisesRegex(errors.SchemaError, 'delta base'):
+            new_schema.apply_delta(delta)
+
+        # Even to another version of it with maps of the same sizes.
+        altered = self.run_ddl(schema, '''
+            ALTER TYPE test::Object2 SET ABSTRACT;
+        ''')
+        self.assertEqual(altered._get_map_sizes(), schema._get_map_sizes())
+        with self.assertRaisesRegex(errors.SchemaError, 'delta base'):
+            altered.apply_delta(delta)
+
+        # The patched schema is a copy of the version it was taken from.
+        self.assertEqual(
+            patched.get_version_id(), new_schema.get_version_id())
+
+        # So are unpickled ones.
+        copy = pickle.loads(pickle.dumps(altered))
+        self.assertEqual(copy.get_version_id(), altered.get_version_id())
+
+    def test_schema_objects_index_01(self):
+        schema = self.load_schema('''
+            type Object1 {
+                property foo -> str;
+            };
+            type Object2;
+            scalar type Scalar1 extending str;
+        ''')
+
+        schema = self.run_ddl(schema, '''
+            CREATE MODULE other;
+            ALTER TYPE test::Object1 RENAME TO other::Object1;
+            DROP TYPE test::Object2;
+            CREATE TYPE other::Object3;
+        ''')
+
+        def names(**kwargs):
+            return {
+                str(obj.get_name(schema))
+                for obj in schema.get_objects(**kwargs)
+            }
+
+        def scan(**kwargs):
+            # What get_objects() returns when the indexes are not used.
+            return {
+                str(obj.get_name(schema))
+                for obj in s_schema.SchemaIterator(
+                    schema,
+                    schema._id_to_type,
+                    included_modules=kwargs.get('included_modules'),
+                    excluded_modules=None,
+                    type=kwargs.get('type'),
+                )
+            }
+
+        queries = [
+            dict(type=s_objtypes.ObjectType),
+            dict(type=s_scalars.ScalarType),
+            dict(included_modules=[s_name.UnqualName('test')]),
+            dict(included_modules=[s_name.UnqualName('other')]),
+            dict(
+                type=s_objtypes.ObjectType,
+                included_modules=[s_name.UnqualName('other')],
+            ),
+        ]
+        for query in queries:
+            self.assertEqual(names(**query), scan(**query), query)
+
+        self.assertEqual(
+            names(
+                type=s_objtypes.ObjectType,
+                included_modules=[s_name.UnqualName('other')],
+            ),
+            {'other::Object1', 'other::Object3'},
+        )
+        self.assertEqual(
+            names(
+                type=s_objtypes.ObjectType,
+                included_modules=[s_name.UnqualName('test')],
+            ),
+            set(),
+        )
+
 
 class TestGetMigration(tb.BaseSchemaLoadTest):
     """Test migration deparse consistency.
@@ -6611,6 +6799,63 @@ class TestGetMigration(tb.BaseSchemaLoadTest):
             }
         """])
 
+    def test_schema_migrations_equivalence_rename_pruned_01(self):
+        # Only compare rename candidates, however small the diff.
+        with unittest.mock.patch.object(
+            s_delta, 'PRUNE_COMPARISONS_ABOVE', 0
+        ):
+            self._assert_migration_equivalence([r"""
+                type Foo;
+                type Note {
+                    required property remark -> str;
+                    link a -> Foo;
+                };
+            """, r"""
+                type Bar;
+                type Note {
+                    required property note -> str;
+                    link a -> Bar;
+                };
+            """])
+
+    def test_schema_migrations_rename_pruned_02(self):
+        # Enough changed sibling types to make their shared bases
+        # useless for finding rename candidates.
+        def siblings(extra):
+            return '\n'.join(
+                f'type S{i} {{ property s{i} -> str; {extra} }};'
+                for i in range(20)
+            )
+
+        def migrate(schema, sdl):
+            return self.run_ddl(schema, f'''
+                START MIGRATION TO {{
+                    module default {{
+                        {sdl}
+                    }}
+                }};
+                POPULATE MIGRATION;
+                COMMIT MIGRATION;
+            ''')
+
+        with unittest.mock.patch.object(
+            s_delta, 'PRUNE_COMPARISONS_ABOVE', 0
+        ):
+            schema = migrate(self.schema, siblings('') + r"""
+                type T0 {
+                    property note -> str;
+                };
+            """)
+            schema = migrate(schema, siblings('property t -> str;') + r"""
+                type R0 {
+                    property note -> str;
+                };
+            """)
+
+        migration = schema.get_last_migration()
+        self.assertIn(
+            'RENAME TO default::R0', migration.get_script(schema))
+
     def test_schema_migrations_equivalence_rename_type_02(self):
         self._assert_migration_equivalence([r"""
             type Note {
@@ -26,13 +26,20 @@ import sys
 import tempfile
 import time
 
+import immutables
+
 from edb import edgeql
+from edb import errors
+from edb.schema import schema as s_schema
 from edb.testbase import lang as tb
 from edb.testbase import server as tbs
 from edb.server import args as edbargs
 from edb.server import compiler as edbcompiler
+from edb.server.compiler import dbstate
 from edb.server.compiler_pool import amsg
 from edb.server.compiler_pool import pool
+from edb.server.compiler_pool import queue
+from edb.server.compiler_pool import wire
 from edb.server.dbview import dbview
 
 
@@ -166,6 +173,43 @@ class TestAmsg(tbs.TestCase):
             with self.assertRaises(OSError):
                 os.kill(pid, 0)
 
+    async def test_server_compiler_pool_wire_format(self):
+        async with self.compiler_pool(1) as (server, proto, proc, sn):
+            pid = await asyncio.wait_for(proto.connected.get(), 10)
+            conn = server.get_by_pid(pid)
+
+            # Plain pickle requests get plain pickle responses
+            await self.check_pid(pid, server)
+
+            blob = os.urandom(wire.OUT_OF_BAND_THRESHOLD * 4)
+            chunks = wire.encode_request('not_exist', (blob, b'x'))
+            self.assertIn(blob, [bytes(c) for c in chunks])
+            resp = await conn.request(*chunks)
+            self.assertTrue(wire.is_encoded(resp))
+            status, *data = wire.decode(resp)
+            self.assertEqual(status, 1)
+            self.assertIsInstance(data[0], RuntimeError)
+
+    def test_server_compiler_wire_roundtrip(self):
+        blob = os.urandom(wire.OUT_OF_BAND_THRESHOLD)
+        for data in [(0, (blob, b'small', None)), (1, ValueError(), 'tb')]:
+            msg = b''.join(wire.encode_response(data))
+            self.assertTrue(wire.is_encoded(msg))
+            decoded = wire.decode(msg)
+            self.assertEqual(decoded[0], data[0])
+            if data[0] == 0:
+                self.assertEqual(
+                    [bytes(v) if v is not None else v for v in decoded[1]],
+                    list(data[1]))
+
+        method, args = wire.decode(
+            b''.join(wire.encode_request('compile', ('db', blob))))
+        self.assertEqual(method, 'compile')
+        self.assertEqual(bytes(args[1]), blob)
+
+        with self.assertRaisesRegex(ValueError, 'version'):
+            wire.decode(wire.MAGIC + b'\xff' + b'\0' * 10)
+
     async def test_server_compiler_pool_template_proc_exit(self):
         async with self.compiler_pool(2) as (server, proto, proc, sn):
             # Make sure both compiler workers are up and ready
@@ -254,6 +298,52 @@ class TestAmsg(tbs.TestCase):
                     os.kill(pid, 0)
 
 
+class TestWorkerQueue(tbs.TestCase):
+
+    async def test_server_compiler_queue_scheduling(self):
+        RC = queue.RequestClass
+        q = queue.WorkerQueue(self.loop)
+        q.release('w1')
+        q.release('w2')
+
+        ddl_w = await q.acquire(request_class=RC.DDL, dbname='a')
+        w = await q.acquire(request_class=RC.Interactive, dbname='a')
+
+        order = []
+
+        async def acquire(request_class, dbname):
+            rv = await q.acquire(request_class=request_class, dbname=dbname)
+            order.append((request_class, dbname))
+            return rv
+
+        ddl = self.loop.create_task(acquire(RC.DDL, 'a'))
+        query_a = self.loop.create_task(acquire(RC.Interactive, 'a'))
+        query_b = self.loop.create_task(acquire(RC.Interactive, 'b'))
+        await asyncio.sleep(0)
+        self.assertEqual(q.count_waiters(), 3)
+
+        # Interactive queries go before DDL, and database "b" that
+        # has no workers yet goes before "a".
+        q.release(w)
+        await asyncio.sleep(0)
+        self.assertEqual(order, [(RC.Interactive, 'b')])
+
+        q.release(query_b.result())
+        await asyncio.sleep(0)
+        self.assertEqual(order[-1], (RC.Interactive, 'a'))
+
+        # DDL may only occupy half of the workers.
+        q.release(query_a.result())
+        await asyncio.sleep(0)
+        self.assertFalse(ddl.done())
+        self.assertEqual(q.qsize(), 1)
+
+        q.release(ddl_w)
+        await asyncio.sleep(0)
+        self.assertTrue(ddl.done())
+        self.assertEqual(q.count_waiters(), 0)
+
+
 class TestServerCompilerPool(tbs.TestCase):
     def _wait_pids(self, *pids, timeout=1):
         remaining = list(pids)
@@ -421,3 +511,178 @@ class TestCompilerPool(tbs.TestCase):
                 ) for _ in range(4)))
             finally:
                 await pool_.stop()
+
+    async def test_server_compiler_pool_snapshot(self):
+        with tempfile.TemporaryDirectory() as td:
+            pool_ = await pool.create_compiler_pool(
+                runstate_dir=td,
+                pool_size=2,
+                dbindex=dbview.DatabaseIndex(
+                    None,
+                    std_schema=self._std_schema,
+                    global_schema=None,
+                    sys_config={},
+                ),
+                backend_runtime_params=None,
+                std_schema=self._std_schema,
+                refl_schema=self._refl_schema,
+                schema_class_layout=self._schema_class_layout,
+            )
+            snapshot = os.path.join(td, 'compiler-snapshot')
+            try:
+                self.assertTrue(os.path.exists(snapshot))
+
+                # Workers respawned by the template process are
+                # initialized from the snapshot too.
+                w1 = await pool_._acquire_worker()
+                pool_._release_worker(w1)
+                pool_._ready_evt.clear()
+                # Whatever the current state of the databases is, the
+                # respawned worker has the one of the snapshot.
+                pool_._get_init_args.cache_clear()
+                os.kill(w1.get_pid(), signal.SIGTERM)
+                await asyncio.wait_for(pool_._ready_evt.wait(), 10)
+
+                snapshot_dbs = pool_._snapshot_init_args[0]
+                for worker in pool_._workers.values():
+                    self.assertIs(worker._dbs, snapshot_dbs)
+
+                context = edbcompiler.new_compiler_context(
+                    user_schema=self._std_schema,
+                    modaliases={None: 'default'},
+                )
+                await asyncio.gather(*(pool_.compile_in_tx(
+                    context.state.current_tx().id,
+                    pickle.dumps(context.state),
+                    0,
+                    edgeql.Source.from_string('SELECT 123'),
+                    edbcompiler.OutputFormat.BINARY,
+                    False, 101, False, True, False, (0, 12), True
+                ) for _ in range(2)))
+            finally:
+                await pool_.stop()
+
+            self.assertFalse(os.path.exists(snapshot))
+
+    async def test_server_compiler_pool_compile_timings(self):
+        with tempfile.TemporaryDirectory() as td:
+            pool_ = await pool.create_compiler_pool(
+                runstate_dir=td,
+                pool_size=1,
+                dbindex=dbview.DatabaseIndex(
+                    None,
+                    std_schema=self._std_schema,
+                    global_schema=None,
+                    sys_config={},
+                ),
+                backend_runtime_params=None,
+                std_schema=self._std_schema,
+                refl_schema=self._refl_schema,
+                schema_class_layout=self._schema_class_layout,
+                slow_compile_log_threshold=0,
+            )
+            try:
+                context = edbcompiler.new_compiler_context(
+                    user_schema=self._std_schema,
+                    modaliases={None: 'default'},
+                )
+                with self.assertLogs('edb.server', 'WARNING') as logs:
+                    units, _, _ = await pool_.compile_in_tx(
+                        context.state.current_tx().id,
+                        pickle.dumps(context.state),
+                        0,
+                        edgeql.Source.from_string('SELECT 123'),
+                        edbcompiler.OutputFormat.BINARY,
+                        False, 101, False, True, False, (0, 12), True
+                    )
+            finally:
+                await pool_.stop()
+
+        # The timings are reported by the pool, not cached.
+        self.assertIsNone(units.compile_timings)
+        [message] = [
+            msg for msg in logs.output if 'slow compilation' in msg]
+        for phase in ('parse', 'ir', 'sql_tree', 'codegen', 'describe',
+                      'pickle'):
+            self.assertIn(f'{phase}: ', message)
+        self.assertIn('SELECT 123', message)
+
+    async def test_server_compiler_pool_build_graphql_schema(self):
+        with tempfile.TemporaryDirectory() as td:
+            pool_ = await pool.create_compiler_pool(
+                runstate_dir=td,
+                pool_size=2,
+                dbindex=dbview.DatabaseIndex(
+                    None,
+                    std_schema=self._std_schema,
+                    global_schema=None,
+                    sys_config={},
+                ),
+                backend_runtime_params=None,
+                std_schema=self._std_schema,
+                refl_schema=self._refl_schema,
+                schema_class_layout=self._schema_class_layout,
+            )
+            state_args = (
+                'db',
+                s_schema.FlatSchema(),
+                s_schema.FlatSchema(),
+                immutables.Map(),
+                immutables.Map(),
+                immutables.Map(),
+            )
+            try:
+                await pool_.build_graphql_schema(*state_args)
+
+                # Every worker has the schema built already.
+                for _ in range(2):
+                    worker = await pool_._acquire_worker()
+                    try:
+                        build_duration = await pool_._call_with_state(
+                            worker, 'build_graphql_schema', *state_args)
+                    finally:
+                        pool_._release_worker(worker, put_in_front=False)
+                    self.assertIsNone(build_duration)
+            finally:
+                await pool_.stop()
+
+    async def test_server_compiler_pool_compile_batch(self):
+        with tempfile.TemporaryDirectory() as td:
+            pool_ = await pool.create_compiler_pool(
+                runstate_dir=td,
+                pool_size=1,
+                dbindex=dbview.DatabaseIndex(
+                    None,
+                    std_schema=self._std_schema,
+                    global_schema=None,
+                    sys_config={},
+                ),
+                backend_runtime_params=None,
+                std_schema=self._std_schema,
+                refl_schema=self._refl_schema,
+                schema_class_layout=self._schema_class_layout,
+            )
+            try:
+                results = await pool_.compile_batch(
+                    'db',
+                    s_schema.FlatSchema(),
+                    s_schema.FlatSchema(),
+                    immutables.Map(),
+                    immutables.Map(),
+                    immutables.Map(),
+                    [
+                        edgeql.Source.from_string('SELECT 1'),
+                        edgeql.Source.from_string('SELECT nonexistent'),
+                        edgeql.Source.from_string('SELECT "a"'),
+                    ],
+                    immutables.Map({None: 'default'}),
+                    immutables.Map(),
+                    edbcompiler.OutputFormat.BINARY,
+                    False, 0, False, False, False, (1, 0), True, False,
+                )
+                self.assertEqual(len(results), 3)
+                self.assertIsInstance(results[0], dbstate.QueryUnitGroup)
+                self.assertIsInstance(results[1], errors.InvalidReferenceError)
+                self.assertIsInstance(results[2], dbstate.QueryUnitGroup)
+            finally:
+                await pool_.stop()
@@ -55,6 +55,7 @@ import unittest.mock
 from edb.common import taskgroup
 from edb.server import connpool
 from edb.server.connpool import pool as pool_impl
+from edb.tools.poolsim import sim as poolsim
 
 # TIME_SCALE is used to run the simulation for longer time, the default is 1x.
 TIME_SCALE = int(os.environ.get("TIME_SCALE", '1'))
@@ -338,40 +339,6 @@ class Simulation:
         print(f'    {kv.ljust(40)} {score_str.ljust(15)} {weight_str}')
 
 
-class FakeConnection:
-    def __init__(self, db: str):
-        self._locked = False
-        self._db = db
-
-    def lock(self, db):
-        if self._db != db:
-            raise RuntimeError('a connection for different DB')
-        if self._locked:
-            raise RuntimeError(
-                "attempting to use a connection that's already in use")
-        self._locked = True
-
-    def unlock(self, db):
-        if self._db != db:
-            raise RuntimeError('a connection for different DB')
-        if not self._locked:
-            raise RuntimeError(
-                "attempting to stop using a connection that wasn't used")
-        self._locked = False
-
-    def on_connect(self):
-        if self._locked:
-            raise RuntimeError(
-                "attempting to re-connect a connection "
-                "that's currently in use")
-
-    def on_disconnect(self):
-        if self._locked:
-            raise RuntimeError(
-                "attempting to disconnect a connection "
-                "that's currently in use")
-
-
 class SimulatedCaseMeta(type):
     def __new__(mcls, name, bases, dct):
         for methname, meth in tuple(dct.items()):
@@ -448,7 +415,7 @@ class SimulatedCase(unittest.TestCase, metaclass=SimulatedCaseMeta):
         async def fake_connect(dbname):
             dur = max(cost_base + random.triangular(-cost_var, cost_var), 0.01)
             await asyncio.sleep(dur)
-            return FakeConnection(dbname)
+            return poolsim.FakeConnection(dbname)
         return fake_connect
 
     def make_fake_disconnect(
@@ -1301,7 +1268,7 @@ class TestServerConnectionPool(unittest.TestCase):
         async def fake_connect(dbname):
             dur = max(cost_base + random.triangular(-cost_var, cost_var), 0.01)
             await asyncio.sleep(dur)
-            return FakeConnection(dbname)
+            return poolsim.FakeConnection(dbname)
 
         return fake_connect
 
@@ -1571,6 +1538,188 @@ class TestServerConnectionPool(unittest.TestCase):
 
         asyncio.run(main())
 
+    @unittest.mock.patch('edb.server.connpool.pool.STANDBY_INTERVAL', 1000)
+    def test_connpool_warm_standby(self):
+        async def q(pool):
+            conn = await pool.acquire('aaa')
+            await asyncio.sleep(0.01)
+            pool.release('aaa', conn)
+
+        async def test():
+            pool = connpool.Pool(
+                connect=self.make_fake_connect(),
+                disconnect=self.make_fake_disconnect(),
+                max_capacity=10,
+                warm_standby=2,
+            )
+
+            await asyncio.gather(*(q(pool) for _ in range(4)))
+            await pool.prune_inactive_connections('aaa')
+            block = pool._blocks['aaa']
+            self.assertEqual(block.count_conns(), 0)
+
+            # The block has seen 4 concurrent acquisitions, but at most
+            # 2 connections are pre-created to stay idle.
+            pool._standby_tick()
+            self.assertEqual(block.count_conns(), 2)
+            await asyncio.sleep(0.1)
+            self.assertEqual(block.count_queued_conns(), 2)
+
+            # GC keeps the standby connections.
+            pool._gc_interval = 0
+            pool._run_gc()
+            await asyncio.sleep(0.1)
+            self.assertEqual(block.count_conns(), 2)
+
+            # ... until there is no demand in the history anymore.
+            for _ in range(pool_impl.STANDBY_HISTORY_SIZE):
+                pool._standby_tick()
+            pool._run_gc()
+            await asyncio.sleep(0.1)
+            self.assertEqual(block.count_conns(), 0)
+
+        asyncio.run(asyncio.wait_for(test(), timeout=5))
+
+    def test_connpool_db_quotas(self):
+        max_nconns = 0
+
+        async def q(pool):
+            nonlocal max_nconns
+            conn = await pool.acquire('aaa')
+            max_nconns = max(max_nconns, pool._blocks['aaa'].count_conns())
+            await asyncio.sleep(0.01)
+            pool.release('aaa', conn)
+
+        async def test():
+            pool = connpool.Pool(
+                connect=self.make_fake_connect(),
+                disconnect=self.make_fake_disconnect(),
+                max_capacity=10,
+            )
+            pool.set_db_quotas({'aaa': connpool.DBQuota(max_conns=3)})
+
+            await asyncio.gather(*(q(pool) for _ in range(10)))
+            self.assertEqual(max_nconns, 3)
+
+            # Lowering the cap discards connections as they are released.
+            pool.set_db_quotas({'aaa': connpool.DBQuota(max_conns=1)})
+            await asyncio.gather(*(q(pool) for _ in range(3)))
+            await asyncio.sleep(0.1)
+            self.assertEqual(pool._blocks['aaa'].count_conns(), 1)
+
+        asyncio.run(asyncio.wait_for(test(), timeout=5))
+
+    def test_connpool_db_quotas_balance(self):
+        async def test():
+            pool = connpool.Pool(
+                connect=self.make_fake_connect(),
+                disconnect=self.make_fake_disconnect(),
+                max_capacity=6,
+            )
+            pool.set_db_quotas({
+                'big': connpool.DBQuota(max_conns=4),
+                'small': connpool.DBQuota(min_conns=2),
+                'heavy': connpool.DBQuota(weight=2),
+            })
+            blocks = {
+                dbname: pool._get_block(dbname)
+                for dbname in ('big', 'small', 'heavy', 'other')
+            }
+            demand = {'big': 10, 'small': 3, 'heavy': 4, 'other': 4}
+            calibrated = {'big': 5, 'small': 0, 'heavy': 1, 'other': 0}
+            for dbname, block in blocks.items():
+                block.conn_waiters_num = demand[dbname]
+                block.quota = calibrated[dbname]
+
+            pool._apply_db_quotas()
+            # 'big' is capped and 'small' gets its guarantee, which goes
+            # over the capacity; the excess is taken from the block with
+            # the most connections above its guarantee.
+            self.assertEqual(
+                {dbname: block.quota for dbname, block in blocks.items()},
+                {'big': 3, 'small': 2, 'heavy': 1, 'other': 0},
+            )
+
+            blocks['big'].quota = 1
+            blocks['small'].quota = 2
+            pool._apply_db_quotas()
+            # The spare capacity goes to the blocks with unmet demand,
+            # in proportion to their weight.
+            self.assertEqual(
+                {dbname: block.quota for dbname, block in blocks.items()},
+                {'big': 1, 'small': 2, 'heavy': 2, 'other': 1},
+            )
+
+            # Blocks in use don't give up their guaranteed connections.
+            small = blocks['small']
+            for _ in range(2):
+                small.conns[poolsim.FakeConnection('small')] = (
+                    pool_impl.ConnectionState())
+            pool._is_starving = True
+            self.assertFalse(pool._should_free_conn(small))
+            small.conn_waiters_num = 0
+            self.assertTrue(pool._should_free_conn(small))
+
+            for block in blocks.values():
+                block.conn_waiters_num = 0
+                block.conns.clear()
+
+        asyncio.run(asyncio.wait_for(test(), timeout=5))
+
+
+class TestPoolSimulator(unittest.TestCase):
+
+    SPEC = poolsim.Spec(
+        capacity=4,
+        dbs=[
+            poolsim.DBSpec(
+                db=f't{i}',
+                start_at=i * 0.5,
+                end_at=i * 0.5 + 2,
+                qps=40,
+                query_cost_base=0.03,
+                query_cost_var=0.005,
+            ) for i in range(6)
+        ],
+    )
+
+    def test_connpool_simulator_deterministic(self):
+        queries = poolsim.synthesize_trace(self.SPEC, random.Random(1))
+        self.assertEqual(
+            queries,
+            poolsim.synthesize_trace(self.SPEC, random.Random(1)),
+        )
+
+        for pool_cls in (connpool.Pool, connpool._NaivePool):
+            result = poolsim.simulate(self.SPEC, queries, pool_cls, seed=1)
+            summary = result.summary()
+            self.assertEqual(summary['queries'], len(queries))
+            self.assertGreater(result.elapsed, 4.5)
+            self.assertGreater(summary['churn'], 0)
+            self.assertLessEqual(summary['utilization'], 1)
+            self.assertLessEqual(summary['fairness'], 1)
+
+            again = poolsim.simulate(self.SPEC, queries, pool_cls, seed=1)
+            self.assertEqual(again.summary(), summary)
+
+    def test_connpool_simulator_trace(self):
+        queries = poolsim.load_trace([
+            '{"at": 0.5, "db": "a", "duration": 0.1}',
+            '',
+            '{"at": 0.1, "db": "b", "duration": 0.1}',
+            '{"at": 0.1, "db": "a", "duration": 0.1}',
+        ])
+        self.assertEqual([q.at for q in queries], [0.1, 0.1, 0.5])
+
+        result = poolsim.simulate(self.SPEC, queries, connpool.Pool)
+        self.assertEqual(
+            {db: len(waits) for db, waits in result.waits.items()},
+            {'a': 2, 'b': 1},
+        )
+        # The second query to "a" reuses the connection of the first one.
+        self.assertGreater(result.waits['a'][0], 0)
+        self.assertEqual(result.waits['a'][1], 0)
+
 
 HTML_TPL = R'''<!DOCTYPE html>
 <html>
@@ -17,9 +17,21 @@
 #
 
 
+import pathlib
+import pickle
+import tempfile
 import unittest
+import uuid
 
+import immutables
+
+from edb import edgeql
 from edb.server import server
+from edb.server import cache
+from edb.server.cache import persistent
+from edb.server.cache import schema as schema_cache
+from edb.server.cache import stdschema
+from edb.server.cache import workload
 
 
 class TestServerUnittests(unittest.TestCase):
@@ -108,3 +120,308 @@ class TestServerUnittests(unittest.TestCase):
                 (set(expected[0]), set(expected[1]))
             )
             self.assertEqual(tuple(has_wildcards), expected_wildcard)
+
+
+class TestPersistentQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def make_key(self, query=b'SELECT 1', **kwargs):
+        args = dict(
+            protocol_version=(1, 0),
+            output_format='BINARY',
+            input_format='BINARY',
+            flags=(False, 0, False, False, True),
+            modaliases=immutables.Map({None: 'default'}),
+            session_config=immutables.Map(),
+            database_config=immutables.Map(),
+            system_config=immutables.Map(),
+        )
+        args.update(kwargs)
+        return persistent.make_key(query, **args)
+
+    def test_server_persistent_cache_key(self):
+        self.assertEqual(self.make_key(), self.make_key())
+        self.assertNotEqual(self.make_key(), self.make_key(b'SELECT 2'))
+        self.assertNotEqual(
+            self.make_key(),
+            self.make_key(protocol_version=(0, 13)),
+        )
+        self.assertNotEqual(
+            self.make_key(),
+            self.make_key(modaliases=immutables.Map({None: 'foo'})),
+        )
+        self.assertEqual(
+            self.make_key(session_config=immutables.Map(a=1, b=2)),
+            self.make_key(session_config=immutables.Map(b=2, a=1)),
+        )
+
+    def test_server_persistent_cache_roundtrip(self):
+        v1 = uuid.uuid4()
+        v2 = uuid.uuid4()
+
+        cache = persistent.PersistentQueryCache(self.path, 'db')
+        self.assertIsNone(cache.get('k'))
+
+        cache.set_schema_version(v1)
+        cache.prune()
+        self.assertIsNone(cache.get('k'))
+        cache.put('k', {'compiled': 1})
+        self.assertEqual(cache.get('k'), {'compiled': 1})
+
+        # A restarted server sees the same entries...
+        cache = persistent.PersistentQueryCache(self.path, 'db')
+        cache.set_schema_version(v1)
+        cache.prune()
+        self.assertEqual(cache.get('k'), {'compiled': 1})
+
+        # ...but only for the same database and schema version.
+        other = persistent.PersistentQueryCache(self.path, 'other')
+        other.set_schema_version(v1)
+        other.prune()
+        self.assertIsNone(other.get('k'))
+
+        cache.set_schema_version(v2)
+        cache.prune()
+        self.assertIsNone(cache.get('k'))
+        cache.set_schema_version(v1)
+        cache.prune()
+        self.assertIsNone(cache.get('k'))
+
+    def test_server_persistent_cache_put_many(self):
+        v1 = uuid.uuid4()
+        v2 = uuid.uuid4()
+
+        cache = persistent.PersistentQueryCache(self.path, 'db')
+        cache.set_schema_version(v1)
+        cache.prune()
+        cache.put_many(v1, {'a': 1, 'b': 2})
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('b'), 2)
+
+        # Entries queued for a schema version that is no longer
+        # current are dropped.
+        cache.set_schema_version(v2)
+        cache.prune()
+        cache.put_many(v1, {'c': 3})
+        self.assertIsNone(cache.get('c'))
+        self.assertEqual(list(self.path.rglob('c')), [])
+
+    def test_server_persistent_cache_corrupt_entry(self):
+        cache = persistent.PersistentQueryCache(self.path, 'db')
+        cache.set_schema_version(uuid.uuid4())
+        cache.prune()
+        cache.put('k', 42)
+
+        entry, = (p for p in self.path.rglob('k'))
+        entry.write_bytes(entry.read_bytes()[:-4])
+        self.assertIsNone(cache.get('k'))
+        self.assertFalse(entry.exists())
+
+    def test_server_persistent_cache_clear(self):
+        cache = persistent.PersistentQueryCache(self.path, 'db')
+        cache.set_schema_version(uuid.uuid4())
+        cache.prune()
+        cache.put('k', 42)
+        cache.clear()
+        self.assertIsNone(cache.get('k'))
+        self.assertEqual(list(self.path.iterdir()), [])
+
+
+class TestQueryWorkload(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_server_query_workload_most_common(self):
+        wl = workload.QueryWorkload(self.path, 'db', 2)
+        for key, uses in [('a', 1), ('b', 3), ('c', 2)]:
+            for _ in range(uses):
+                wl.record(key)
+        self.assertEqual(wl.most_common(), [('b', 3), ('c', 2)])
+
+        # Rarely used queries are forgotten eventually.
+        for i in range(10):
+            wl.record(f'q{i}')
+        self.assertLessEqual(len(wl._uses), 8)
+        self.assertEqual(wl.most_common(), [('b', 3), ('c', 2)])
+
+    def test_server_query_workload_manifest(self):
+        wl = workload.QueryWorkload(self.path, 'db', 2)
+        self.assertEqual(wl.load(), [])
+
+        wl.record('a')
+        entries = [{'query': 'SELECT 1'}, {'query': 'SELECT 2'}]
+        wl.save(entries)
+        self.assertEqual(wl.load(), entries)
+
+        # A restarted server sees the same entries...
+        wl = workload.QueryWorkload(self.path, 'db', 1)
+        self.assertEqual(wl.load(), entries[:1])
+
+        # ...but only for the same database.
+        other = workload.QueryWorkload(self.path, 'other', 2)
+        self.assertEqual(other.load(), [])
+
+        wl.clear()
+        self.assertEqual(wl.load(), [])
+        self.assertEqual(list(self.path.iterdir()), [])
+
+    def test_server_query_workload_normalized_text(self):
+        source = edgeql.NormalizedSource.from_string(
+            "SELECT ('secret', 42, <str>$0)")
+        text = source.normalized_text()
+        self.assertNotIn('secret', text)
+        self.assertNotIn('42', text)
+
+        # The manifest entry is compiled under the key of the requests.
+        restored = edgeql.NormalizedSource.from_normalized_text(
+            text, source.first_extra(), source.extra_counts())
+        self.assertEqual(restored.cache_key(), source.cache_key())
+        self.assertEqual(restored.first_extra(), source.first_extra())
+        self.assertEqual(restored.extra_counts(), source.extra_counts())
+
+
+class TestSchemaCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_server_schema_cache_versions(self):
+        cache = schema_cache.SchemaCache(self.path)
+        v1 = uuid.uuid4()
+        v2 = uuid.uuid4()
+        self.assertIsNone(cache.load('db', v1))
+
+        cache.save('db', v1, immutables.Map(a=1))
+        self.assertEqual(cache.load('db', v1), immutables.Map(a=1))
+        self.assertIsNone(cache.load('db', v2))
+        self.assertIsNone(cache.load('other', v1))
+
+        cache.save('db', v2, immutables.Map(a=2))
+        self.assertIsNone(cache.load('db', v1))
+        self.assertEqual(cache.load('db', v2), immutables.Map(a=2))
+
+        cache.discard('db')
+        self.assertIsNone(cache.load('db', v2))
+        self.assertEqual(list(self.path.iterdir()), [])
+
+    def test_server_schema_cache_corrupted(self):
+        cache = schema_cache.SchemaCache(self.path)
+        version = uuid.uuid4()
+        cache.save('db', version, immutables.Map(a=1))
+
+        [path] = self.path.iterdir()
+        path.write_bytes(path.read_bytes()[:-4])
+        self.assertIsNone(cache.load('db', version))
+        # Broken snapshots are removed.
+        self.assertEqual(list(self.path.iterdir()), [])
+
+
+class TestStdSchemaCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_server_std_schema_cache_roundtrip(self):
+        cache = stdschema.StdSchemaCache(self.path, 'a')
+        self.assertIsNone(cache.load())
+
+        (self.path / '1.bin').write_bytes(b'stale')
+        cache.save(b'std', b'refl', b'layout')
+        std, refl, layout = cache.load()
+        self.assertEqual(
+            (bytes(std), bytes(refl), bytes(layout)),
+            (b'std', b'refl', b'layout'),
+        )
+        # Files of other catalog versions are removed.
+        self.assertEqual(len(list(self.path.iterdir())), 1)
+
+        # The pickles of a different bootstrap are not used.
+        other = stdschema.StdSchemaCache(self.path, 'b')
+        self.assertIsNone(other.load())
+        other.save(b'std2', b'refl2', b'layout2')
+        self.assertIsNone(cache.load())
+        self.assertEqual(len(list(self.path.iterdir())), 1)
+
+    def test_server_std_schema_cache_corrupted(self):
+        cache = stdschema.StdSchemaCache(self.path, 'a')
+        cache.save(b'std', b'refl', b'layout')
+
+        [path] = self.path.iterdir()
+        path.write_bytes(path.read_bytes()[:-1])
+        self.assertIsNone(cache.load())
+        self.assertEqual(list(self.path.iterdir()), [])
+
+    def test_server_std_schema_lazy(self):
+        obj = stdschema.LazySchema(pickle.dumps(immutables.Map(a=1)))
+        copy = pickle.loads(pickle.dumps(obj))
+        self.assertIsInstance(copy, stdschema.LazySchema)
+        self.assertEqual(stdschema.materialize(copy), immutables.Map(a=1))
+        self.assertIs(obj.materialize(), obj.materialize())
+        self.assertEqual(stdschema.materialize(42), 42)
+
+
+class TestStatementsCache(unittest.TestCase):
+
+    def test_server_stmt_cache_eviction(self):
+        stmts = cache.StatementsCache(maxsize=5)
+        for i in range(3):
+            stmts[f'hot{i}'] = i
+            self.assertEqual(stmts[f'hot{i}'], i)
+
+        # A scan of statements used once evicts the other statements
+        # used once first.
+        evicted = []
+        for i in range(10):
+            stmts[f'once{i}'] = i
+            while stmts.needs_cleanup():
+                evicted.append(stmts.cleanup_one())
+        self.assertEqual(
+            sorted(stmts), ['hot0', 'hot1', 'hot2', 'once8', 'once9'])
+        self.assertEqual(evicted, [f'once{i}' for i in range(8)])
+
+        del stmts['hot0']
+        self.assertNotIn('hot0', stmts)
+        self.assertEqual(stmts.get('once9', None), 9)
+        self.assertEqual(len(stmts), 4)
+
+    def test_server_stmt_cache_hot_statements(self):
+        hot = cache.HotStatements('db', maxsize=2)
+        for i in range(4):
+            for _ in range(i + 1):
+                hot.record(b'stmt%d' % i, b'SELECT %d' % i, 1)
+
+        self.assertEqual(
+            hot.get_hot(1),
+            [(b'stmt3', b'SELECT 3'), (b'stmt2', b'SELECT 2')],
+        )
+        # Statements recorded at an older dbver are not returned.
+        self.assertEqual(hot.get_hot(2), [])
+        hot.record(b'stmt3', b'SELECT 3', 2)
+        hot.record(b'stmt3', b'SELECT 3', 2)
+        self.assertEqual(hot.get_hot(2), [(b'stmt3', b'SELECT 3')])
+
+        # Counts decay, so statements that are not used anymore drop
+        # out of the hot set.
+        for _ in range(100):
+            hot.record(b'new', b'SELECT 0', 2)
+        self.assertEqual(hot.get_hot(2)[0], (b'new', b'SELECT 0'))
+        self.assertEqual(len(hot), 1)